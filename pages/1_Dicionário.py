@@ -2,6 +2,8 @@ import streamlit as st
 from PIL import Image
 from pathlib import Path
 
+from utils.dados import carregar_auxiliar
+
 # --- Importar CSS ---
 with open("styles/style.css") as f:
     st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
@@ -40,6 +42,15 @@ Esses indicadores foram utilizados para enriquecer as análises de risco e consi
 image_aux = Image.open("assets/base_auxiliar.PNG")  # substitua pelo nome correto do arquivo
 st.image(image_aux, caption="Dicionário de dados da base auxiliar", use_container_width=True)
 
+# Cobertura da junção com a base de boletos (a base auxiliar é opcional)
+base_auxiliar = carregar_auxiliar()
+if base_auxiliar is not None:
+    st.caption(
+        f"Base auxiliar carregada: {len(base_auxiliar.tabela):,} CNPJs — "
+        f"{base_auxiliar.cobertura('id_pagador'):.1%} dos pagadores e "
+        f"{base_auxiliar.cobertura('id_beneficiario'):.1%} dos beneficiários encontrados."
+    )
+
 
 # --- Conclusão da aba ---
 st.markdown("""
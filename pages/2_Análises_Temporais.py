@@ -1,8 +1,17 @@
 import streamlit as st
-import pandas as pd
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
 from PIL import Image
 
+from utils import perfil
+from utils.consultas import obter_consultas
+from utils.filtros import barra_filtros
+from utils.downsampling import LIMITE_PONTOS, reduzir
+from utils.tabela import tabela_paginada
+
+perfil.iniciar("Análises Temporais")
+
 # --- Importar CSS ---
 with open("styles/style.css") as f:
     st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
@@ -15,28 +24,71 @@ st.markdown("""
 Esta seção traz uma análise temporal da base de boletos, explorando as emissões, vencimentos e pagamentos ao longo do tempo.
 A partir dessas informações, é possível entender a evolução das operações, identificar períodos com volume atípico de emissões 
 e observar padrões de comportamento no fluxo de pagamento.
+Os dias e meses fora do padrão da própria série são detectados automaticamente e marcados em vermelho nos gráficos.
 </div>
 """, unsafe_allow_html=True)
 
 # ============================================================
-# 🔹 Carrega a base (apenas uma vez)
+# 🔹 Consultas sobre a base (cubo pré-calculado ou SQL, conforme o backend),
+#    recortadas pelos filtros da barra lateral
 # ============================================================
-df = pd.read_csv("data/base_tratada_nuclea.csv", low_memory=False)
-df["dt_emissao"] = pd.to_datetime(df["dt_emissao"], errors="coerce")
-df = df.dropna(subset=["dt_emissao"])
-df["ano_mes_emissao"] = df["dt_emissao"].dt.to_period("M").astype(str)
+perfil.secao("carga e filtros")
+filtros = barra_filtros()
+consultas = obter_consultas(filtros)
+
+
+def filtrar_periodo(df, coluna, chave):
+    """Seletor de período para séries diárias longas.
+
+    As séries com mais de ``LIMITE_PONTOS`` dias são reduzidas antes de ir
+    para o gráfico; ao estreitar o período, a série volta à resolução total.
+    """
+    if len(df) <= LIMITE_PONTOS:
+        return df
+    datas = df[coluna].dt.date
+    inicio, fim = st.slider(
+        "Período exibido",
+        min_value=datas.min(),
+        max_value=datas.max(),
+        value=(datas.min(), datas.max()),
+        format="DD/MM/YYYY",
+        key=chave,
+    )
+    return df[(datas >= inicio) & (datas <= fim)]
+
+
+def destacar_anomalias(fig, serie, x):
+    """Marca em ``fig`` as anomalias de ``serie`` (ver ``utils.anomalias``) no intervalo de ``x``.
+
+    A detecção considera a série inteira; só o trecho exibido é marcado.
+    """
+    anomalias = consultas.anomalias(serie)
+    anomalias = anomalias[anomalias["anomalia"] & (anomalias.index >= x.min()) & (anomalias.index <= x.max())]
+    if anomalias.empty:
+        return
+    fig.add_trace(
+        go.Scatter(
+            x=anomalias.index,
+            y=anomalias["valor"],
+            name="Anomalia",
+            mode="markers",
+            marker=dict(color="#d62728", size=12, symbol="circle-open", line=dict(width=3)),
+            customdata=anomalias[["esperado", "z"]],
+            hovertemplate=(
+                "<b>Anomalia</b><br><b>Observado:</b> %{y:,.0f}<br>"
+                "<b>Esperado:</b> %{customdata[0]:,.0f}<br><b>z robusto:</b> %{customdata[1]:.1f}<extra></extra>"
+            ),
+        )
+    )
+
 
 # ============================================================
 # 📊 CONTAGEM DE BOLETOS POR ANO/MÊS
 # ============================================================
 st.subheader("📊 Contagem de Boletos por Ano/Mês de Emissão")
 
-contagem_emissao = (
-    df.groupby("ano_mes_emissao", as_index=False)
-      .size()
-      .rename(columns={"size": "qtd_boletos"})
-      .sort_values("ano_mes_emissao")
-)
+perfil.secao("contagem por mês de emissão")
+contagem_emissao = consultas.contagem_emissao()
 
 fig_contagem = px.bar(
     contagem_emissao,
@@ -63,6 +115,7 @@ fig_contagem.update_layout(
     hoverlabel=dict(bgcolor="white", font_size=13, font_color="#002873"),
     margin=dict(l=40, r=40, t=80, b=40)
 )
+destacar_anomalias(fig_contagem, "contagem_emissao", contagem_emissao["ano_mes_emissao"])
 
 st.plotly_chart(fig_contagem, use_container_width=True)
 
@@ -71,12 +124,8 @@ st.plotly_chart(fig_contagem, use_container_width=True)
 # ============================================================
 st.subheader("💵 Valor Nominal Emitido por Ano/Mês de Emissão")
 
-valor_emissao = (
-    df.dropna(subset=["vlr_nominal"])
-      .groupby("ano_mes_emissao", as_index=False)["vlr_nominal"]
-      .sum()
-      .sort_values("ano_mes_emissao")
-)
+perfil.secao("valor por mês de emissão")
+valor_emissao = consultas.valor_emissao()
 
 fig_valor = px.bar(
     valor_emissao,
@@ -103,55 +152,68 @@ fig_valor.update_layout(
     hoverlabel=dict(bgcolor="white", font_size=13, font_color="#002873"),
     margin=dict(l=40, r=40, t=80, b=40)
 )
+destacar_anomalias(fig_valor, "valor_emissao", valor_emissao["ano_mes_emissao"])
 
 st.plotly_chart(fig_valor, use_container_width=True)
 
 # ============================================================
 # ⏰ QUANTIDADE DE BOLETOS POR DIA DE VENCIMENTO (GRÁFICO DE LINHA)
 # ============================================================
-st.subheader("⏰ Quantidade de Boletos por Dia de Vencimento")
-
-# 3️⃣ Agrupa por dia de vencimento
-contagem_vencimento = (
-    df.groupby("dt_vencimento", as_index=False)
-      .size()
-      .rename(columns={"size": "qtd_boletos"})
-      .sort_values("dt_vencimento")
-)
+# O seletor de período só reexecuta este gráfico
+@perfil.fragmento
+def grafico_vencimentos():
+    st.subheader("⏰ Quantidade de Boletos por Dia de Vencimento")
+
+    perfil.secao("vencimentos por dia")
+
+    # 3️⃣ Agrupa por dia de vencimento e limita os pontos enviados ao gráfico
+    contagem_vencimento = consultas.contagem_vencimento()
+    contagem_vencimento = filtrar_periodo(contagem_vencimento, "dt_vencimento", "periodo_vencimento")
+    vencimento_grafico = reduzir(contagem_vencimento, "dt_vencimento", "qtd_boletos", metodo="lttb")
+
+    # 4️⃣ Cria o gráfico interativo de linha
+    fig_venc = px.line(
+        vencimento_grafico,
+        x="dt_vencimento",
+        y="qtd_boletos",
+        title="Quantidade de Boletos por Dia de Vencimento",
+        markers=True,  # adiciona marcadores nos pontos
+    )
 
-# 4️⃣ Cria o gráfico interativo de linha
-fig_venc = px.line(
-    contagem_vencimento,
-    x="dt_vencimento",
-    y="qtd_boletos",
-    title="Quantidade de Boletos por Dia de Vencimento",
-    markers=True,  # adiciona marcadores nos pontos
-)
+    # 5️⃣ Ajusta o estilo visual
+    fig_venc.update_traces(
+        line=dict(color="#3f796c", width=3),
+        marker=dict(size=6, color="#002873"),
+        showlegend=True, 
+        hovertemplate="<b>Data de Vencimento:</b> %{x|%d/%m/%Y}<br><b>Boletos:</b> %{y}<extra></extra>",
+    )
 
-# 5️⃣ Ajusta o estilo visual
-fig_venc.update_traces(
-    line=dict(color="#3f796c", width=3),
-    marker=dict(size=6, color="#002873"),
-    showlegend=True, 
-    hovertemplate="<b>Data de Vencimento:</b> %{x|%d/%m/%Y}<br><b>Boletos:</b> %{y}<extra></extra>",
-)
+    fig_venc.update_layout(
+        title_x=0.5,
+        xaxis_title="Data de Vencimento",
+        yaxis_title="Quantidade de Boletos",
+        title_font=dict(color="#3f796c", size=18),
+        font=dict(color="#002873", size=13),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        hoverlabel=dict(bgcolor="white", font_size=13, font_color="#002873"),
+        margin=dict(l=40, r=40, t=80, b=40),
+        xaxis=dict(showgrid=True, gridcolor="rgba(0,0,0,0.05)"),
+        yaxis=dict(showgrid=True, gridcolor="rgba(0,0,0,0.05)"),
+    )
+    destacar_anomalias(fig_venc, "contagem_vencimento", contagem_vencimento["dt_vencimento"])
 
-fig_venc.update_layout(
-    title_x=0.5,
-    xaxis_title="Data de Vencimento",
-    yaxis_title="Quantidade de Boletos",
-    title_font=dict(color="#3f796c", size=18),
-    font=dict(color="#002873", size=13),
-    plot_bgcolor="white",
-    paper_bgcolor="white",
-    hoverlabel=dict(bgcolor="white", font_size=13, font_color="#002873"),
-    margin=dict(l=40, r=40, t=80, b=40),
-    xaxis=dict(showgrid=True, gridcolor="rgba(0,0,0,0.05)"),
-    yaxis=dict(showgrid=True, gridcolor="rgba(0,0,0,0.05)"),
-)
+    # 6️⃣ Exibe o gráfico no dashboard
+    st.plotly_chart(fig_venc, use_container_width=True)
+
+    if len(vencimento_grafico) < len(contagem_vencimento):
+        st.caption(
+            f"Exibindo {len(vencimento_grafico)} de {len(contagem_vencimento)} dias (LTTB). "
+            "Reduza o período para ver todos os dias."
+        )
 
-# 6️⃣ Exibe o gráfico no dashboard
-st.plotly_chart(fig_venc, use_container_width=True)
+
+grafico_vencimentos()
 
 
 # ============================================================
@@ -159,26 +221,12 @@ st.plotly_chart(fig_venc, use_container_width=True)
 # ============================================================
 st.subheader("💳 Quantidade de Boletos Pagos por Mês")
 
-# 1️⃣ Garantir formato datetime
-df["dt_pagamento"] = pd.to_datetime(df["dt_pagamento"], errors="coerce")
-
-# 2️⃣ Filtrar apenas registros com pagamento
-df_pag = df.dropna(subset=["dt_pagamento"]).copy()
+perfil.secao("pagamentos por mês")
 
-# 3️⃣ Criar coluna de Ano/Mês de pagamento
-df_pag["ano_mes_pagamento"] = df_pag["dt_pagamento"].dt.to_period("M").astype(str)
-
-# 4️⃣ Agrupar por mês e calcular total e acumulado
-pag_mes = (
-    df_pag.groupby("ano_mes_pagamento", as_index=False)
-          .agg(qtd_boletos=("dt_pagamento", "count"))
-          .sort_values("ano_mes_pagamento")
-)
-pag_mes["pct_acumulado"] = (pag_mes["qtd_boletos"].cumsum() / pag_mes["qtd_boletos"].sum()) * 100
-
-# 5️⃣ Gráfico combinado (barras + linha acumulada)
-import plotly.graph_objects as go
+# 1️⃣ Agrupar por mês de pagamento e calcular total e acumulado
+pag_mes = consultas.pagamentos_mes()
 
+# 2️⃣ Gráfico combinado (barras + linha acumulada)
 fig_pagamentos = go.Figure()
 
 # Barras — quantidade de boletos pagos por mês
@@ -232,30 +280,160 @@ fig_pagamentos.update_layout(
     hoverlabel=dict(bgcolor="white", font_size=13, font_color="#002873"),
     margin=dict(l=60, r=60, t=80, b=60)
 )
+destacar_anomalias(fig_pagamentos, "pagamentos_mes", pag_mes["ano_mes_pagamento"])
 
 st.plotly_chart(fig_pagamentos, use_container_width=True, key="grafico_pagamentos_mes")
 
 
 # ============================================================
-# 📊 TABELA DE APOIO (EXPANSÍVEL)
+# 📅 QUANTIDADE DE BOLETOS PAGOS POR DIA
+# ============================================================
+@perfil.fragmento
+def grafico_pagamentos_dia():
+    st.subheader("📅 Quantidade de Boletos Pagos por Dia")
+
+    perfil.secao("pagamentos por dia")
+
+    # Redução por mínimo/máximo: picos de um único dia nunca são descartados
+    pag_dia = consultas.pagamentos_dia().sort_values("dt_pagamento")
+    pag_dia = filtrar_periodo(pag_dia, "dt_pagamento", "periodo_pagamento")
+    pag_dia_grafico = reduzir(pag_dia, "dt_pagamento", "qtd_boletos", metodo="min_max")
+
+    fig_pag_dia = px.line(
+        pag_dia_grafico,
+        x="dt_pagamento",
+        y="qtd_boletos",
+        title="Quantidade de Boletos Pagos por Dia",
+        markers=True,
+    )
+    fig_pag_dia.update_traces(
+        line=dict(color="#3f796c", width=2),
+        marker=dict(size=5, color="#002873"),
+        hovertemplate="<b>Data de Pagamento:</b> %{x|%d/%m/%Y}<br><b>Pagamentos:</b> %{y}<extra></extra>",
+    )
+    fig_pag_dia.update_layout(
+        title_x=0.5,
+        xaxis_title="Data de Pagamento",
+        yaxis_title="Quantidade de Boletos Pagos",
+        title_font=dict(color="#3f796c", size=18),
+        font=dict(color="#002873", size=13),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        hoverlabel=dict(bgcolor="white", font_size=13, font_color="#002873"),
+        margin=dict(l=40, r=40, t=80, b=40),
+        xaxis=dict(showgrid=True, gridcolor="rgba(0,0,0,0.05)"),
+        yaxis=dict(showgrid=True, gridcolor="rgba(0,0,0,0.05)"),
+    )
+    destacar_anomalias(fig_pag_dia, "pagamentos_dia", pag_dia["dt_pagamento"])
+    st.plotly_chart(fig_pag_dia, use_container_width=True, key="grafico_pagamentos_dia")
+
+    if len(pag_dia_grafico) < len(pag_dia):
+        st.caption(
+            f"Exibindo {len(pag_dia_grafico)} de {len(pag_dia)} dias (mínimo e máximo de cada intervalo). "
+            "Reduza o período para ver todos os dias."
+        )
+
+
+grafico_pagamentos_dia()
+
+
+# ============================================================
+# 📊 TABELA DE APOIO (SOB DEMANDA)
 # ============================================================
-with st.expander("📅 Ver Totais de Pagamento por Dia", expanded=False):
+# A tabela só é montada quando aberta, e abrir/fechar reexecuta só este trecho
+@perfil.fragmento
+def tabela_pagamentos_dia():
+    if not st.toggle("📅 Ver Totais de Pagamento por Dia", key="ver_pagamentos_dia"):
+        return
+
+    perfil.secao("tabela de pagamentos por dia")
     st.markdown("""
     Esta tabela detalha o total de boletos pagos por dia, permitindo análise granular de picos de pagamento.
     """)
-    
-    contagem_pagamento_dia = (
-        df_pag.groupby("dt_pagamento", as_index=False)
-              .agg(qtd_boletos=("dt_pagamento", "count"))
-              .sort_values("dt_pagamento", ascending=False)
+
+    # Só a página visível vai para o navegador; a data é formatada na exibição
+    tabela_paginada(
+        consultas.pagamentos_dia(),
+        "tabela_pagamentos_dia",
+        rotulos={"dt_pagamento": "Data de Pagamento", "qtd_boletos": "Quantidade de Boletos Pagos"},
+        ordenacao="dt_pagamento",
+        decrescente=True,
+        column_config={"Data de Pagamento": st.column_config.DateColumn(format="DD/MM/YYYY")},
+    )
+
+
+tabela_pagamentos_dia()
+
+
+# ============================================================
+# 🧬 SAFRAS DE PAGAMENTO (COORTES)
+# ============================================================
+MEDIDAS_COORTE = {
+    "% pago acumulado": ("pct_pago_acumulado", "%{z:.1f}%"),
+    "Quantidade paga no mês": ("qtd_boletos", "%{z:,.0f}"),
+    "Valor pago no mês (R$)": ("vlr_nominal", "R$ %{z:,.2f}"),
+}
+
+
+# Trocar a medida reexecuta só o mapa de calor
+@perfil.fragmento
+def mapa_coortes():
+    st.subheader("🧬 Safras de Pagamento por Mês de Emissão")
+
+    perfil.secao("safras de pagamento")
+    st.markdown("""
+    Cada linha é uma safra (boletos emitidos no mesmo mês) e cada coluna, os meses decorridos até o pagamento.
+    Células em branco ainda não podem ser observadas: estão além do último mês com pagamentos na base.
+    """)
+
+    coortes = consultas.coortes()
+    if coortes.empty:
+        st.info("Não há boletos com mês de emissão na seleção atual.")
+        return
+
+    medida = st.radio("Medida", list(MEDIDAS_COORTE), horizontal=True, key="medida_coortes")
+    coluna, formato = MEDIDAS_COORTE[medida]
+
+    # A grade vem completa e ordenada por safra e defasagem
+    safras = coortes["ano_mes_emissao"].unique()
+    defasagens = coortes["meses_ate_pagamento"].unique()
+    forma = (len(safras), len(defasagens))
+    valores = coortes[coluna].to_numpy(dtype=float).reshape(forma)
+    if coluna != "pct_pago_acumulado":
+        # Sem pagamentos na célula: fica em branco em vez de na cor do zero
+        valores = np.where(valores == 0, np.nan, valores)
+
+    fig_coortes = go.Figure(
+        go.Heatmap(
+            z=valores,
+            x=defasagens,
+            y=safras,
+            customdata=coortes["total_boletos"].to_numpy().reshape(forma),
+            colorscale=[[0, "#f8faf9"], [0.5, "#3f796c"], [1, "#002873"]],
+            hovertemplate=(
+                "<b>Safra:</b> %{y}<br><b>Meses até o pagamento:</b> %{x}<br>"
+                f"<b>{medida}:</b> {formato}<br><b>Boletos da safra:</b> %{{customdata:,}}<extra></extra>"
+            ),
+            colorbar=dict(title=medida),
+        )
+    )
+    fig_coortes.update_layout(
+        title="Safras de Pagamento (Mês de Emissão × Meses até o Pagamento)",
+        title_x=0.5,
+        xaxis_title="Meses até o Pagamento",
+        yaxis_title="Ano/Mês de Emissão",
+        yaxis=dict(type="category", autorange="reversed"),
+        title_font=dict(color="#3f796c", size=18),
+        font=dict(color="#002873", size=13),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        hoverlabel=dict(bgcolor="white", font_size=13, font_color="#002873"),
+        height=max(400, 28 * len(safras) + 160),
+        margin=dict(l=60, r=40, t=80, b=60),
     )
+    st.plotly_chart(fig_coortes, use_container_width=True, key="grafico_coortes")
+
 
-    contagem_pagamento_dia["Data de Pagamento"] = contagem_pagamento_dia["dt_pagamento"].dt.strftime("%d/%m/%Y")
-    contagem_pagamento_dia = contagem_pagamento_dia.rename(columns={"qtd_boletos": "Quantidade de Boletos Pagos"})
-    contagem_pagamento_dia = contagem_pagamento_dia[["Data de Pagamento", "Quantidade de Boletos Pagos"]]
+mapa_coortes()
 
-    st.dataframe(
-        contagem_pagamento_dia,
-        use_container_width=True,
-        hide_index=True
-    )
\ No newline at end of file
+perfil.painel()
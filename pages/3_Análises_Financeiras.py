@@ -1,6 +1,17 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+
+from utils import perfil
+from utils.consultas import obter_consultas
+from utils.filtros import barra_filtros
+from utils.dados import decodificar_ids
+from utils.formatacao import estilizar
+from utils.histograma import bordas_lineares, bordas_log, histograma
+from utils.sobrevivencia import sobrevivencia_em
+from utils.tabela import tabela_paginada
+
+perfil.iniciar("Análises Financeiras")
 
 # --- Importar CSS ---
 with open("styles/style.css") as f:
@@ -52,23 +63,26 @@ st.markdown("<h1 style='text-align: center; color: #3f796c;'>📈 Análises Fina
 # ============================================================
 # 📊 CARREGA BASE
 # ============================================================
-df = pd.read_csv("data/base_tratada_nuclea.csv", low_memory=False)
-df["vlr_nominal"] = pd.to_numeric(df["vlr_nominal"], errors="coerce")
-df["vlr_baixa"] = pd.to_numeric(df["vlr_baixa"], errors="coerce")
+# Todos os cálculos passam pelo backend de consultas (agregados da ingestão
+# ou SQL sobre o Parquet, conforme DASHBOARD_BACKEND), recortados pelos
+# filtros da barra lateral
+perfil.secao("carga e filtros")
+filtros = barra_filtros()
+consultas = obter_consultas(filtros)
 
 # ============================================================
 # 🧮 MÉTRICAS PRINCIPAIS
 # ============================================================
 
-valor_inadimplente = df[df["inadimplente"] == 1]["vlr_nominal"].sum()
-valor_total_emitido = df["vlr_nominal"].sum()
-valor_total_baixas = df["vlr_baixa"].sum()
-mediana_nominal = df["vlr_nominal"].median()
-valor_maximo_nominal = df["vlr_nominal"].max()
-valor_minimo_nominal = df["vlr_nominal"].min()
-total_boletos = len(df)
-boletos_pagos = df["vlr_baixa"].notna().sum()
-pct_pagos = (boletos_pagos / total_boletos) * 100 if total_boletos > 0 else 0
+perfil.secao("KPIs")
+kpis = consultas.kpis()
+valor_inadimplente = kpis.valor_inadimplente
+valor_total_emitido = kpis.valor_total_emitido
+valor_total_baixas = kpis.valor_total_baixas
+mediana_nominal = kpis.mediana_nominal
+valor_maximo_nominal = kpis.valor_maximo_nominal
+valor_minimo_nominal = kpis.valor_minimo_nominal
+pct_pagos = kpis.pct_pagos
 
 # ============================================================
 # 💡 CARDS GERENCIAIS PERSONALIZADOS
@@ -116,12 +130,8 @@ st.markdown("<br><br><hr style='border: 1px solid #eaeaea'><br>", unsafe_allow_h
 # ============================================================
 st.subheader("💰 Distribuição do Valor Nominal por Tipo de Baixa")
 
-df_tipo_baixa = df.dropna(subset=["tipo_baixa"])
-baixa_agg = (
-    df_tipo_baixa.groupby("tipo_baixa", as_index=False)["vlr_nominal"]
-    .sum()
-    .sort_values("vlr_nominal", ascending=False)
-)
+perfil.secao("valor por tipo de baixa")
+baixa_agg = consultas.soma_por("tipo_baixa")
 
 fig_baixa = px.bar(
     baixa_agg,
@@ -157,12 +167,8 @@ st.markdown("<br><br><hr style='border: 1px solid #eaeaea'><br>", unsafe_allow_h
 # ============================================================
 st.subheader("🧾 Distribuição do Valor Nominal por Tipo de Espécie")
 
-df_especie = df.dropna(subset=["tipo_especie"])
-especie_agg = (
-    df_especie.groupby("tipo_especie", as_index=False)["vlr_nominal"]
-    .sum()
-    .sort_values("vlr_nominal", ascending=False)
-)
+perfil.secao("valor por tipo de espécie")
+especie_agg = consultas.soma_por("tipo_especie")
 
 fig_especie = px.bar(
     especie_agg,
@@ -200,28 +206,30 @@ st.markdown("<br><br><hr style='border: 1px solid #eaeaea'><br>", unsafe_allow_h
 # ============================================================
 st.subheader("🏦 Concentração de Emissões — Top 10 Pagadores")
 
-col_pagador = "id_pagador"
+perfil.secao("top 10 pagadores")
 
-tabela_pagadores = (
-    df.groupby(col_pagador, as_index=False)["vlr_nominal"]
-      .sum()
-      .sort_values("vlr_nominal", ascending=False)
-)
+# id_pagador chega como código inteiro: os totais são calculados por código
+# e só os pagadores exibidos são decodificados para o hash original.
+col_pagador = "id_pagador"
 
-tabela_pagadores["pct_carteira"] = (
-    tabela_pagadores["vlr_nominal"] / tabela_pagadores["vlr_nominal"].sum() * 100
-)
-tabela_pagadores["pct_acumulado"] = tabela_pagadores["pct_carteira"].cumsum()
+# Só os 10 maiores são selecionados (sem ordenar todos os pagadores); o total
+# da carteira vem dos índices de concentração, calculados sobre todos eles
+concentracao_emissao = consultas.concentracao("vlr_nominal")
 
-tabela_top10 = tabela_pagadores.head(10).copy()
+tabela_top10 = consultas.top_pagadores(10)
+tabela_top10["pct_carteira"] = tabela_top10["vlr_nominal"] / concentracao_emissao["total"] * 100
+tabela_top10["pct_acumulado"] = tabela_top10["pct_carteira"].cumsum()
 tabela_top10["rank"] = range(1, len(tabela_top10) + 1)
+tabela_top10[col_pagador] = decodificar_ids(col_pagador, tabela_top10[col_pagador])
 
-tabela_top10["Valor Emitido (R$)"] = tabela_top10["vlr_nominal"].apply(lambda x: f"R$ {x:,.2f}")
-tabela_top10["% Carteira"] = tabela_top10["pct_carteira"].apply(lambda x: f"{x:.1f}%")
-tabela_top10["% Acumulado"] = tabela_top10["pct_acumulado"].apply(lambda x: f"{x:.1f}%")
-
-tabela_final = tabela_top10[["rank", col_pagador, "Valor Emitido (R$)", "% Carteira", "% Acumulado"]]
-tabela_final = tabela_final.rename(columns={"rank": "Rank", col_pagador: "ID Pagador"})
+# Valores seguem numéricos (a grade ordena corretamente); o R$ e o % são só de exibição
+tabela_final = tabela_top10[["rank", col_pagador, "vlr_nominal", "pct_carteira", "pct_acumulado"]].rename(columns={
+    "rank": "Rank",
+    col_pagador: "ID Pagador",
+    "vlr_nominal": "Valor Emitido (R$)",
+    "pct_carteira": "% Carteira",
+    "pct_acumulado": "% Acumulado",
+})
 
 st.markdown("""
 <style>
@@ -243,7 +251,11 @@ tbody tr:hover {
 </style>
 """, unsafe_allow_html=True)
 
-st.dataframe(tabela_final, use_container_width=True, hide_index=True)
+st.dataframe(
+    estilizar(tabela_final, {"Valor Emitido (R$)": "moeda", "% Carteira": "percentual", "% Acumulado": "percentual"}),
+    use_container_width=True,
+    hide_index=True,
+)
 
 total_top10 = tabela_top10["vlr_nominal"].sum()
 pct_top10 = tabela_top10["pct_carteira"].sum()
@@ -255,6 +267,31 @@ equivalente a **{pct_top10:.1f}%** de todo o valor emitido na carteira.
 </div>
 """, unsafe_allow_html=True)
 
+
+# ============================================================
+# 📋 RANKING COMPLETO DE PAGADORES (SOB DEMANDA)
+# ============================================================
+@perfil.fragmento
+def ranking_pagadores():
+    if not st.toggle("📋 Ver todos os pagadores", key="ver_ranking_pagadores"):
+        return
+
+    perfil.secao("ranking completo de pagadores")
+    pagadores = consultas.valor_por_pagador()
+    pagadores["pct_carteira"] = pagadores["vlr_nominal"] / concentracao_emissao["total"] * 100
+
+    tabela_paginada(
+        pagadores,
+        "tabela_pagadores",
+        rotulos={"id_pagador": "ID Pagador", "vlr_nominal": "Valor Emitido (R$)", "pct_carteira": "% Carteira"},
+        colunas_id=["id_pagador"],
+        ordenacao="vlr_nominal",
+        formatos={"vlr_nominal": "moeda", "pct_carteira": "percentual"},
+    )
+
+
+ranking_pagadores()
+
 # ============================================================
 # 🔸 ESPAÇAMENTO VISUAL
 # ============================================================
@@ -265,40 +302,28 @@ st.markdown("<br><br><hr style='border: 1px solid #eaeaea'><br>", unsafe_allow_h
 # ============================================================
 st.subheader("⚠️ Maiores Inadimplentes — Top 10 Pagadores")
 
-# Filtra apenas os boletos inadimplentes
-df_inadimplentes = df[df["inadimplente"] == 1].copy()
-
 col_pagador = "id_pagador"
 
-# Agrupa por pagador e calcula as métricas
-tabela_inadimplentes = (
-    df_inadimplentes.groupby(col_pagador, as_index=False)
-      .agg(qtd_boletos=("inadimplente", "count"),
-           valor_devido=("vlr_nominal", "sum"))
-      .sort_values("valor_devido", ascending=False)
-)
+perfil.secao("top 10 inadimplentes")
 
-# Percentual sobre o total devido
-total_devido = tabela_inadimplentes["valor_devido"].sum()
-tabela_inadimplentes["pct_total"] = (
-    tabela_inadimplentes["valor_devido"] / total_devido * 100
-)
+# Top 10 pagadores com boletos inadimplentes: quantidade e valor devido
+concentracao_inad = consultas.concentracao("valor_devido")
+tabela_inad_top10 = consultas.top_inadimplentes(10)
 
-# Seleciona Top 10
-tabela_inad_top10 = tabela_inadimplentes.head(10).copy()
+# Percentual sobre o total devido
+tabela_inad_top10["pct_total"] = tabela_inad_top10["valor_devido"] / concentracao_inad["total"] * 100
 tabela_inad_top10["rank"] = range(1, len(tabela_inad_top10) + 1)
-
-# Formata valores
-tabela_inad_top10["Valor Devido (R$)"] = tabela_inad_top10["valor_devido"].apply(lambda x: f"R$ {x:,.2f}")
-tabela_inad_top10["% Total Devido"] = tabela_inad_top10["pct_total"].apply(lambda x: f"{x:.1f}%")
+tabela_inad_top10[col_pagador] = decodificar_ids(col_pagador, tabela_inad_top10[col_pagador])
 
 # Reorganiza colunas
 tabela_final_inad = tabela_inad_top10[
-    ["rank", col_pagador, "qtd_boletos", "Valor Devido (R$)", "% Total Devido"]
+    ["rank", col_pagador, "qtd_boletos", "valor_devido", "pct_total"]
 ].rename(columns={
     "rank": "Rank",
     col_pagador: "ID Pagador",
-    "qtd_boletos": "Qtd. Boletos em Aberto"
+    "qtd_boletos": "Qtd. Boletos em Aberto",
+    "valor_devido": "Valor Devido (R$)",
+    "pct_total": "% Total Devido",
 })
 
 # Estiliza a tabela
@@ -322,8 +347,12 @@ tbody tr:hover {
 </style>
 """, unsafe_allow_html=True)
 
-# Exibe a tabela
-st.dataframe(tabela_final_inad, use_container_width=True, hide_index=True)
+# Exibe a tabela (formatação só na exibição)
+st.dataframe(
+    estilizar(tabela_final_inad, {"Valor Devido (R$)": "moeda", "% Total Devido": "percentual"}),
+    use_container_width=True,
+    hide_index=True,
+)
 
 # Comentário explicativo
 total_top10_inad = tabela_inad_top10["valor_devido"].sum()
@@ -336,6 +365,117 @@ equivalente a **{pct_top10_inad:.1f}%** de todo o valor em aberto da carteira.
 </div>
 """, unsafe_allow_html=True)
 
+
+# ============================================================
+# 📋 RANKING COMPLETO DE INADIMPLENTES (SOB DEMANDA)
+# ============================================================
+# Todos os pagadores inadimplentes, paginados no servidor: só a página
+# visível é decodificada e enviada ao navegador
+@perfil.fragmento
+def ranking_inadimplentes():
+    if not st.toggle("📋 Ver todos os pagadores inadimplentes", key="ver_ranking_inadimplentes"):
+        return
+
+    perfil.secao("ranking completo de inadimplentes")
+    inadimplentes = consultas.inadimplentes()
+    inadimplentes["pct_total"] = inadimplentes["valor_devido"] / concentracao_inad["total"] * 100
+
+    tabela_paginada(
+        inadimplentes,
+        "tabela_inadimplentes",
+        rotulos={
+            "id_pagador": "ID Pagador",
+            "qtd_boletos": "Qtd. Boletos em Aberto",
+            "valor_devido": "Valor Devido (R$)",
+            "pct_total": "% Total Devido",
+        },
+        colunas_id=["id_pagador"],
+        ordenacao="valor_devido",
+        formatos={"valor_devido": "moeda", "pct_total": "percentual"},
+    )
+
+
+ranking_inadimplentes()
+
+# ============================================================
+# 🔸 ESPAÇAMENTO VISUAL
+# ============================================================
+st.markdown("<br><br><hr style='border: 1px solid #eaeaea'><br>", unsafe_allow_html=True)
+
+# ============================================================
+# 📐 ÍNDICES DE CONCENTRAÇÃO — CURVA DE LORENZ
+# ============================================================
+st.subheader("📐 Índices de Concentração por Pagador")
+perfil.secao("concentração e Lorenz")
+
+st.markdown(f"""
+<div class="kpi-container">
+    <div class="kpi-card">
+        <div class="kpi-value">{concentracao_emissao["gini"]:.3f}</div>
+        <div class="kpi-label">Gini — Valor Emitido</div>
+    </div>
+    <div class="kpi-card">
+        <div class="kpi-value">{concentracao_emissao["hhi"]:,.0f}</div>
+        <div class="kpi-label">HHI — Valor Emitido</div>
+    </div>
+    <div class="kpi-card">
+        <div class="kpi-value">{concentracao_inad["gini"]:.3f}</div>
+        <div class="kpi-label">Gini — Valor Inadimplente</div>
+    </div>
+    <div class="kpi-card">
+        <div class="kpi-value">{concentracao_inad["hhi"]:,.0f}</div>
+        <div class="kpi-label">HHI — Valor Inadimplente</div>
+    </div>
+</div>
+""", unsafe_allow_html=True)
+
+st.markdown("<br>", unsafe_allow_html=True)
+
+fig_lorenz = go.Figure()
+fig_lorenz.add_trace(
+    go.Scatter(
+        x=[0, 100], y=[0, 100],
+        mode="lines",
+        name="Igualdade perfeita",
+        line=dict(color="#b0b0b0", dash="dash"),
+        hoverinfo="skip"
+    )
+)
+for nome, dados_conc, cor in [
+    ("Valor emitido", concentracao_emissao, "#3f796c"),
+    ("Valor inadimplente", concentracao_inad, "#b33a3a"),
+]:
+    fig_lorenz.add_trace(
+        go.Scatter(
+            x=dados_conc["lorenz"]["pct_pagadores"],
+            y=dados_conc["lorenz"]["pct_valor"],
+            mode="lines",
+            name=nome,
+            line=dict(color=cor, width=3),
+            hovertemplate="<b>%{x:.1f}% dos pagadores</b><br>concentram %{y:.1f}% do valor<extra></extra>"
+        )
+    )
+fig_lorenz.update_layout(
+    title="Curva de Lorenz — Valor por Pagador",
+    title_x=0.5,
+    xaxis_title="% Acumulado de Pagadores (do menor para o maior)",
+    yaxis_title="% Acumulado do Valor",
+    title_font=dict(color="#3f796c", size=18),
+    font=dict(color="#002873", size=13),
+    plot_bgcolor="white",
+    paper_bgcolor="white",
+    legend=dict(orientation="h", y=-0.2, x=0.5, xanchor="center")
+)
+st.plotly_chart(fig_lorenz, use_container_width=True, key="grafico_lorenz")
+
+st.markdown(f"""
+<div class='intro-box'>
+ℹ️ **Como ler:** quanto mais a curva se afasta da diagonal, mais concentrada é a carteira.
+O **Gini** vai de 0 (todos os {concentracao_emissao["quantidade"]:,} pagadores com o mesmo valor) a 1 (um único pagador concentra tudo).
+O **HHI** soma os quadrados das participações (escala de 0 a 10.000); acima de 2.500 a concentração é considerada alta.
+</div>
+""", unsafe_allow_html=True)
+
 # ============================================================
 # 🔸 ESPAÇAMENTO VISUAL
 # ============================================================
@@ -346,26 +486,19 @@ st.markdown("<br><br><hr style='border: 1px solid #eaeaea'><br>", unsafe_allow_h
 # ============================================================
 st.subheader("⏰ Análise de Atrasos e Multas")
 
-# Garante que as colunas de data estão no formato correto
-df["dt_pagamento"] = pd.to_datetime(df["dt_pagamento"], errors="coerce")
-df["dt_vencimento"] = pd.to_datetime(df["dt_vencimento"], errors="coerce")
+perfil.secao("indicadores de atraso")
 
-# Filtra apenas boletos pagos com atraso
-df_atraso_pagamento = df.loc[
-    (df["dt_pagamento"] > df["dt_vencimento"]) & (df["vlr_baixa"].notna())
-].copy()
-
-# Calcula dias de atraso e valor de multa
-df_atraso_pagamento["dias_atraso"] = (df_atraso_pagamento["dt_pagamento"] - df_atraso_pagamento["dt_vencimento"]).dt.days
-df_atraso_pagamento["valor_multa"] = df_atraso_pagamento["vlr_nominal"] - df_atraso_pagamento["vlr_baixa"]
+# Boletos pagos com atraso, agregados por dias de atraso
+df_atraso_pagamento = consultas.atrasos()
 
 # ============================================================
 # 📊 INDICADORES DE DESEMPENHO
 # ============================================================
-media_atraso = df_atraso_pagamento["dias_atraso"].mean()
-mediana_atraso = df_atraso_pagamento["dias_atraso"].median()
-max_atraso = df_atraso_pagamento["dias_atraso"].max()
-valor_total_multas = -1 * (df_atraso_pagamento["valor_multa"].sum())
+# Calculados junto com as métricas principais, na mesma passada
+media_atraso = kpis.media_atraso
+mediana_atraso = kpis.mediana_atraso
+max_atraso = kpis.max_atraso
+valor_total_multas = kpis.valor_total_multas
 
 st.markdown(f"""
 <div class="kpi-container">
@@ -378,7 +511,7 @@ st.markdown(f"""
         <div class="kpi-label">Mediana de Atraso</div>
     </div>
     <div class="kpi-card">
-        <div class="kpi-value">{max_atraso} dias</div>
+        <div class="kpi-value">{max_atraso:.0f} dias</div>
         <div class="kpi-label">Maior Atraso</div>
     </div>
     <div class="kpi-card">
@@ -391,34 +524,217 @@ st.markdown(f"""
 # ============================================================
 # 📈 DISTRIBUIÇÃO DOS DIAS DE ATRASO
 # ============================================================
-st.markdown("<br>", unsafe_allow_html=True)
-st.write("📊 **Distribuição de Boletos por Dias de Atraso**")
+# Trocar a escala ou a largura das faixas reexecuta só o histograma
+@perfil.fragmento
+def histograma_atrasos():
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.write("📊 **Distribuição de Boletos por Dias de Atraso**")
+
+    perfil.secao("histograma de atrasos")
+
+    # Faixas calculadas no servidor: o gráfico recebe só uma barra por faixa
+    col_escala, col_largura = st.columns(2)
+    with col_escala:
+        escala_hist = st.radio("Faixas", ["Lineares", "Logarítmicas"], horizontal=True, key="escala_atraso")
+    with col_largura:
+        if escala_hist == "Lineares":
+            largura_hist = st.slider("Largura da faixa (dias)", min_value=1, max_value=30, value=7, key="largura_atraso")
+        else:
+            qtd_faixas_hist = st.slider("Quantidade de faixas", min_value=4, max_value=20, value=12, key="faixas_atraso")
+
+    max_dias = int(df_atraso_pagamento["dias_atraso"].max()) if not df_atraso_pagamento.empty else 1
+    if escala_hist == "Lineares":
+        bordas_hist = bordas_lineares(1, max_dias, largura_hist)
+    else:
+        bordas_hist = bordas_log(1, max_dias, qtd_faixas_hist)
+
+    hist_atraso = histograma(
+        df_atraso_pagamento["dias_atraso"].to_numpy(),
+        bordas_hist,
+        pesos=df_atraso_pagamento["qtd_boletos"].to_numpy(),
+    )
+
+    fig_hist = go.Figure(
+        go.Bar(
+            x=hist_atraso["faixa"],
+            y=hist_atraso["quantidade"],
+            marker_color="#3f796c",
+            hovertemplate="<b>Dias de Atraso:</b> %{x}<br><b>Qtd Boletos:</b> %{y}<extra></extra>"
+        )
+    )
+    fig_hist.update_layout(
+        title="Distribuição dos Dias de Atraso no Pagamento",
+        title_x=0.5,
+        xaxis_title="Dias de Atraso",
+        yaxis_title="Quantidade de Boletos",
+        title_font=dict(color="#3f796c", size=18),
+        font=dict(color="#002873", size=13),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        bargap=0.05,
+        xaxis=dict(type="category")
+    )
+    st.plotly_chart(fig_hist, use_container_width=True, key="grafico_distribuicao_atraso")
+
+    # ============================================================
+    # 📝 AVISO SOBRE O INTERVALO DOS BINS
+    # ============================================================
+    if escala_hist == "Lineares":
+        descricao_bins = f"de **{largura_hist} em {largura_hist} dias**, a partir de 1 dia de atraso"
+    else:
+        descricao_bins = "em **escala logarítmica**: as faixas são estreitas nos primeiros dias e se alargam na cauda de atrasos longos"
+
+    st.markdown(f"""
+    <div class='intro-box'>
+    ℹ️ **Observação:** Os intervalos do histograma são definidos explicitamente {descricao_bins}.  
+    Cada barra representa a quantidade de boletos cujo atraso está dentro da faixa indicada (limites inclusivos).
+    </div>
+    """, unsafe_allow_html=True)
+
+
+histograma_atrasos()
+
+
+# ============================================================
+# 📉 CURVAS DE PAGAMENTO APÓS O VENCIMENTO (SOBREVIVÊNCIA)
+# ============================================================
+SEGMENTOS_SOBREVIVENCIA = {"Tipo de espécie": "tipo_especie", "Porte do pagador": "porte_pagador"}
+
+# Marcos da tabela-resumo, em dias após o vencimento
+MARCOS_SOBREVIVENCIA = (0, 30, 90)
+
+
+# Trocar a segmentação reexecuta só as curvas
+@perfil.fragmento
+def curvas_sobrevivencia():
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.write("📉 **Boletos Ainda Não Pagos ao Longo dos Dias Após o Vencimento**")
+
+    perfil.secao("curvas de sobrevivência")
+    st.markdown("""
+    Curvas de Kaplan–Meier: para cada segmento, a fração estimada de boletos ainda não pagos a cada dia após o vencimento.
+    Boletos em aberto entram até a data do último pagamento da base, sem serem tratados como perdidos.
+    O porte do pagador é a quantidade de boletos dele na carteira.
+    """)
+
+    rotulo = st.radio("Segmentar por", list(SEGMENTOS_SOBREVIVENCIA), horizontal=True, key="segmento_sobrevivencia")
+    curvas = consultas.sobrevivencia(SEGMENTOS_SOBREVIVENCIA[rotulo])
+    if curvas.empty:
+        st.info("Não há boletos na seleção atual.")
+        return
+
+    fig_sobrevivencia = px.line(
+        curvas.assign(pct_em_aberto=curvas["sobrevivencia"] * 100),
+        x="dias",
+        y="pct_em_aberto",
+        color="grupo",
+        line_shape="hv",
+        custom_data=["em_risco", "pagos"],
+        title=f"Boletos Não Pagos por Dias Após o Vencimento — {rotulo}",
+        color_discrete_sequence=px.colors.qualitative.Safe,
+    )
+    fig_sobrevivencia.update_traces(
+        hovertemplate=(
+            "<b>%{fullData.name}</b><br><b>Dias após o vencimento:</b> %{x}<br>"
+            "<b>Ainda não pagos:</b> %{y:.1f}%<br><b>Em aberto no dia:</b> %{customdata[0]:,}<br>"
+            "<b>Pagos no dia:</b> %{customdata[1]:,}<extra></extra>"
+        )
+    )
+    fig_sobrevivencia.update_layout(
+        title_x=0.5,
+        xaxis_title="Dias Após o Vencimento",
+        yaxis_title="Boletos Ainda Não Pagos (%)",
+        legend_title_text=rotulo,
+        title_font=dict(color="#3f796c", size=18),
+        font=dict(color="#002873", size=13),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        hoverlabel=dict(bgcolor="white", font_size=13),
+        xaxis=dict(showgrid=True, gridcolor="rgba(0,0,0,0.05)"),
+        yaxis=dict(showgrid=True, gridcolor="rgba(0,0,0,0.05)", range=[0, 100]),
+    )
+    st.plotly_chart(fig_sobrevivencia, use_container_width=True, key="grafico_sobrevivencia")
+
+    resumo = sobrevivencia_em(curvas, MARCOS_SOBREVIVENCIA)
+    colunas_marco = {f"d{m}": f"Não pagos após {m} dias" if m else "Não pagos no vencimento"
+                     for m in MARCOS_SOBREVIVENCIA}
+    resumo[list(colunas_marco)] *= 100
+    resumo = resumo.rename(columns={"grupo": rotulo, "boletos": "Boletos", **colunas_marco})
+    st.dataframe(
+        estilizar(resumo, {"Boletos": "inteiro", **{c: "percentual" for c in colunas_marco.values()}}),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+
+curvas_sobrevivencia()
+
+
+# ============================================================
+# 🏦 INADIMPLÊNCIA POR LIQUIDEZ E MATERIALIDADE (BASE AUXILIAR)
+# ============================================================
+INDICADORES_RISCO = {
+    "Liquidez do sacado (1 mês)": "sacado_indice_liquidez_1m",
+    "Score de materialidade": "score_materialidade_v2",
+}
 
-fig_hist = px.histogram(
-    df_atraso_pagamento,
-    x="dias_atraso",
-    nbins=40,
-    title="Distribuição dos Dias de Atraso no Pagamento",
-    color_discrete_sequence=["#3f796c"]
-)
-fig_hist.update_traces(hovertemplate="<b>Dias de Atraso:</b> %{x}<br><b>Qtd Boletos:</b> %{y}<extra></extra>")
-fig_hist.update_layout(
-    title_x=0.5,
-    xaxis_title="Dias de Atraso",
-    yaxis_title="Quantidade de Boletos",
-    title_font=dict(color="#3f796c", size=18),
-    font=dict(color="#002873", size=13),
-    plot_bgcolor="white",
-    paper_bgcolor="white"
-)
-st.plotly_chart(fig_hist, use_container_width=True, key="grafico_distribuicao_atraso")
 
-# ============================================================
-# 📝 AVISO SOBRE O INTERVALO DOS BINS
-# ============================================================
-st.markdown("""
-<div class='intro-box'>
-ℹ️ **Observação:** Os intervalos do histograma estão definidos automaticamente (aproximadamente de 9 em 9 dias).  
-Isso significa que cada barra representa a quantidade de boletos com atraso dentro de uma faixa de ~9 dias.
-</div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+# Trocar o indicador reexecuta só o gráfico; a associação com a base auxiliar já vem pronta
+@perfil.fragmento
+def inadimplencia_por_risco():
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.write("🏦 **Inadimplência por Faixa de Liquidez e Materialidade do Pagador**")
+
+    perfil.secao("inadimplência por faixa de risco")
+    rotulo = st.radio("Indicador", list(INDICADORES_RISCO), horizontal=True, key="indicador_risco")
+    resumo = consultas.inadimplencia_por_faixa(INDICADORES_RISCO[rotulo])
+    if resumo is None:
+        st.info("Base auxiliar de liquidez e materialidade não encontrada (data/base_auxiliar.csv).")
+        return
+
+    fig_risco = go.Figure(
+        go.Bar(
+            x=resumo["faixa"].astype(str),
+            y=resumo["taxa_valor"],
+            marker_color="#3f796c",
+            customdata=resumo[["taxa_qtd", "qtd_pagadores", "qtd_boletos"]],
+            hovertemplate=(
+                "<b>Faixa:</b> %{x}<br><b>Inadimplência (valor):</b> %{y:.1f}%<br>"
+                "<b>Inadimplência (qtd):</b> %{customdata[0]:.1f}%<br>"
+                "<b>Pagadores:</b> %{customdata[1]:,}<br><b>Boletos:</b> %{customdata[2]:,}<extra></extra>"
+            ),
+        )
+    )
+    fig_risco.update_layout(
+        title=f"Taxa de Inadimplência por Faixa — {rotulo}",
+        title_x=0.5,
+        xaxis_title=rotulo,
+        yaxis_title="Valor Inadimplente (%)",
+        title_font=dict(color="#3f796c", size=18),
+        font=dict(color="#002873", size=13),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        xaxis=dict(type="category"),
+    )
+    st.plotly_chart(fig_risco, use_container_width=True, key="grafico_inadimplencia_risco")
+
+    st.dataframe(
+        estilizar(
+            resumo.rename(columns={
+                "faixa": "Faixa", "qtd_pagadores": "Pagadores", "qtd_boletos": "Boletos",
+                "vlr_nominal": "Valor Emitido", "qtd_inadimplentes": "Boletos Inadimplentes",
+                "valor_devido": "Valor Inadimplente", "taxa_qtd": "Inadimplência (qtd)",
+                "taxa_valor": "Inadimplência (valor)",
+            }),
+            {"Pagadores": "inteiro", "Boletos": "inteiro", "Valor Emitido": "moeda",
+             "Boletos Inadimplentes": "inteiro", "Valor Inadimplente": "moeda",
+             "Inadimplência (qtd)": "percentual", "Inadimplência (valor)": "percentual"},
+        ),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+
+inadimplencia_por_risco()
+
+perfil.painel()
@@ -1,5 +1,8 @@
 import streamlit as st
 
+from utils.consultas import obter_consultas
+from utils.formatacao import mes_ano, moeda, numero, percentual
+
 with open("styles/style.css") as f:
     st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
 
@@ -13,26 +16,96 @@ As observações abaixo sintetizam os principais achados e direcionam os indicad
 </div>
 """, unsafe_allow_html=True)
 
+# ============================================================
+# 🔢 INDICADORES (calculados na versão atual da base)
+# ============================================================
+consultas = obter_consultas()
+kpis = consultas.kpis()
+total_boletos = kpis.total_boletos
+
+# Emissões: primeiro/último mês e os dois meses de maior volume
+emissao = consultas.contagem_emissao()
+meses_pico = emissao.nlargest(2, "qtd_boletos")["ano_mes_emissao"].sort_values()
+
+# Vencimentos e pagamentos
+vencimento = consultas.contagem_vencimento()
+meses_vencimento = vencimento["dt_vencimento"].dt.strftime("%Y-%m").unique()
+pagamentos = consultas.pagamentos_mes()
+mes_principal = pagamentos.loc[pagamentos["qtd_boletos"].idxmax()]
+pct_mes_principal = mes_principal["qtd_boletos"] / total_boletos * 100 if total_boletos > 0 else 0
+
+# Pico de pagamentos: a anomalia diária mais forte (acima do esperado) fora do mês principal
+anomalias_dia = consultas.anomalias("pagamentos_dia").reset_index()
+fora_do_mes = anomalias_dia[
+    anomalias_dia["anomalia"]
+    & (anomalias_dia["z"] > 0)
+    & (anomalias_dia["dt_pagamento"].dt.strftime("%Y-%m") != mes_principal["ano_mes_pagamento"])
+]
+dia_pico = fora_do_mes.loc[fora_do_mes["z"].idxmax()] if not fora_do_mes.empty else None
+
+# Dispersão do valor nominal (sketches de quantis)
+q1, q3, p90 = consultas.quantis_valor((0.25, 0.75, 0.9))
+
+# Espécies: as duas maiores por quantidade, com a participação de cada uma
+especies = consultas.quantis_por_segmento("tipo_especie", (0.5,))
+especies["pct_qtd"] = especies["qtd_boletos"] / especies["qtd_boletos"].sum() * 100
+principais = especies.nlargest(2, "qtd_boletos")
+
+
+def dezena_abaixo(pct):
+    """Percentual arredondado para baixo à dezena, para os textos "mais de X%"."""
+    return pct // 10 * 10
+
+
+def nome_especie(tipo):
+    sigla, _, descricao = str(tipo).partition(" ")
+    return f"{sigla} — {descricao.title()}" if descricao else sigla
+
+
+# Atrasos
+qtd_atrasados = kpis.boletos_atrasados
+pct_atrasados = qtd_atrasados / total_boletos * 100 if total_boletos > 0 else 0
+
+# Inadimplência
+segmentos_inad = consultas.quantis_por_segmento("inadimplente", (0.5, 1.0))
+inadimplentes = segmentos_inad[segmentos_inad["inadimplente"] == 1]
+qtd_inadimplentes = int(inadimplentes["qtd_boletos"].sum())
+mediana_inad = inadimplentes["p50"].iloc[0] if qtd_inadimplentes else float("nan")
+maximo_inad = inadimplentes["p100"].iloc[0] if qtd_inadimplentes else float("nan")
+taxa_valor = kpis.valor_inadimplente / kpis.valor_total_emitido * 100 if kpis.valor_total_emitido else 0
+taxa_qtd = qtd_inadimplentes / total_boletos * 100 if total_boletos > 0 else 0
+total_devido = consultas.concentracao("valor_devido")["total"]
+pct_top2 = consultas.top_inadimplentes(2)["valor_devido"].sum() / total_devido * 100 if total_devido else 0
+
 # ============================================================
 # 📆 ANÁLISES TEMPORAIS
 # ============================================================
 st.header("📆 Análises Temporais")
 
-st.markdown("""
+if len(meses_vencimento) == 1:
+    texto_vencimento = f"Todos os boletos têm **vencimento em {mes_ano(meses_vencimento[0])}** — inclusive os emitidos em anos anteriores."
+else:
+    texto_vencimento = f"Os vencimentos vão de **{mes_ano(meses_vencimento.min())}** a **{mes_ano(meses_vencimento.max())}**."
+
+texto_pico = ""
+if dia_pico is not None:
+    texto_pico = f"""
+  - Há um **pico atípico em {mes_ano(dia_pico["dt_pagamento"].strftime("%Y-%m"))}**, com concentração de pagamentos em um único dia.
+    - Mesmo sem causa clara, o evento é relevante e será destacado visualmente."""
+
+st.markdown(f"""
 - **Contagem de boletos por ano/mês de emissão**
-  - As emissões iniciam em **jan/2021**, mas **não são consistentes ao longo do tempo**, apresentando lacunas.
-  - Há uma concentração de emissões em **mar/2024 e abr/2024**, muito acima da média histórica.
-  - As emissões **encerram em mai/2024**.
+  - As emissões iniciam em **{mes_ano(emissao["ano_mes_emissao"].iloc[0])}**, mas **não são consistentes ao longo do tempo**, apresentando lacunas.
+  - Há uma concentração de emissões em **{" e ".join(mes_ano(m) for m in meses_pico)}**, muito acima da média histórica.
+  - As emissões **encerram em {mes_ano(emissao["ano_mes_emissao"].iloc[-1])}**.
 
 - **Contagem de boletos por ano/mês de vencimento**
-  - Todos os boletos têm **vencimento em mai/2024** — inclusive os emitidos em anos anteriores.
+  - {texto_vencimento}
   - Não há concentração relevante por dia específico, apenas uma leve redução em finais de semana (esperado).
   - Essa homogeneidade de vencimentos merece destaque no dashboard, pois pode indicar **padronização ou algum tipo de peculiaridade do fundo**.
 
 - **Contagem de boletos por ano/mês de pagamento**
-  - Aproximadamente **87% dos boletos** foram pagos no mesmo mês de vencimento (05/2024).
-  - Há um **pico atípico em jul/2024**, com concentração de pagamentos em um único dia.
-    - Mesmo sem causa clara, o evento é relevante e será destacado visualmente.
+  - Aproximadamente **{percentual(pct_mes_principal, 0)} dos boletos** foram pagos no mesmo mês de vencimento ({mes_principal["ano_mes_pagamento"][5:7]}/{mes_principal["ano_mes_pagamento"][:4]}).{texto_pico}
 """)
 
 # ============================================================
@@ -40,33 +113,31 @@ st.markdown("""
 # ============================================================
 st.header("💰 Análises Financeiras")
 
-st.markdown("""
+st.markdown(f"""
 - **Valores gerais**.
   - A **média e a mediana** do valor nominal são **muito diferentes**, sugerindo **alta dispersão e presença de outliers**.
   - O **desvio padrão** é elevado e, portanto, pouco representativo — optou-se por observar a **distância interquartil (IQR)** como medida robusta para a análise de dispersão:
-    - Distância interquartil: **R$ 8.971,00**
-    - Quantil 90: 47.026,45 → 90% dos boletos estão abaixo de R$ 47 mil.
-  - Existem boletos variando de **7,00** a **3.000.000,00**, evidenciando **amplitude extrema** nos valores nominais.
+    - Distância interquartil: **{moeda(q3 - q1)}**
+    - Quantil 90: {numero(p90, 2)} → 90% dos boletos estão abaixo de {moeda(p90 / 1000, 0)} mil.
+  - Existem boletos variando de **{numero(kpis.valor_minimo_nominal, 2)}** a **{numero(kpis.valor_maximo_nominal, 2)}**, evidenciando **amplitude extrema** nos valores nominais.
 
 - **Distribuição por tipo de espécie**
-  - Mais de **90%** dos boletos pertencem a duas categorias:
-    - *DM — Duplicata Mercantil (85%)*
-    - *DMI — Duplicata Mercantil Indicação (11%)*
-  - A distribuição por **valor nominal** segue o mesmo padrão da **quantidade**, reforçando a necessidade de foco nessas espécies de boletos.
+  - Mais de **{percentual(dezena_abaixo(principais["pct_qtd"].sum()), 0)}** dos boletos pertencem a duas categorias:
+{"".join(f"    - *{nome_especie(e.tipo_especie)} ({percentual(e.pct_qtd, 0)})*" + chr(10) for e in principais.itertuples())}  - A distribuição por **valor nominal** segue o mesmo padrão da **quantidade**, reforçando a necessidade de foco nessas espécies de boletos.
 
 - **Atrasos e Multas**
-  - Aproximadamente **29,3% dos boletos** foram pagos com atraso (**2087 casos**):
-    - Atraso médio: **16 dias**
-    - Mediana de atraso: **3 dias**
-    - Maior atraso: **219 dias**
-    - Valor total arrecadado em multas: **R$ 124.261,61**
+  - Aproximadamente **{percentual(pct_atrasados)} dos boletos** foram pagos com atraso (**{numero(qtd_atrasados)} casos**):
+    - Atraso médio: **{numero(kpis.media_atraso)} dias**
+    - Mediana de atraso: **{numero(kpis.mediana_atraso)} dias**
+    - Maior atraso: **{numero(kpis.max_atraso)} dias**
+    - Valor total arrecadado em multas: **{moeda(kpis.valor_total_multas)}**
 
 - **Inadimplência**
-  - Valor total inadimplente: **R$ 2.085.711.07**
-  - Quantidade de boletos inadimplentes: **70**
-  - Valor mediano dos boletos inadimplentes: **R$ 4.925,25**
-  - O maior boleto inadimplente é no valor de **R$ 400.000,00**.
+  - Valor total inadimplente: **{moeda(kpis.valor_inadimplente)}**
+  - Quantidade de boletos inadimplentes: **{numero(qtd_inadimplentes)}**
+  - Valor mediano dos boletos inadimplentes: **{moeda(mediana_inad)}**
+  - O maior boleto inadimplente é no valor de **{moeda(maximo_inad)}**.
   - **Taxas de inadimplência:**
-    - Por valor / quantidade: **1%**
-  - Um ponto interessante de observar é que temos mais de 50% do total de inadimplência concentrado em apenas 2 pagadores.
+    - Por valor / quantidade: **{percentual(taxa_valor, 0)} / {percentual(taxa_qtd, 0)}**
+  - Um ponto interessante de observar é que temos mais de {percentual(dezena_abaixo(pct_top2), 0)} do total de inadimplência concentrado em apenas 2 pagadores.
 """)
\ No newline at end of file
@@ -0,0 +1,235 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from utils.dados import carregar_indice, decodificar_ids, linhas_por_id, localizar_ids
+from utils.formatacao import estilizar
+from utils.indices import quantidades
+from utils.ranking import top_n
+
+# --- Importar CSS ---
+with open("styles/style.css") as f:
+    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+
+# --- Estilo dos cards (mesmo padrão da página financeira) ---
+st.markdown("""
+<style>
+.kpi-container {
+    display: flex;
+    flex-wrap: wrap;
+    justify-content: center;
+    gap: 20px;
+    margin-top: 25px;
+}
+.kpi-card {
+    background-color: #f8faf9;
+    border-left: 8px solid #3f796c;
+    border-radius: 15px;
+    padding: 25px 35px;
+    width: 250px;
+    box-shadow: 0 2px 6px rgba(0,0,0,0.1);
+    text-align: center;
+}
+.kpi-value {
+    font-size: 1.4rem;
+    font-weight: bold;
+    color: #002873;
+    margin-bottom: 8px;
+}
+.kpi-label {
+    font-size: 0.9rem;
+    color: #3f796c;
+    text-transform: uppercase;
+    letter-spacing: 0.6px;
+}
+</style>
+""", unsafe_allow_html=True)
+
+# --- Título principal ---
+st.markdown("<h1 style='text-align: center; color: #3f796c;'>🔍 Consulta de Pagador / Beneficiário</h1>", unsafe_allow_html=True)
+
+st.markdown("""
+<div class='intro-box'>
+Consulte o histórico completo de um pagador ou beneficiário: boletos emitidos, pagamentos, atrasos, multas e saldo em aberto.
+Cole o ID (hash) desejado ou escolha um dos IDs com mais boletos na carteira.
+</div>
+""", unsafe_allow_html=True)
+
+# ============================================================
+# 🔎 SELEÇÃO DO ID
+# ============================================================
+TIPOS = {"Pagador": "id_pagador", "Beneficiário": "id_beneficiario"}
+QTD_SUGESTOES = 50
+
+tipo = st.radio("Consultar por", list(TIPOS), horizontal=True)
+col_id = TIPOS[tipo]
+
+# As linhas de cada ID saem do índice gravado na ingestão (uma fatia por ID)
+indice = carregar_indice(col_id)
+qtd_por_codigo = quantidades(indice)
+sugestoes = top_n(qtd_por_codigo, QTD_SUGESTOES)
+rotulos_sugestoes = decodificar_ids(col_id, sugestoes)
+
+col_texto, col_lista = st.columns(2)
+with col_texto:
+    id_informado = st.text_input(f"ID do {tipo.lower()}", placeholder="Cole aqui o hash")
+with col_lista:
+    escolhido = st.selectbox(
+        f"... ou escolha entre os {len(sugestoes)} com mais boletos",
+        options=range(len(sugestoes)),
+        format_func=lambda i: f"{rotulos_sugestoes[i][:16]}… ({qtd_por_codigo[sugestoes[i]]:,} boletos)",
+        index=None,
+        placeholder="Selecione um ID",
+    )
+
+if id_informado.strip():
+    codigo = int(localizar_ids(col_id, [id_informado.strip()])[0])
+    if codigo < 0:
+        st.warning(f"{tipo} não encontrado na base.")
+        st.stop()
+elif escolhido is not None:
+    codigo = int(sugestoes[escolhido])
+else:
+    st.info("Informe ou selecione um ID para ver o histórico.")
+    st.stop()
+
+st.caption(f"{tipo}: `{decodificar_ids(col_id, [codigo])[0]}`")
+
+# ============================================================
+# 📊 BOLETOS DO ID
+# ============================================================
+boletos = linhas_por_id(col_id, codigo, [
+    "id_boleto", "id_pagador", "id_beneficiario", "dt_emissao", "dt_vencimento",
+    "dt_pagamento", "vlr_nominal", "vlr_baixa", "tipo_baixa", "tipo_especie", "inadimplente",
+]).sort_values("dt_vencimento", ascending=False)
+
+# Um código do dicionário pode ficar sem boletos (ex.: lote que trocou o pagador de todos eles)
+if boletos.empty:
+    st.info(f"Nenhum boleto encontrado para este {tipo.lower()} na versão atual da base.")
+    st.stop()
+
+pagos = boletos["vlr_baixa"].notna()
+dias_atraso = (boletos["dt_pagamento"] - boletos["dt_vencimento"]).dt.days
+atrasados = pagos & (dias_atraso > 0)
+em_aberto = boletos["inadimplente"] == 1
+
+qtd_boletos = len(boletos)
+valor_emitido = boletos["vlr_nominal"].sum()
+valor_pago = boletos["vlr_baixa"].sum()
+saldo_aberto = boletos.loc[em_aberto, "vlr_nominal"].sum()
+qtd_atrasados = int(atrasados.sum())
+media_atraso = dias_atraso[atrasados].mean() if qtd_atrasados else 0
+valor_multas = (boletos.loc[atrasados, "vlr_baixa"] - boletos.loc[atrasados, "vlr_nominal"]).sum()
+
+st.markdown(f"""
+<div class="kpi-container">
+    <div class="kpi-card">
+        <div class="kpi-value">{qtd_boletos:,}</div>
+        <div class="kpi-label">Boletos</div>
+    </div>
+    <div class="kpi-card">
+        <div class="kpi-value">R$ {valor_emitido:,.2f}</div>
+        <div class="kpi-label">Valor Emitido</div>
+    </div>
+    <div class="kpi-card">
+        <div class="kpi-value">R$ {valor_pago:,.2f}</div>
+        <div class="kpi-label">Valor Pago</div>
+    </div>
+    <div class="kpi-card">
+        <div class="kpi-value">R$ {saldo_aberto:,.2f}</div>
+        <div class="kpi-label">Saldo em Aberto ({int(em_aberto.sum())} boletos)</div>
+    </div>
+    <div class="kpi-card">
+        <div class="kpi-value">{qtd_atrasados:,} ({qtd_atrasados / qtd_boletos * 100:.1f}%)</div>
+        <div class="kpi-label">Pagos com Atraso</div>
+    </div>
+    <div class="kpi-card">
+        <div class="kpi-value">{media_atraso:.1f} dias</div>
+        <div class="kpi-label">Atraso Médio</div>
+    </div>
+    <div class="kpi-card">
+        <div class="kpi-value">R$ {valor_multas:,.2f}</div>
+        <div class="kpi-label">Valor em Multas</div>
+    </div>
+</div>
+""", unsafe_allow_html=True)
+
+# ============================================================
+# 🔸 ESPAÇAMENTO VISUAL
+# ============================================================
+st.markdown("<br><br><hr style='border: 1px solid #eaeaea'><br>", unsafe_allow_html=True)
+
+# ============================================================
+# 📅 LINHA DO TEMPO DE PAGAMENTOS
+# ============================================================
+st.subheader("📅 Linha do Tempo de Pagamentos")
+
+situacao = pd.Series("Pago em dia", index=boletos.index)
+situacao[atrasados] = "Pago com atraso"
+situacao[em_aberto] = "Em aberto"
+
+linha_tempo = pd.DataFrame({
+    # Boletos em aberto aparecem na data de vencimento
+    "data": boletos["dt_pagamento"].fillna(boletos["dt_vencimento"]),
+    "vlr_nominal": boletos["vlr_nominal"],
+    "situacao": situacao,
+    "dias_atraso": dias_atraso.fillna(0),
+})
+
+fig_linha_tempo = px.scatter(
+    linha_tempo,
+    x="data",
+    y="vlr_nominal",
+    color="situacao",
+    title="Boletos por Data de Pagamento (ou Vencimento, se em aberto)",
+    color_discrete_map={"Pago em dia": "#3f796c", "Pago com atraso": "#e0a800", "Em aberto": "#b33a3a"},
+    custom_data=["dias_atraso"],
+)
+fig_linha_tempo.update_traces(
+    marker=dict(size=9, opacity=0.8),
+    hovertemplate="<b>Data:</b> %{x|%d/%m/%Y}<br><b>Valor:</b> R$ %{y:,.2f}<br><b>Dias de atraso:</b> %{customdata[0]}<extra></extra>",
+)
+fig_linha_tempo.update_layout(
+    title_x=0.5,
+    xaxis_title="Data",
+    yaxis_title="Valor Nominal (R$)",
+    legend_title_text="Situação",
+    title_font=dict(color="#3f796c", size=18),
+    font=dict(color="#002873", size=13),
+    plot_bgcolor="white",
+    paper_bgcolor="white",
+)
+st.plotly_chart(fig_linha_tempo, use_container_width=True, key="grafico_linha_tempo_id")
+
+# ============================================================
+# 📋 HISTÓRICO DE BOLETOS
+# ============================================================
+st.subheader("📋 Histórico de Boletos")
+
+# O outro lado da relação (beneficiário de um pagador, e vice-versa)
+col_contraparte = "id_beneficiario" if col_id == "id_pagador" else "id_pagador"
+
+historico = pd.DataFrame({
+    "ID Boleto": decodificar_ids("id_boleto", boletos["id_boleto"]),
+    "ID " + ("Beneficiário" if col_contraparte == "id_beneficiario" else "Pagador"):
+        decodificar_ids(col_contraparte, boletos[col_contraparte]),
+    "Emissão": boletos["dt_emissao"].to_numpy(),
+    "Vencimento": boletos["dt_vencimento"].to_numpy(),
+    "Pagamento": boletos["dt_pagamento"].to_numpy(),
+    "Valor Nominal (R$)": boletos["vlr_nominal"].to_numpy(),
+    "Valor Baixa (R$)": boletos["vlr_baixa"].to_numpy(),
+    "Dias de Atraso": dias_atraso.where(atrasados).to_numpy(),
+    "Espécie": boletos["tipo_especie"].astype(object).to_numpy(),
+    "Situação": situacao.to_numpy(),
+})
+
+# Valores e datas seguem tipados (a grade ordena por eles); o formato é só de exibição
+st.dataframe(
+    estilizar(historico, {"Valor Nominal (R$)": "moeda", "Valor Baixa (R$)": "moeda", "Dias de Atraso": "inteiro"}),
+    use_container_width=True,
+    hide_index=True,
+    column_config={
+        coluna: st.column_config.DateColumn(format="DD/MM/YYYY")
+        for coluna in ["Emissão", "Vencimento", "Pagamento"]
+    },
+)
@@ -0,0 +1 @@
+"""Scripts auxiliares: base sintética e benchmark."""
@@ -0,0 +1,231 @@
+"""Benchmark dos blocos de cálculo das páginas, fora do Streamlit.
+
+Cada bloco (ingestão, cargas, gráficos e tabelas das páginas 2, 3 e 4,
+filtros e, se instalado, o backend DuckDB) é executado sobre uma base e
+medido em tempo de parede e pico de memória. O pico vem do ``tracemalloc``,
+que enxerga as alocações do Python e do NumPy/pandas, mas não as feitas
+internamente pelo PyArrow e pelo DuckDB.
+
+Cada base roda em um processo separado, com o armazenamento em um diretório
+temporário (ver ``DASHBOARD_CSV``/``DASHBOARD_CACHE`` em ``utils.ingestao``),
+sem tocar em ``data/cache/``. Uso (a partir da raiz do projeto)::
+
+    python -m scripts.benchmark                              # base real
+    python -m scripts.benchmark --linhas 100000 1000000      # bases sintéticas
+    python -m scripts.benchmark --csv outra.csv --saida resultados.jsonl
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def _blocos():
+    """Blocos medidos, na ordem de execução: ``(nome, função(contexto))``."""
+    from utils import ingestao, paralelo
+    from utils.agregados import COLUNAS_ORIGEM
+    from utils.consultas import SERIES_ANOMALIAS, ConsultasFiltradas, ConsultasPandas, _backends
+    from utils.downsampling import reduzir
+    from utils.filtros import Filtros, indice_filtros
+    from utils.histograma import bordas_lineares, histograma
+    from utils.sobrevivencia import SEGMENTOS
+
+    # Recorte típico da barra lateral: uma espécie, só adimplentes
+    FILTROS = Filtros(especies=("DM DUPLICATA MERCANTIL",), inadimplente=0)
+
+    def ingestao_completa(ctx):
+        ingestao.construir_armazenamento(ingestao.CAMINHO_CSV)
+
+    def carga_base(ctx):
+        ctx["base"] = ingestao.ler_base(COLUNAS_ORIGEM)
+
+    def agregados_serial(ctx):
+        paralelo.agregar(ctx["base"], kpis=True, processos=1)
+
+    def agregados_paralelo(ctx):
+        paralelo.agregar(ctx["base"], kpis=True)
+
+    def carga_agregados(ctx):
+        ctx["consultas"] = ConsultasPandas()
+
+    def p2_emissao(ctx):
+        ctx["consultas"].contagem_emissao()
+        ctx["consultas"].valor_emissao()
+
+    def p2_vencimento(ctx):
+        reduzir(ctx["consultas"].contagem_vencimento(), "dt_vencimento", "qtd_boletos", metodo="lttb")
+
+    def p2_pagamentos_mes(ctx):
+        ctx["consultas"].pagamentos_mes()
+
+    def p2_pagamentos_dia(ctx):
+        dia = ctx["consultas"].pagamentos_dia().sort_values("dt_pagamento")
+        reduzir(dia, "dt_pagamento", "qtd_boletos", metodo="min_max")
+
+    def p2_coortes(ctx):
+        ctx["consultas"].coortes()
+
+    def p2_anomalias(ctx):
+        for serie in SERIES_ANOMALIAS:
+            ctx["consultas"].anomalias(serie)
+
+    def p3_kpis(ctx):
+        ctx["consultas"].kpis()
+
+    def p3_somas(ctx):
+        ctx["consultas"].soma_por("tipo_baixa")
+        ctx["consultas"].soma_por("tipo_especie")
+
+    def p3_rankings(ctx):
+        for metrica in ("vlr_nominal", "valor_devido"):
+            ctx["consultas"].concentracao(metrica)
+        ctx["consultas"].top_pagadores(10)
+        ctx["consultas"].top_inadimplentes(10)
+
+    def p3_atrasos(ctx):
+        atrasos = ctx["consultas"].atrasos()
+        if not atrasos.empty:
+            histograma(atrasos["dias_atraso"].to_numpy(),
+                       bordas_lineares(1, int(atrasos["dias_atraso"].max()), 7),
+                       atrasos["qtd_boletos"].to_numpy())
+
+    def p3_sobrevivencia(ctx):
+        for segmento in SEGMENTOS:
+            ctx["consultas"].sobrevivencia(segmento)
+
+    def p4_quantis(ctx):
+        ctx["consultas"].quantis_valor((0.25, 0.5, 0.75, 0.9))
+        ctx["consultas"].quantis_por_segmento("tipo_especie", (0.5,))
+        ctx["consultas"].quantis_por_segmento("inadimplente", (0.5, 1.0))
+
+    def filtros_indice(ctx):
+        ctx["indice"] = indice_filtros()
+
+    def filtros_resolver(ctx):
+        ctx["indice"].resolver(FILTROS)
+
+    def filtros_reagregar(ctx):
+        consultas = ConsultasFiltradas(FILTROS)
+        consultas.kpis()
+        consultas.contagem_emissao()
+        consultas.top_pagadores(10)
+
+    blocos = [
+        ("ingestão (CSV → Parquet + agregados)", ingestao_completa),
+        ("carga da base (colunas dos agregados)", carga_base),
+        ("agregados: 1 processo", agregados_serial),
+        ("agregados: paralelo (DASHBOARD_PROCESSOS)", agregados_paralelo),
+        ("carga dos agregados", carga_agregados),
+        ("p2: emissões por mês", p2_emissao),
+        ("p2: vencimentos por dia (LTTB)", p2_vencimento),
+        ("p2: pagamentos por mês", p2_pagamentos_mes),
+        ("p2: pagamentos por dia (mín/máx)", p2_pagamentos_dia),
+        ("p2: safras de pagamento", p2_coortes),
+        ("p2: anomalias das séries", p2_anomalias),
+        ("p3: KPIs (streaming)", p3_kpis),
+        ("p3: somas por tipo", p3_somas),
+        ("p3: Top-10 e concentração", p3_rankings),
+        ("p3: atrasos e histograma", p3_atrasos),
+        ("p3: curvas de sobrevivência", p3_sobrevivencia),
+        ("p4: quantis (sketches)", p4_quantis),
+        ("filtros: montagem do índice", filtros_indice),
+        ("filtros: resolução", filtros_resolver),
+        ("filtros: reagregação", filtros_reagregar),
+    ]
+
+    if "duckdb" in _backends():
+        from utils.consultas_sql import ConsultasDuckDB
+
+        def duckdb_pagina3(ctx):
+            consultas = ConsultasDuckDB()
+            consultas.kpis()
+            consultas.soma_por("tipo_baixa")
+            consultas.soma_por("tipo_especie")
+            consultas.top_pagadores(10)
+            consultas.concentracao("vlr_nominal")
+            consultas.atrasos()
+
+        blocos.append(("duckdb: página 3", duckdb_pagina3))
+    return blocos
+
+
+def medir(repeticoes):
+    """Executa todos os blocos na base configurada e devolve os registros."""
+    # O cache do Streamlit avisa que não há sessão ativa; aqui isso é esperado
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    contexto, registros = {}, []
+    for nome, funcao in _blocos():
+        tempos = []
+        tracemalloc.start()
+        for _ in range(repeticoes):
+            tracemalloc.reset_peak()
+            inicio = time.perf_counter()
+            funcao(contexto)
+            tempos.append(time.perf_counter() - inicio)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        registros.append({"bloco": nome, "segundos": min(tempos), "pico_mb": pico / 2**20})
+    return registros
+
+
+def _rodar_base(csv, repeticoes):
+    """Mede uma base em um processo próprio, com armazenamento temporário."""
+    with tempfile.TemporaryDirectory(prefix="benchmark_") as diretorio:
+        ambiente = dict(os.environ, DASHBOARD_CSV=str(Path(csv).resolve()),
+                        DASHBOARD_CACHE=str(Path(diretorio) / "cache"),
+                        DASHBOARD_LOTES=str(Path(diretorio) / "lotes"))
+        saida = subprocess.run(
+            [sys.executable, "-m", "scripts.benchmark", "--interno", "--repeticoes", str(repeticoes)],
+            cwd=BASE_DIR, env=ambiente, capture_output=True, text=True, check=True,
+        ).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def _imprimir(csv, linhas, registros):
+    print(f"\n{csv} — {linhas:,} linhas")
+    print(f"{'bloco':<40} {'tempo (s)':>10} {'pico (MB)':>10}")
+    for r in registros:
+        print(f"{r['bloco']:<40} {r['segundos']:>10.3f} {r['pico_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede os blocos de cálculo das páginas.")
+    parser.add_argument("--csv", type=Path, nargs="*", default=[], help="bases no layout do CSV tratado")
+    parser.add_argument("--linhas", type=int, nargs="*", default=[], help="gera bases sintéticas com esses tamanhos")
+    parser.add_argument("--repeticoes", type=int, default=1, help="execuções por bloco (vale a mais rápida)")
+    parser.add_argument("--saida", type=Path, help="acrescenta os registros (JSON por linha) a este arquivo")
+    parser.add_argument("--interno", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        print(json.dumps(medir(args.repeticoes)))
+        sys.exit()
+
+    from scripts.gerar_base_sintetica import gerar_base
+
+    bases = list(args.csv)
+    with tempfile.TemporaryDirectory(prefix="sinteticas_") as diretorio:
+        for linhas in args.linhas:
+            bases.append(gerar_base(Path(diretorio) / f"sintetica_{linhas}.csv", linhas))
+        if not bases:
+            bases = [BASE_DIR / "data" / "base_tratada_nuclea.csv"]
+
+        for csv in bases:
+            registros = _rodar_base(csv, args.repeticoes)
+            with open(csv) as f:
+                linhas = sum(1 for _ in f) - 1
+            _imprimir(csv, linhas, registros)
+            if args.saida:
+                with open(args.saida, "a") as f:
+                    for r in registros:
+                        f.write(json.dumps({"base": str(csv), "linhas": linhas, **r}, ensure_ascii=False) + "\n")
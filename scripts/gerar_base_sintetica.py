@@ -0,0 +1,180 @@
+"""Gera bases sintéticas no layout de ``data/base_tratada_nuclea.csv``.
+
+As distribuições imitam as da base real:
+
+- IDs são hashes SHA-256 em hexadecimal; pagadores e beneficiários seguem
+  uma distribuição de cauda longa (poucos concentram muitos boletos);
+- espécies e tipos de baixa com as mesmas proporções (DM e DMI dominantes);
+- vencimentos concentrados em mai/2024 e emissões semanas ou meses antes;
+- valor nominal log-normal com cauda pesada;
+- cerca de 1% de inadimplência (sem pagamento, baixa nem tipo de baixa);
+- pagamentos em dia, antecipados ou com atraso de cauda longa, com multa
+  em parte dos atrasados.
+
+O arquivo é escrito em blocos de linhas, com memória constante, o que
+permite gerar bases de dezenas de milhões de linhas. Uso (a partir da raiz
+do projeto)::
+
+    python -m scripts.gerar_base_sintetica --linhas 1000000 --saida data/sintetica_1M.csv
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+TAMANHO_BLOCO = 1_000_000
+
+ESPECIES = {
+    "DM DUPLICATA MERCANTIL": 0.7768,
+    "DMI DUPLICATA MERCANTIL INDICACAO": 0.2090,
+    "DS DUPLICATA DE SERVICO": 0.0093,
+    "OUTROS": 0.0022,
+    "DSI DUPLICATA DE SERVICO INDICACAO": 0.0013,
+    "ME MENSALIDADE ESCOLAR": 0.0006,
+    "NP NOTA PROMISSORIA": 0.0004,
+    "NF NOTA FISCAL": 0.0003,
+    "CARTAO DE CREDITO": 0.0001,
+}
+
+TIPOS_BAIXA = {
+    "0 - Baixa integral interbancaria": 0.7290,
+    "1 - Baixa integral intrabancaria": 0.1589,
+    "8 - Baixa integral por solicitacao da instituicao destinataria": 0.0460,
+    "5 - Baixa integral por solicitacao do cedente": 0.0448,
+    "7 - Baixa integral por decurso de prazo": 0.0109,
+    "9 - Baixa integral interbancaria - Liquidacao via STR": 0.0057,
+    "6 - Baixa integral por envio para protesto": 0.0047,
+}
+
+TAXA_INADIMPLENCIA = 0.01
+
+# Proporções de pagamentos antecipados, em dia e com atraso
+PAGAMENTO_ANTECIPADO, PAGAMENTO_EM_DIA = 0.155, 0.545
+
+# Proporção de boletos por pagador / beneficiário distintos
+PAGADORES_POR_BOLETO, BENEFICIARIOS_POR_BOLETO = 0.5, 0.17
+
+_HEX = np.array([f"{i:02x}" for i in range(256)], dtype="S2")
+
+
+def _misturar(x):
+    """Função de mistura splitmix64, vetorizada."""
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def hashes(codigos, semente):
+    """Hashes hexadecimais de 64 caracteres, determinísticos por código.
+
+    O mesmo código gera sempre o mesmo hash, em qualquer bloco, sem manter
+    uma tabela de IDs em memória.
+    """
+    codigos = np.asarray(codigos, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        palavras = np.stack([
+            _misturar(codigos * np.uint64(4) + np.uint64(i) + np.uint64(semente) * np.uint64(1 << 40))
+            for i in range(4)
+        ], axis=1)
+    brutos = palavras.astype(">u8").view(np.uint8).reshape(len(codigos), 32)
+    return np.ascontiguousarray(_HEX[brutos]).view("S64").ravel().astype(str)
+
+
+def _cauda_longa(rng, n, distintos, concentracao):
+    """Códigos em ``[0, distintos)``: uma fração ``concentracao`` das linhas
+    vai para poucos IDs grandes (Zipf) e o resto se espalha entre todos."""
+    grandes = (rng.zipf(1.6, n) - 1) % distintos
+    espalhados = rng.integers(0, distintos, n)
+    return np.where(rng.random(n) < concentracao, grandes, espalhados)
+
+
+def _sortear(rng, opcoes, n):
+    nomes = np.array(list(opcoes), dtype=object)
+    pesos = np.array(list(opcoes.values()))
+    return nomes[rng.choice(len(nomes), size=n, p=pesos / pesos.sum())]
+
+
+def gerar_bloco(rng, inicio, n, total):
+    """Um bloco de ``n`` boletos, numerados a partir de ``inicio``."""
+    pagadores = max(1, int(total * PAGADORES_POR_BOLETO))
+    beneficiarios = max(1, int(total * BENEFICIARIOS_POR_BOLETO))
+
+    # Vencimentos: 90% em mai/2024 (menos aos fins de semana), o resto ao longo de 2024
+    vencimento = np.where(
+        rng.random(n) < 0.9,
+        np.datetime64("2024-05-01") + rng.integers(0, 31, n).astype("timedelta64[D]"),
+        np.datetime64("2024-01-01") + rng.integers(0, 366, n).astype("timedelta64[D]"),
+    )
+    fim_de_semana = pd.DatetimeIndex(vencimento).dayofweek.to_numpy() >= 5
+    vencimento = np.where(fim_de_semana & (rng.random(n) < 0.3), vencimento + np.timedelta64(2, "D"), vencimento)
+
+    # Emissão: semanas antes do vencimento, com cauda de alguns anos
+    prazo = np.minimum(rng.lognormal(np.log(45), 0.8, n), 1800).astype(np.int64)
+    emissao = vencimento - prazo.astype("timedelta64[D]")
+
+    vlr_nominal = np.round(np.maximum(rng.lognormal(np.log(1700), 2.0, n), 5.0), 2)
+
+    # Pagamento: antecipado, em dia ou atrasado (cauda longa de dias)
+    sorteio = rng.random(n)
+    dias = np.where(
+        sorteio < PAGAMENTO_ANTECIPADO, -rng.geometric(0.08, n),
+        np.where(sorteio < PAGAMENTO_ANTECIPADO + PAGAMENTO_EM_DIA, 0,
+                 np.minimum(rng.geometric(0.12, n) + (rng.random(n) < 0.03) * rng.integers(30, 220, n), 365)),
+    )
+    pagamento = vencimento + dias.astype("timedelta64[D]")
+    multa = np.where((dias > 0) & (rng.random(n) < 0.3), rng.uniform(0.0, 0.05, n), 0.0)
+    vlr_baixa = np.round(vlr_nominal * (1 + multa), 2)
+
+    inadimplente = (rng.random(n) < TAXA_INADIMPLENCIA).astype(np.int64)
+    tipo_baixa = _sortear(rng, TIPOS_BAIXA, n)
+
+    emissao = pd.Series(emissao).dt.strftime("%Y-%m-%d")
+    vencimento = pd.Series(vencimento).dt.strftime("%Y-%m-%d")
+    pagamento = pd.Series(pagamento).dt.strftime("%Y-%m-%d").where(inadimplente == 0)
+
+    return pd.DataFrame({
+        "id_boleto": hashes(np.arange(inicio, inicio + n), semente=1),
+        "id_pagador": hashes(_cauda_longa(rng, n, pagadores, 0.08), semente=2),
+        "id_beneficiario": hashes(_cauda_longa(rng, n, beneficiarios, 0.3), semente=3),
+        "dt_emissao": emissao,
+        "dt_vencimento": vencimento,
+        "dt_pagamento": pagamento,
+        "vlr_nominal": vlr_nominal,
+        "vlr_baixa": np.where(inadimplente == 0, vlr_baixa, np.nan),
+        "tipo_baixa": np.where(inadimplente == 0, tipo_baixa, None),
+        "tipo_especie": _sortear(rng, ESPECIES, n),
+        "inadimplente": inadimplente,
+        "ano_mes_emissao": emissao.str[:7],
+        # Nome da coluna como no CSV original
+        "ano_mes_vendimento": vencimento.str[:7],
+        "ano_mes_pagamento": pagamento.str[:7],
+    }, index=pd.RangeIndex(inicio, inicio + n))
+
+
+def gerar_base(caminho, linhas, semente=42, tamanho_bloco=TAMANHO_BLOCO):
+    """Escreve ``linhas`` boletos sintéticos em ``caminho``, bloco a bloco."""
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(semente)
+    with open(caminho, "w", newline="") as f:
+        for inicio in range(0, linhas, tamanho_bloco):
+            bloco = gerar_bloco(rng, inicio, min(tamanho_bloco, linhas - inicio), linhas)
+            bloco.to_csv(f, header=inicio == 0, float_format="%.2f")
+    return caminho
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera uma base sintética de boletos.")
+    parser.add_argument("--linhas", type=int, default=100_000, help="quantidade de boletos")
+    parser.add_argument("--saida", type=Path, help="CSV de saída (padrão: data/sintetica_<linhas>.csv)")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    saida = args.saida or Path("data") / f"sintetica_{args.linhas}.csv"
+    inicio = time.perf_counter()
+    gerar_base(saida, args.linhas, args.semente)
+    print(f"{args.linhas:,} linhas gravadas em {saida} ({time.perf_counter() - inicio:.1f}s)")
@@ -0,0 +1,49 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+# O armazenamento dos testes fica em um diretório temporário; as variáveis
+# precisam estar definidas antes de qualquer import de ``utils``
+_DIR_TESTES = Path(tempfile.mkdtemp(prefix="dashboard-testes-"))
+os.environ["DASHBOARD_CSV"] = str(_DIR_TESTES / "base.csv")
+os.environ["DASHBOARD_LOTES"] = str(_DIR_TESTES / "lotes")
+os.environ["DASHBOARD_CACHE"] = str(_DIR_TESTES / "cache")
+
+import pandas as pd  # noqa: E402
+import pytest  # noqa: E402
+
+from scripts.gerar_base_sintetica import gerar_base  # noqa: E402
+from utils import ingestao  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def base_sintetica():
+    """Base sintética pequena, no layout do CSV (colunas ainda como texto)."""
+    caminho = gerar_base(_DIR_TESTES / "sintetica.csv", 2000, semente=7)
+    return pd.read_csv(caminho, index_col=0, dtype=str)
+
+
+def _gravar_csv(df, caminho):
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(caminho)
+
+
+@pytest.fixture
+def armazenamento():
+    """Monta o armazenamento a partir de uma base e de lotes (frames no layout do CSV).
+
+    Devolve a versão dos dados, como ``garantir_armazenamento``.
+    """
+    def montar(base, lotes=()):
+        shutil.rmtree(ingestao.DIR_LOTES, ignore_errors=True)
+        _gravar_csv(base, ingestao.CAMINHO_CSV)
+        for i, lote in enumerate(lotes):
+            _gravar_csv(lote, ingestao.DIR_LOTES / f"lote_{i:03d}.csv")
+        return ingestao.garantir_armazenamento()
+
+    return montar
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_DIR_TESTES, ignore_errors=True)
@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from utils import sobrevivencia
+from utils.consultas import ConsultasPandas
+
+BACKENDS = [ConsultasPandas]
+try:
+    from utils.consultas_sql import ConsultasDuckDB
+except ImportError:
+    pass
+else:
+    BACKENDS.append(ConsultasDuckDB)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_sobrevivencia_por_porte_ignora_boletos_sem_pagador(backend, base_sintetica, armazenamento):
+    base = base_sintetica.copy()
+    base.iloc[[2, 8, 9], base.columns.get_loc("id_pagador")] = None
+    armazenamento(base)
+
+    curvas = backend().sobrevivencia("porte_pagador")
+    resumo = sobrevivencia.sobrevivencia_em(curvas, [0])
+    assert resumo["boletos"].sum() == base["id_pagador"].notna().sum()
+
+
+@pytest.mark.skipif(len(BACKENDS) == 1, reason="duckdb não instalado")
+def test_contagem_vencimento_igual_nos_backends(base_sintetica, armazenamento):
+    base = base_sintetica.copy()
+    base.iloc[[4, 7], base.columns.get_loc("dt_vencimento")] = None
+    armazenamento(base)
+
+    pandas, duckdb = (backend().contagem_vencimento().reset_index(drop=True) for backend in BACKENDS)
+    assert pandas["dt_vencimento"].notna().all()
+    pd.testing.assert_frame_equal(pandas, duckdb, check_dtype=False)
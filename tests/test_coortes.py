@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from utils.coortes import matriz_coortes
+from utils.datas import rotulos_mes
+
+
+def test_matriz_igual_ao_crosstab():
+    rng = np.random.default_rng(11)
+    n = 5_000
+    emissao = 650 + rng.integers(0, 24, n)
+    pagamento = emissao + rng.integers(-1, 9, n)
+    # Safra sem emissões no meio da série e boletos em aberto
+    emissao[emissao == 660] = 661
+    em_aberto = rng.random(n) < 0.1
+    mes_pagamento = pd.array(np.where(em_aberto, 0, pagamento), dtype="Int64")
+    mes_pagamento[em_aberto] = pd.NA
+
+    matriz = matriz_coortes(emissao, mes_pagamento, np.ones(n), np.ones(n))
+    obtido = matriz.pivot(index="ano_mes_emissao", columns="meses_ate_pagamento", values="qtd_boletos")
+
+    pagos = ~em_aberto
+    esperado = pd.crosstab(rotulos_mes(emissao[pagos]), np.maximum(pagamento - emissao, 0)[pagos])
+    esperado = esperado.reindex(index=obtido.index, columns=obtido.columns, fill_value=0)
+    pd.testing.assert_frame_equal(obtido, esperado, check_names=False, check_dtype=False)
+
+    # Totais da safra contam também os boletos em aberto
+    totais = matriz.groupby("ano_mes_emissao")["total_boletos"].first()
+    pd.testing.assert_series_equal(totais, pd.Series(rotulos_mes(emissao)).value_counts().sort_index(),
+                                   check_names=False, check_dtype=False)
+    assert rotulos_mes([660])[0] not in set(matriz["ano_mes_emissao"])
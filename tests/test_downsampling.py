@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import downsampling
+
+
+def _serie(n=5_000):
+    rng = np.random.default_rng(5)
+    datas = pd.date_range("2020-01-01", periods=n, freq="D").to_numpy()
+    valores = 100 + rng.normal(0, 5, n).cumsum()
+    # Pico isolado de um único dia
+    valores[n // 4] = valores.max() + 1_000
+    return datas, valores
+
+
+@pytest.mark.parametrize("limite", [10, 100, 500])
+def test_lttb_mantem_extremidades_e_maximo(limite):
+    datas, valores = _serie()
+    posicoes = downsampling.lttb(datas, valores, limite)
+    assert len(posicoes) == limite
+    assert np.all(np.diff(posicoes) > 0)
+    assert posicoes[0] == 0 and posicoes[-1] == len(valores) - 1
+    assert np.argmax(valores) in posicoes
+
+
+@pytest.mark.parametrize("limite", [10, 100, 500])
+def test_min_max_mantem_extremidades_e_extremos_globais(limite):
+    _, valores = _serie()
+    posicoes = downsampling.min_max(valores, limite)
+    assert len(posicoes) <= limite
+    assert np.all(np.diff(posicoes) > 0)
+    assert posicoes[0] == 0 and posicoes[-1] == len(valores) - 1
+    assert np.argmax(valores) in posicoes and np.argmin(valores) in posicoes
+
+
+def test_reduzir_nao_altera_series_dentro_do_limite():
+    datas, valores = _serie(300)
+    df = pd.DataFrame({"data": datas, "qtd": valores})
+    assert downsampling.reduzir(df, "data", "qtd", limite=500) is df
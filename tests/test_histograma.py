@@ -0,0 +1,31 @@
+import numpy as np
+
+from utils import histograma
+
+
+def test_faixas_fechadas_a_esquerda():
+    bordas = histograma.bordas_lineares(0, 13, 7)
+    assert bordas.tolist() == [0, 7, 14]
+
+    hist = histograma.histograma(np.array([-1, 0, 6, 7, 13, 14, 20]), bordas)
+    assert hist["inicio"].tolist() == [0, 7]
+    assert hist["fim"].tolist() == [6, 13]
+    assert hist["faixa"].tolist() == ["0–6", "7–13"]
+    # -1, 14 e 20 ficam fora das bordas
+    assert hist["quantidade"].tolist() == [2, 2]
+
+
+def test_histograma_com_pesos_e_faixa_de_um_valor():
+    hist = histograma.histograma(np.array([0, 1, 1, 3]), np.array([0, 1, 2, 4]), pesos=np.array([5, 2, 3, 7]))
+    assert hist["faixa"].tolist() == ["0", "1", "2–3"]
+    assert hist["quantidade"].tolist() == [5, 5, 7]
+
+
+def test_bordas_cobrem_o_maximo():
+    lineares = histograma.bordas_lineares(1, 100, 7)
+    assert lineares[0] == 1 and lineares[-2] <= 100 < lineares[-1]
+
+    log = histograma.bordas_log(1, 365, 12)
+    assert log[0] == 1 and log[-1] == 366
+    assert np.all(np.diff(log) > 0)
+    assert histograma.histograma(np.array([1, 365]), log)["quantidade"].sum() == 2
@@ -0,0 +1,55 @@
+import hashlib
+
+import numpy as np
+
+from utils import ids
+
+
+def _hashes(*nomes):
+    return [hashlib.sha256(nome.encode()).hexdigest() for nome in nomes]
+
+
+def test_codificar_lote_mantem_codigos_conhecidos():
+    a, b, c, d = _hashes("a", "b", "c", "d")
+    codigos, dicionario = ids.codificar([a, b, a])
+    assert dicionario.dtype == np.uint8
+    assert codigos.tolist() == [0, 1, 0]
+
+    # Segundo lote: IDs conhecidos (inclusive em maiúsculas) mantêm o código, novos vão ao final
+    codigos, dicionario = ids.codificar([c, b, d, a.upper(), c], dicionario)
+    assert codigos.tolist() == [2, 1, 3, 0, 2]
+    assert len(dicionario) == 4
+    assert ids.decodificar(dicionario, codigos).tolist() == [c, b, d, a, c]
+
+
+def test_codificar_lote_sem_novos_nao_altera_dicionario():
+    a, b = _hashes("a", "b")
+    _, dicionario = ids.codificar([a, b])
+    codigos, novo = ids.codificar([b, b, a], dicionario)
+    assert codigos.tolist() == [1, 1, 0]
+    assert np.array_equal(novo, dicionario)
+
+
+def test_codificar_lote_com_ids_nao_hexadecimais():
+    a, b = _hashes("a", "b")
+    _, dicionario = ids.codificar([a, b])
+    codigos, dicionario = ids.codificar(["x", a], dicionario)
+    assert codigos.tolist() == [2, 0]
+    assert ids.decodificar(dicionario, [0, 1, 2]).tolist() == [a, b, "x"]
+
+
+def test_codificar_normaliza_ids_em_todos_os_caminhos():
+    a, b = _hashes("a", "b")
+    # Primeira construção: maiúsculas e espaços não geram IDs duplicados
+    codigos, dicionario = ids.codificar([a, f" {a.upper()} ", None, b])
+    assert codigos.tolist() == [0, 0, -1, 1]
+    assert len(dicionario) == 2
+
+    # Lote sobre dicionário de hashes e sobre dicionário de texto
+    codigos, _ = ids.codificar([b.upper(), f"{a}\t"], dicionario)
+    assert codigos.tolist() == [1, 0]
+    codigos, dicionario = ids.codificar(["x", " X ", "Y"])
+    assert codigos.tolist() == [0, 0, 1]
+    codigos, dicionario = ids.codificar(["y ", "Z", "z"], dicionario)
+    assert codigos.tolist() == [1, 2, 2]
+    assert dicionario.tolist() == ["x", "y", "z"]
@@ -0,0 +1,18 @@
+import numpy as np
+
+from utils import indices
+
+
+def test_construir_indice_ignora_linhas_sem_id():
+    indice = indices.construir_indice(np.array([0, 2, -1, 1, 0]))
+    assert indices.posicoes(indice, 0).tolist() == [0, 4]
+    assert indices.posicoes(indice, 1).tolist() == [3]
+    assert indices.posicoes(indice, 2).tolist() == [1]
+    assert indices.quantidades(indice).tolist() == [2, 1, 1]
+    assert 2 not in indice[0]
+
+
+def test_construir_indice_so_com_linhas_sem_id():
+    ordem, deslocamentos = indices.construir_indice(np.array([-1, -1]))
+    assert len(ordem) == 0
+    assert deslocamentos.tolist() == [0]
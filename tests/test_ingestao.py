@@ -0,0 +1,52 @@
+import dataclasses
+
+import pandas as pd
+import pytest
+
+from scripts.gerar_base_sintetica import hashes
+from utils import ingestao, streaming
+from utils.agregados import AGREGADOS
+
+
+def _estado():
+    """Agregados, KPIs e base do armazenamento atual, em ordem comparável."""
+    agregados = {}
+    for agregado in AGREGADOS.values():
+        df = ingestao.ler_parquet(ingestao.caminho_agregado(agregado.nome))
+        df = df.astype({c: str for c in agregado.chaves if isinstance(df[c].dtype, pd.CategoricalDtype)})
+        agregados[agregado.nome] = df.sort_values(agregado.chaves).reset_index(drop=True)
+    base = ingestao.ler_base()
+    base = base.astype({c: str for c in ingestao.TIPOS_COLUNAS if isinstance(base[c].dtype, pd.CategoricalDtype)})
+    base = base.sort_values("id_boleto").reset_index(drop=True)
+    return agregados, dataclasses.asdict(streaming.kpis_armazenamento()), base
+
+
+def test_lote_equivale_a_reconstruir_do_zero(base_sintetica, armazenamento):
+    base = base_sintetica
+
+    # Lote: boletos já existentes com novos valores e baixa, e boletos novos
+    # (com pagadores novos e uma espécie que não existia na base)
+    atualizados = base.iloc[[0, 1, 2, 50]].copy()
+    atualizados["vlr_nominal"] = "999.99"
+    atualizados["vlr_baixa"] = "1001.00"
+    novos = base.iloc[100:110].copy()
+    novos["id_boleto"] = hashes(range(10_000, 10_010), semente=99)
+    novos.iloc[:5, novos.columns.get_loc("id_pagador")] = hashes(range(20_000, 20_005), semente=99)
+    novos["tipo_especie"] = "XX ESPECIE NOVA"
+    novos.index = range(len(base), len(base) + len(novos))
+    lote = pd.concat([atualizados, novos])
+
+    armazenamento(base, [lote])
+    incremental = _estado()
+
+    # Mesma carteira em um CSV só: atualizados no lugar, novos ao final
+    do_zero = base.copy()
+    do_zero.loc[atualizados.index] = atualizados
+    do_zero = pd.concat([do_zero, novos])
+    armazenamento(do_zero)
+    reconstruido = _estado()
+
+    for nome in AGREGADOS:
+        pd.testing.assert_frame_equal(incremental[0][nome], reconstruido[0][nome], check_dtype=False)
+    assert incremental[1] == pytest.approx(reconstruido[1])
+    pd.testing.assert_frame_equal(incremental[2], reconstruido[2], check_dtype=False)
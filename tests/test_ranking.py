@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import ranking
+
+
+@pytest.mark.parametrize("n", [1, 3, 5, 8, 20])
+def test_selecionar_igual_a_nlargest_com_empates(n):
+    df = pd.DataFrame({
+        "id_pagador": np.arange(12),
+        "vlr_nominal": [5.0, 9.0, 5.0, np.nan, 9.0, 1.0, 5.0, 7.0, 9.0, 0.0, 5.0, np.nan],
+    })
+    # Ausentes nunca entram no ranking (o nlargest os usa para completar as N linhas)
+    esperado = df.dropna(subset=["vlr_nominal"]).nlargest(n, "vlr_nominal")
+    pd.testing.assert_frame_equal(ranking.selecionar(df, "vlr_nominal", n), esperado)
+
+
+def test_selecionar_em_vetor_aleatorio():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({"vlr_nominal": rng.integers(0, 50, 10_000).astype(np.float64)})
+    pd.testing.assert_frame_equal(ranking.selecionar(df, "vlr_nominal", 100), df.nlargest(100, "vlr_nominal"))
+
+
+@pytest.mark.parametrize("valores, hhi, gini", [
+    ([1, 1, 1, 1], 2_500, 0.0),
+    ([0, 0, 0, 10], 10_000, 0.75),
+    ([4, 1, 3, 2], 3_000, 0.25),
+])
+def test_concentracao_em_vetores_conhecidos(valores, hhi, gini):
+    resultado = ranking.concentracao(valores + [np.nan])
+    assert resultado["quantidade"] == 4
+    assert resultado["total"] == sum(valores)
+    assert resultado["hhi"] == pytest.approx(hhi)
+    assert resultado["gini"] == pytest.approx(gini, abs=1e-12)
+    lorenz = resultado["lorenz"]
+    assert lorenz["pct_valor"].iloc[0] == 0 and lorenz["pct_valor"].iloc[-1] == pytest.approx(100)
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from utils.sketch import SketchQuantis
+
+QS = np.linspace(0.0, 1.0, 21)
+
+
+def _valores(n, semente):
+    rng = np.random.default_rng(semente)
+    valores = rng.lognormal(np.log(1700), 2.0, n)
+    valores[:n // 50] = 0.0
+    return valores
+
+
+def test_quantis_exatos_abaixo_do_limite():
+    valores = _valores(5_000, 1)
+    sketch = SketchQuantis(limite_exato=10_000).adicionar(valores[:2_000]).adicionar(valores[2_000:])
+    assert sketch.exato
+    np.testing.assert_allclose(sketch.quantis(QS), np.quantile(valores, QS))
+
+
+@pytest.mark.parametrize("alfa", [0.001, 0.01])
+def test_quantis_acima_do_limite_com_erro_relativo_alfa(alfa):
+    valores = _valores(50_000, 2)
+    sketch = SketchQuantis(alfa=alfa, limite_exato=1_000)
+    for bloco in np.array_split(valores, 10):
+        sketch.adicionar(bloco)
+    assert not sketch.exato
+    assert sketch.contagem == len(valores)
+
+    # O sketch devolve um valor da amostra (o de posição inferior), com erro relativo até alfa
+    exatos = np.quantile(valores, QS, method="lower")
+    np.testing.assert_allclose(sketch.quantis(QS), exatos, rtol=alfa * (1 + 1e-9), atol=0)
+
+
+@pytest.mark.parametrize("tamanhos", [(300, 400, 500), (1_000, 800, 1_200)])
+def test_mesclar_e_associativo(tamanhos):
+    # Com limite 1.500, o segundo caso mistura sketches exatos e em bins
+    def sketches():
+        return [SketchQuantis(limite_exato=1_500).adicionar(_valores(n, i)) for i, n in enumerate(tamanhos)]
+
+    a, b, c = sketches()
+    esquerda = a.mesclar(b).mesclar(c)
+    a, b, c = sketches()
+    direita = a.mesclar(b.mesclar(c))
+
+    assert esquerda.exato == direita.exato
+    assert esquerda.contagem == direita.contagem == sum(tamanhos)
+    np.testing.assert_array_equal(esquerda.quantis(QS), direita.quantis(QS))
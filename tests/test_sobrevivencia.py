@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import sobrevivencia
+
+
+def test_kaplan_meier_igual_a_curva_calculada_a_mao():
+    grupos = np.array(["A", "A", "A", "A", "A", "B", "B", None], dtype=object)
+    dias = [1, 2, 2, 3, 5, 0, 0, 4]
+    pago = [True, True, False, True, False, True, False, True]
+    pesos = [1, 1, 1, 1, 1, 3, 1, 1]
+    curvas = sobrevivencia.kaplan_meier(grupos, dias, pago, pesos)
+
+    # A: 5 em risco no dia 1 (1 pago), 4 no dia 2 (1 pago, 1 censurado),
+    # 2 no dia 3 (1 pago) e 1 no dia 5 (censurado). B: 4 boletos no dia 0, 3 pagos.
+    esperado = pd.DataFrame({
+        "grupo": ["A", "A", "A", "A", "B"],
+        "dias": [1, 2, 3, 5, 0],
+        "em_risco": [5, 4, 2, 1, 4],
+        "pagos": [1, 1, 1, 0, 3],
+        "sobrevivencia": [4 / 5, 4 / 5 * 3 / 4, 4 / 5 * 3 / 4 * 1 / 2, 4 / 5 * 3 / 4 * 1 / 2, 1 / 4],
+    })
+    pd.testing.assert_frame_equal(curvas, esperado, check_dtype=False)
+
+    resumo = sobrevivencia.sobrevivencia_em(curvas, [0, 2, 10])
+    assert resumo["boletos"].tolist() == [5, 4]
+    np.testing.assert_allclose(resumo[["d0", "d2", "d10"]].to_numpy(), [[1.0, 0.6, 0.3], [0.25, 0.25, 0.25]])
+
+
+def test_tempos_pagamento_censura_na_data_de_corte():
+    vencimento = pd.to_datetime(["2024-05-10", "2024-05-10", "2024-05-10"])
+    pagamento = pd.to_datetime(["2024-05-08", "2024-05-15", None])
+    dias, pago = sobrevivencia.tempos_pagamento(vencimento, pagamento, pd.Timestamp("2024-05-31"))
+    assert dias.tolist() == [0, 5, 21]
+    assert pago.tolist() == [True, True, False]
+
+
+def test_porte_pagador_por_faixa():
+    porte = sobrevivencia.porte_pagador([0, 1, 2, 10, 11, 100, 101])
+    assert pd.isna(porte[0])
+    assert list(porte[1:]) == ["1 boleto", "2 a 10 boletos", "2 a 10 boletos", "11 a 100 boletos",
+                               "11 a 100 boletos", "Mais de 100 boletos"]
+
+
+@pytest.mark.parametrize("grupos", [[None, None], []])
+def test_kaplan_meier_sem_grupos(grupos):
+    grupos = np.array(grupos, dtype=object)
+    assert sobrevivencia.kaplan_meier(grupos, [1] * len(grupos), [True] * len(grupos)).empty
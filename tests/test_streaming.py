@@ -0,0 +1,24 @@
+import dataclasses
+
+import pandas as pd
+import pytest
+
+from utils import streaming
+
+
+def test_kpis_armazenamento_mantem_boletos_sem_id(base_sintetica, armazenamento, tmp_path):
+    base = base_sintetica.copy()
+    base.iloc[[3, 10], base.columns.get_loc("id_boleto")] = None
+    # Lote: atualiza dois boletos e traz mais um sem ID
+    lote = base.iloc[[0, 1, 5]].copy()
+    lote["vlr_nominal"] = "123.45"
+    lote.iloc[2, lote.columns.get_loc("id_boleto")] = None
+    armazenamento(base, [lote])
+
+    atualizados = base["id_boleto"].isin(lote["id_boleto"].dropna())
+    esperado = pd.concat([base[~atualizados], lote])
+    esperado.to_csv(tmp_path / "esperado.csv")
+
+    obtido = dataclasses.asdict(streaming.kpis_armazenamento())
+    assert obtido == pytest.approx(dataclasses.asdict(streaming.kpis_csv(tmp_path / "esperado.csv")))
+    assert obtido["total_boletos"] == len(base) + 1
@@ -0,0 +1 @@
+"""Módulos de apoio compartilhados pelas páginas do dashboard."""
@@ -0,0 +1,101 @@
+"""Agregados aditivos mantidos junto ao armazenamento da base.
+
+Cada agregado é uma tabela de chaves + medidas somáveis, calculada na
+ingestão e gravada em ``data/cache/<nome>.parquet``. Como as medidas são
+aditivas, um lote novo atualiza o agregado aplicando apenas o delta: as
+contribuições das versões anteriores dos boletos alterados são subtraídas
+e as das novas versões somadas, sem reprocessar o histórico.
+
+Todo agregado registrado precisa ter a medida ``qtd_boletos``, usada para
+descartar as células que ficam vazias após a subtração.
+"""
+
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from utils import cubo, estatisticas
+
+
+@dataclass(frozen=True)
+class Agregado:
+    nome: str
+    chaves: list
+    construir: Callable[[pd.DataFrame], pd.DataFrame]
+
+
+def construir_pagadores(df):
+    """Totais por pagador: valor emitido e valor devido pelos inadimplentes.
+
+    Boletos sem pagador (código -1) ficam de fora.
+    """
+    df = df[df["id_pagador"] >= 0]
+    inadimplente = df["inadimplente"].to_numpy() == 1
+    vlr_nominal = df["vlr_nominal"].to_numpy()
+    return (
+        pd.DataFrame({
+            "id_pagador": df["id_pagador"].to_numpy(),
+            "qtd_boletos": np.ones(len(df), dtype=np.int64),
+            "vlr_nominal": vlr_nominal,
+            "qtd_inadimplentes": inadimplente.astype(np.int64),
+            "valor_devido": np.where(inadimplente, vlr_nominal, 0.0),
+        })
+        .groupby("id_pagador", as_index=False)
+        .sum()
+    )
+
+
+# Colunas da base usadas por algum agregado
+COLUNAS_ORIGEM = list(dict.fromkeys(
+    cubo.COLUNAS_ORIGEM + ["id_pagador"] + list(estatisticas.SEGMENTOS.values())
+))
+
+AGREGADOS = {
+    a.nome: a for a in [
+        Agregado("cubo", cubo.CHAVES_CUBO, cubo.construir_cubo),
+        Agregado("pagadores", ["id_pagador"], construir_pagadores),
+    ] + [
+        Agregado(nome, [coluna, "bin"], partial(estatisticas.construir_sketch, coluna=coluna))
+        for nome, coluna in estatisticas.SEGMENTOS.items()
+    ]
+}
+
+
+def combinar(agregado, atual, removidas=None, novas=None):
+    """Aplica a ``atual`` o delta de um lote.
+
+    ``removidas`` são as versões anteriores dos boletos alterados e ``novas``
+    as linhas que passam a valer; ambas no formato da base.
+    """
+    medidas = [c for c in atual.columns if c not in agregado.chaves]
+    partes = [atual]
+    if removidas is not None and len(removidas):
+        negativo = agregado.construir(removidas)
+        negativo[medidas] = -negativo[medidas]
+        partes.append(negativo)
+    if novas is not None and len(novas):
+        partes.append(agregado.construir(novas))
+
+    return _somar(agregado, partes)
+
+
+def mesclar(agregado, parciais):
+    """Soma agregados parciais, calculados sobre partes disjuntas da base."""
+    return _somar(agregado, list(parciais))
+
+
+def _somar(agregado, partes):
+    df = pd.concat(partes, ignore_index=True)
+    # Categorias diferentes entre as partes viram object no concat
+    categoricas = {c: "category" for c in agregado.chaves
+                   if isinstance(partes[0][c].dtype, pd.CategoricalDtype)}
+    df = df.astype(categoricas)
+
+    df = (
+        df.groupby(agregado.chaves, as_index=False, dropna=False, observed=True)
+          .sum(min_count=0)
+    )
+    return df[df["qtd_boletos"] != 0].reset_index(drop=True)
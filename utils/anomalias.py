@@ -0,0 +1,116 @@
+"""Detecção de anomalias nas séries diárias e mensais da página temporal.
+
+Cada série é completada com zeros nos dias (ou meses) sem movimento e
+ajustada sobre a raiz quadrada dos valores, que estabiliza a variância de
+contagens. As séries diárias são decompostas por STL (``statsmodels``), com
+ajuste robusto e sazonalidade semanal; as mensais têm poucos anos e muitas
+lacunas para estimar uma sazonalidade anual, e usam só a tendência (mediana
+móvel de 13 meses). Os resíduos são padronizados por um z-score robusto
+(mediana e MAD em uma janela móvel, pois o volume muda muito ao longo da
+série) e os pontos com ``|z|`` acima de ``LIMIAR_Z`` são anomalias.
+
+A detecção é incremental: com a detecção da versão anterior da série, só o
+trecho a partir do primeiro ponto alterado (mais uma janela de contexto) é
+reajustado; o ajuste do histórico anterior é reaproveitado.
+"""
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.seasonal import STL
+
+# Período sazonal de cada frequência
+PERIODOS = {"diaria": 7, "mensal": 12}
+
+# |z| robusto a partir do qual um ponto é anomalia (Iglewicz e Hoaglin)
+LIMIAR_Z = 3.5
+
+# Escala mínima dos resíduos (na raiz quadrada): variações de poucos boletos não são anomalias
+ESCALA_MINIMA = 1.0
+
+# Janela da escala local dos resíduos, em períodos
+PERIODOS_ESCALA = 4
+
+# Períodos anteriores à primeira alteração reajustados junto com ela
+PERIODOS_CONTEXTO = 6
+
+COLUNAS = ["valor", "esperado", "ajuste", "z", "anomalia"]
+
+
+def regularizar(datas, valores, frequencia):
+    """Série em grade regular (dias ou meses), com zero nos pontos ausentes.
+
+    Séries mensais chegam com rótulos "AAAA-MM" e mantêm esse índice.
+    """
+    if frequencia == "mensal":
+        meses = pd.PeriodIndex(pd.to_datetime(pd.Series(datas), format="%Y-%m"), freq="M")
+        serie = pd.Series(np.asarray(valores, dtype=np.float64), index=meses).groupby(level=0).sum()
+        grade = pd.period_range(serie.index.min(), serie.index.max(), freq="M") if len(serie) else serie.index
+        serie = serie.reindex(grade, fill_value=0.0)
+        serie.index = serie.index.strftime("%Y-%m")
+        return serie
+    serie = pd.Series(np.asarray(valores, dtype=np.float64), index=pd.DatetimeIndex(datas)).groupby(level=0).sum()
+    grade = pd.date_range(serie.index.min(), serie.index.max(), freq="D") if len(serie) else serie.index
+    return serie.reindex(grade, fill_value=0.0)
+
+
+def _ajustar(y, frequencia):
+    """Valor esperado de ``y``: STL robusto nas séries diárias, mediana móvel nas demais."""
+    periodo = PERIODOS[frequencia]
+    if frequencia == "diaria" and len(y) >= 2 * periodo + 1:
+        stl = STL(y, period=periodo, robust=True).fit()
+        return np.asarray(stl.trend + stl.seasonal)
+    janela = 2 * (periodo // 2) + 1
+    return pd.Series(y).rolling(janela, center=True, min_periods=1).median().to_numpy()
+
+
+def z_robusto(residuos, janela):
+    """z-score pela mediana e pelo MAD dos resíduos em uma janela centrada de ``janela`` pontos."""
+    desvios = residuos - np.median(residuos)
+    mad = pd.Series(np.abs(desvios)).rolling(janela, center=True, min_periods=1).median().to_numpy()
+    return desvios / np.maximum(1.4826 * mad, ESCALA_MINIMA)
+
+
+def _primeira_alteracao(anterior, serie):
+    """Posição do primeiro ponto de ``serie`` diferente da detecção anterior (ou ``None``)."""
+    if anterior is None or anterior.empty or len(serie) == 0 or anterior.index[0] != serie.index[0]:
+        return None
+    comum = min(len(anterior), len(serie))
+    diferentes = np.flatnonzero(anterior["valor"].to_numpy()[:comum] != serie.to_numpy()[:comum])
+    return int(diferentes[0]) if len(diferentes) else comum
+
+
+def detectar(serie, frequencia, anterior=None):
+    """Anomalias de ``serie`` (saída de ``regularizar``).
+
+    Com ``anterior`` (detecção de uma versão anterior da mesma série), só o
+    trecho alterado é reajustado. Retorna, por ponto, ``valor``,
+    ``esperado`` (na escala original), ``ajuste`` (o mesmo na raiz
+    quadrada), ``z`` e ``anomalia``.
+    """
+    periodo = PERIODOS[frequencia]
+    y = np.sqrt(np.maximum(serie.to_numpy(dtype=np.float64), 0))
+    if len(y) == 0:
+        return pd.DataFrame(columns=COLUNAS, index=serie.index)
+
+    alteracao = _primeira_alteracao(anterior, serie)
+    if alteracao is not None and alteracao == len(serie) == len(anterior):
+        return anterior
+    inicio = 0 if alteracao is None else max(0, alteracao - PERIODOS_CONTEXTO * periodo)
+    if inicio == 0:
+        ajuste = _ajustar(y, frequencia)
+    else:
+        # Mantém o ajuste anterior até um período antes da alteração, longe da borda da janela
+        corte = max(inicio, alteracao - periodo)
+        ajuste = np.concatenate([
+            anterior["ajuste"].to_numpy()[:corte],
+            _ajustar(y[inicio:], frequencia)[corte - inicio:],
+        ])
+
+    z = z_robusto(y - ajuste, PERIODOS_ESCALA * periodo + 1)
+    return pd.DataFrame({
+        "valor": serie.to_numpy(dtype=np.float64),
+        "esperado": np.maximum(ajuste, 0) ** 2,
+        "ajuste": ajuste,
+        "z": z,
+        "anomalia": np.abs(z) > LIMIAR_Z,
+    }, index=serie.index)
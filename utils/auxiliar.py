@@ -0,0 +1,124 @@
+"""Base auxiliar de liquidez e materialidade, associada aos pagadores e beneficiários.
+
+A base auxiliar tem uma linha por CNPJ (``id_cnpj``, no mesmo hash SHA-256
+dos IDs da base de boletos) com indicadores de liquidez, atraso e scores de
+materialidade (ver a página "Dicionário de Dados"). Ela é opcional: sem o
+arquivo ``data/base_auxiliar.csv`` (ou ``DASHBOARD_AUXILIAR``) as análises
+que dependem dela apenas deixam de ser exibidas.
+
+A junção não é um ``merge`` sobre as linhas de boletos: para cada código de
+``id_pagador`` e ``id_beneficiario`` é guardada a linha correspondente da
+base auxiliar (ou -1), montada uma vez por versão dos dados (ver
+``dados.carregar_auxiliar``). Qualquer indicador de um conjunto de códigos
+sai de duas indexações de array.
+"""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils import ids
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+CAMINHO_AUXILIAR = Path(os.environ.get("DASHBOARD_AUXILIAR", BASE_DIR / "data" / "base_auxiliar.csv"))
+
+COLUNAS_JUNCAO = ["id_pagador", "id_beneficiario"]
+
+COLUNAS_INDICADORES = [
+    "sacado_indice_liquidez_1m",
+    "cedente_indice_liquidez_1m",
+    "score_materialidade_evolucao",
+    "media_atraso_dias",
+    "indicador_liquidez_quantitativo_3m",
+    "share_vl_inad_pag_bol_6_a_15d",
+    "score_quantidade_v2",
+    "score_materialidade_v2",
+]
+
+# Faixas dos indicadores usados nas análises de risco: limites inferiores e rótulos
+FAIXAS = {
+    "sacado_indice_liquidez_1m": ([0, 0.5, 0.8, 0.95], ["Até 50%", "50% a 80%", "80% a 95%", "95% ou mais"]),
+    "score_materialidade_v2": ([0, 300, 600, 800], ["Até 300", "300 a 600", "600 a 800", "800 ou mais"]),
+}
+
+SEM_INFORMACAO = "Sem informação"
+
+
+def assinatura(caminho=CAMINHO_AUXILIAR):
+    """Data de modificação e tamanho do arquivo, ou ``None`` se ele não existir."""
+    try:
+        info = Path(caminho).stat()
+    except FileNotFoundError:
+        return None
+    return info.st_mtime_ns, info.st_size
+
+
+def ler_auxiliar(caminho=CAMINHO_AUXILIAR):
+    """Lê a base auxiliar, com um registro por ``id_cnpj`` (o último, se repetido)."""
+    df = pd.read_csv(caminho, dtype={"id_cnpj": str, "cd_cnae_prin": str, "uf": "category"})
+    for col in COLUNAS_INDICADORES:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df[~df["id_cnpj"].duplicated(keep="last")].reset_index(drop=True)
+
+
+@dataclass
+class BaseAuxiliar:
+    """Base auxiliar e, por coluna de ID, a linha dela associada a cada código."""
+
+    tabela: pd.DataFrame
+    linhas: dict
+
+    def indicador(self, coluna_id, codigos, indicador):
+        """Valores de ``indicador`` para os códigos de ``coluna_id`` (NaN sem correspondência)."""
+        linhas = self.linhas[coluna_id][np.asarray(codigos)]
+        valores = self.tabela[indicador].to_numpy(dtype=np.float64)
+        return np.where(linhas >= 0, valores[np.maximum(linhas, 0)], np.nan)
+
+    def cobertura(self, coluna_id):
+        """Fração dos IDs de ``coluna_id`` encontrados na base auxiliar."""
+        linhas = self.linhas[coluna_id]
+        return float((linhas >= 0).mean()) if len(linhas) else 0.0
+
+
+def montar(tabela, dicionarios):
+    """Associa a base auxiliar aos dicionários de IDs (``{coluna: dicionário}``)."""
+    return BaseAuxiliar(
+        tabela=tabela,
+        linhas={col: ids.juntar(dicionario, tabela["id_cnpj"]).astype(np.int32)
+                for col, dicionario in dicionarios.items()},
+    )
+
+
+def faixas(valores, indicador):
+    """Faixa de ``FAIXAS[indicador]`` de cada valor; ausentes ficam em ``SEM_INFORMACAO``."""
+    limites, rotulos = FAIXAS[indicador]
+    valores = np.asarray(valores, dtype=np.float64)
+    codigos = np.searchsorted(limites, valores, side="right") - 1
+    codigos = np.where(np.isnan(valores), len(rotulos), np.maximum(codigos, 0))
+    return pd.Categorical.from_codes(codigos, categories=rotulos + [SEM_INFORMACAO], ordered=True)
+
+
+def inadimplencia_por_faixa(pagadores, base, indicador):
+    """Boletos, valor e taxas de inadimplência por faixa de ``indicador`` do pagador.
+
+    ``pagadores`` segue o agregado de mesmo nome (``id_pagador``,
+    ``qtd_boletos``, ``vlr_nominal``, ``qtd_inadimplentes``, ``valor_devido``).
+    """
+    faixa = faixas(base.indicador("id_pagador", pagadores["id_pagador"], indicador), indicador)
+    resumo = (
+        pagadores[["qtd_boletos", "vlr_nominal", "qtd_inadimplentes", "valor_devido"]]
+            .groupby(faixa, observed=False)
+            .sum()
+            .rename_axis("faixa")
+            .reset_index()
+    )
+    resumo.insert(1, "qtd_pagadores", np.bincount(faixa.codes, minlength=len(faixa.categories)))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        resumo["taxa_qtd"] = resumo["qtd_inadimplentes"] / resumo["qtd_boletos"] * 100
+        resumo["taxa_valor"] = resumo["valor_devido"] / resumo["vlr_nominal"] * 100
+    return resumo
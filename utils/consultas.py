@@ -0,0 +1,362 @@
+"""Consultas das páginas 2 e 3, com backend selecionável.
+
+Cada cálculo exibido no dashboard (KPIs, séries mensais, somas por tipo,
+rankings e concentração de pagadores, distribuição de atrasos e quantis do
+valor nominal) é um método de um objeto de consultas. Há dois backends com a mesma interface:
+
+- ``pandas`` (padrão): responde a partir do cubo e dos agregados mantidos
+  na ingestão (ver ``utils.cubo`` e ``utils.agregados``); as métricas
+  principais são calculadas em uma passada com memória limitada (ver
+  ``utils.streaming``) e os quantis saem dos sketches por segmento (ver
+  ``utils.estatisticas``);
+- ``duckdb``: executa cada cálculo como SQL diretamente sobre as partes
+  Parquet, em um motor embarcado e multi-thread (ver ``utils.consultas_sql``).
+  Só os resultados agregados voltam para o pandas.
+
+O backend é escolhido pela variável de ambiente ``DASHBOARD_BACKEND``. Com
+filtros da barra lateral ativos (ver ``utils.filtros``), as consultas vêm de
+``ConsultasFiltradas``: as linhas selecionadas pelo índice de filtros são
+reagregadas com as mesmas funções da ingestão, em qualquer backend.
+
+Os resultados são memorizados por versão dos dados (e seleção de filtros);
+cada chamada devolve uma cópia, que as páginas podem alterar livremente. A
+detecção de anomalias das séries guarda ainda a última detecção de cada
+série entre versões, para reajustar só os dias novos (ver ``utils.anomalias``).
+"""
+
+import functools
+import os
+import threading
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import anomalias, auxiliar, cubo, estatisticas, paralelo, ranking, sobrevivencia, streaming
+from utils.dados import carregar_agregado, carregar_auxiliar, carregar_base, carregar_cubo, versao_base
+from utils.filtros import indice_filtros
+
+BACKEND_PADRAO = "pandas"
+
+# Métricas por pagador com índices de concentração
+METRICAS_PAGADOR = ("vlr_nominal", "valor_devido")
+
+# Colunas reagregadas quando há filtros ativos
+COLUNAS_FILTRADAS = cubo.COLUNAS_ORIGEM + ["id_pagador"]
+
+# Séries com detecção de anomalias: método -> (coluna de data, coluna de valor, frequência)
+SERIES_ANOMALIAS = {
+    "contagem_emissao": ("ano_mes_emissao", "qtd_boletos", "mensal"),
+    "valor_emissao": ("ano_mes_emissao", "vlr_nominal", "mensal"),
+    "pagamentos_mes": ("ano_mes_pagamento", "qtd_boletos", "mensal"),
+    "contagem_vencimento": ("dt_vencimento", "qtd_boletos", "diaria"),
+    "pagamentos_dia": ("dt_pagamento", "qtd_boletos", "diaria"),
+}
+
+# Detecções anteriores guardadas (seleções de filtros entram na conta)
+MAX_DETECCOES = 64
+
+
+def memorizar(metodo):
+    """Memoriza o resultado de um método de consultas por argumentos."""
+    @functools.wraps(metodo)
+    def envoltorio(self, *args):
+        chave = (metodo.__name__, args)
+        with self._trava:
+            if chave not in self._memo:
+                self._memo[chave] = metodo(self, *args)
+            resultado = self._memo[chave]
+        return resultado.copy() if isinstance(resultado, (pd.DataFrame, dict)) else resultado
+    return envoltorio
+
+
+class ConsultasBase(ABC):
+    """Interface comum aos backends de consultas."""
+
+    def __init__(self):
+        self._memo = {}
+        # Reentrante: um método memorizado pode usar outro (ex.: ``anomalias``)
+        self._trava = threading.RLock()
+        self._chave_series = type(self).__name__
+
+    @memorizar
+    def concentracao(self, metrica):
+        """Total, HHI, Gini e curva de Lorenz de ``metrica`` por pagador.
+
+        ``metrica`` é uma de ``METRICAS_PAGADOR``; ``valor_devido`` considera
+        apenas os pagadores com boletos inadimplentes.
+        """
+        if metrica not in METRICAS_PAGADOR:
+            raise ValueError(f"Métrica de concentração inválida: {metrica}")
+        return ranking.concentracao(self._valores_pagador(metrica))
+
+    @memorizar
+    def anomalias(self, serie):
+        """Anomalias da série ``serie`` (um método de ``SERIES_ANOMALIAS``), ver ``utils.anomalias``.
+
+        Retorna uma linha por dia (ou mês) da série completa, indexada pela
+        coluna de data, com ``valor``, ``esperado``, ``z`` e ``anomalia``.
+        """
+        coluna_data, coluna_valor, frequencia = SERIES_ANOMALIAS[serie]
+        df = getattr(self, serie)()
+        valores = anomalias.regularizar(df[coluna_data], df[coluna_valor], frequencia)
+
+        chave = (self._chave_series, serie)
+        deteccoes = _deteccoes()
+        with _trava_deteccoes:
+            anterior = deteccoes.get(chave)
+        resultado = anomalias.detectar(valores, frequencia, anterior).rename_axis(coluna_data)
+        with _trava_deteccoes:
+            deteccoes.pop(chave, None)
+            deteccoes[chave] = resultado
+            while len(deteccoes) > MAX_DETECCOES:
+                deteccoes.pop(next(iter(deteccoes)))
+        return resultado
+
+    @abstractmethod
+    def coortes(self):
+        """Matriz de safras por mês de emissão e meses até o pagamento (ver ``utils.coortes``)."""
+
+    @abstractmethod
+    def sobrevivencia(self, segmento):
+        """Curvas de Kaplan–Meier do pagamento por ``tipo_especie`` ou ``porte_pagador``.
+
+        Ver ``utils.sobrevivencia``; o porte do pagador considera a carteira toda.
+        """
+
+    def inadimplencia_por_faixa(self, indicador):
+        """Inadimplência por faixa de ``indicador`` da base auxiliar (ver ``auxiliar.FAIXAS``).
+
+        Retorna ``None`` se a base auxiliar não estiver disponível.
+        """
+        if indicador not in auxiliar.FAIXAS:
+            raise ValueError(f"Indicador sem faixas definidas: {indicador}")
+        return self._inadimplencia_por_faixa(indicador, auxiliar.assinatura())
+
+    @memorizar
+    def _inadimplencia_por_faixa(self, indicador, assinatura):
+        # A assinatura do arquivo entra na chave: trocar a base auxiliar refaz o cálculo
+        base = carregar_auxiliar()
+        if base is None:
+            return None
+        return auxiliar.inadimplencia_por_faixa(self._totais_pagador(), base, indicador)
+
+    @abstractmethod
+    def _totais_pagador(self):
+        """Totais por pagador no formato do agregado ``pagadores``."""
+
+    @abstractmethod
+    def valor_por_pagador(self):
+        """Valor nominal emitido por pagador, sem ordem."""
+
+    @abstractmethod
+    def inadimplentes(self):
+        """Pagadores com boletos inadimplentes (quantidade e valor devido), sem ordem."""
+
+    @abstractmethod
+    def _valores_pagador(self, metrica):
+        """Valores de ``metrica`` por pagador, em qualquer ordem."""
+
+    @abstractmethod
+    def quantis_valor(self, qs, coluna=None, chaves=None):
+        """Quantis do valor nominal, na carteira toda ou nos segmentos ``chaves``.
+
+        ``coluna`` é uma das colunas de ``estatisticas.SEGMENTOS``.
+        """
+
+    @abstractmethod
+    def quantis_por_segmento(self, coluna, qs):
+        """Quantidade de boletos e quantis do valor nominal por segmento."""
+
+
+class ConsultasPandas(ConsultasBase):
+    """Backend padrão: cubo e agregados pré-calculados na ingestão."""
+
+    def __init__(self):
+        super().__init__()
+        self.cubo = carregar_cubo()
+        self.pagadores = carregar_agregado("pagadores")
+
+    @memorizar
+    def kpis(self):
+        return streaming.kpis_armazenamento()
+
+    @memorizar
+    def contagem_emissao(self):
+        return cubo.contagem_emissao(self.cubo)
+
+    @memorizar
+    def valor_emissao(self):
+        return cubo.valor_emissao(self.cubo)
+
+    @memorizar
+    def contagem_vencimento(self):
+        return cubo.contagem_vencimento(self.cubo)
+
+    @memorizar
+    def pagamentos_mes(self):
+        return cubo.pagamentos_mes(self.cubo)
+
+    @memorizar
+    def pagamentos_dia(self):
+        return cubo.pagamentos_dia(self.cubo)
+
+    @memorizar
+    def soma_por(self, coluna):
+        return cubo.soma_por(self.cubo, coluna)
+
+    @memorizar
+    def coortes(self):
+        return cubo.coortes(self.cubo)
+
+    def _linhas(self, colunas):
+        """Linhas da base consideradas pelas consultas, só com ``colunas``."""
+        return carregar_base(colunas)
+
+    @memorizar
+    def sobrevivencia(self, segmento):
+        if segmento not in sobrevivencia.SEGMENTOS:
+            raise ValueError(f"Segmentação inválida: {segmento}")
+        # Data de corte da carteira toda, também com filtros ativos
+        data_corte = carregar_cubo()["dt_pagamento"].max()
+        if segmento == "tipo_especie":
+            dias, pago = sobrevivencia.tempos_pagamento(self.cubo["dt_vencimento"], self.cubo["dt_pagamento"], data_corte)
+            return sobrevivencia.kaplan_meier(self.cubo["tipo_especie"], dias, pago, self.cubo["qtd_boletos"])
+
+        pagadores = carregar_agregado("pagadores")
+        qtd_por_codigo = np.zeros(pagadores["id_pagador"].max() + 1 if len(pagadores) else 0, dtype=np.int64)
+        qtd_por_codigo[pagadores["id_pagador"].to_numpy()] = pagadores["qtd_boletos"].to_numpy()
+        linhas = self._linhas(["id_pagador", "dt_vencimento", "dt_pagamento"])
+        dias, pago = sobrevivencia.tempos_pagamento(linhas["dt_vencimento"], linhas["dt_pagamento"], data_corte)
+        # Linhas sem pagador (código -1) ficam sem porte e fora das curvas
+        codigos = linhas["id_pagador"].to_numpy()
+        qtd = np.zeros(len(codigos), dtype=np.int64)
+        qtd[codigos >= 0] = qtd_por_codigo[codigos[codigos >= 0]]
+        porte = sobrevivencia.porte_pagador(qtd)
+        return sobrevivencia.kaplan_meier(porte, dias, pago)
+
+    def _inadimplentes(self):
+        return (
+            self.pagadores.loc[self.pagadores["qtd_inadimplentes"] > 0,
+                               ["id_pagador", "qtd_inadimplentes", "valor_devido"]]
+                .rename(columns={"qtd_inadimplentes": "qtd_boletos"})
+        )
+
+    def _totais_pagador(self):
+        return self.pagadores
+
+    @memorizar
+    def valor_por_pagador(self):
+        return self.pagadores[["id_pagador", "vlr_nominal"]]
+
+    @memorizar
+    def inadimplentes(self):
+        return self._inadimplentes()
+
+    @memorizar
+    def top_pagadores(self, n):
+        return ranking.selecionar(self.pagadores[["id_pagador", "vlr_nominal"]], "vlr_nominal", n)
+
+    @memorizar
+    def top_inadimplentes(self, n):
+        return ranking.selecionar(self._inadimplentes(), "valor_devido", n)
+
+    def _valores_pagador(self, metrica):
+        if metrica == "valor_devido":
+            return self._inadimplentes()["valor_devido"].to_numpy()
+        return self.pagadores[metrica].to_numpy()
+
+    @memorizar
+    def atrasos(self):
+        return cubo.atrasos(self.cubo)
+
+    def _tabela_sketch(self, coluna):
+        # Sem segmento, qualquer tabela serve; a de inadimplência é a menor
+        coluna = coluna or "inadimplente"
+        nome = next(n for n, c in estatisticas.SEGMENTOS.items() if c == coluna)
+        return carregar_agregado(nome), coluna
+
+    def quantis_valor(self, qs, coluna=None, chaves=None):
+        tabela, coluna = self._tabela_sketch(coluna)
+        return estatisticas.quantis(tabela, qs, coluna, chaves)
+
+    @memorizar
+    def quantis_por_segmento(self, coluna, qs):
+        tabela, coluna = self._tabela_sketch(coluna)
+        return estatisticas.quantis_por_segmento(tabela, coluna, list(qs))
+
+
+class ConsultasFiltradas(ConsultasPandas):
+    """Consultas sobre as linhas selecionadas pelos filtros da barra lateral.
+
+    Cubo, pagadores e sketches são montados só com as linhas selecionadas,
+    pelas mesmas funções usadas na ingestão. Cubo, pagadores e métricas
+    principais saem de uma única passada, em paralelo para seleções grandes
+    (ver ``utils.paralelo``).
+    """
+
+    def __init__(self, filtros):
+        ConsultasBase.__init__(self)
+        self._chave_series = filtros
+        posicoes = indice_filtros().resolver(filtros)
+        self.linhas = carregar_base(COLUNAS_FILTRADAS).take(posicoes)
+        parciais = paralelo.agregar(self.linhas, ["cubo", "pagadores"], kpis=True)
+        self.cubo = parciais["cubo"]
+        self.pagadores = parciais["pagadores"]
+        self._parciais_kpi = parciais["kpis"]
+
+    @memorizar
+    def kpis(self):
+        return self._parciais_kpi.resultado()
+
+    def _linhas(self, colunas):
+        return self.linhas[colunas]
+
+    def _tabela_sketch(self, coluna):
+        coluna = coluna or "inadimplente"
+        return estatisticas.construir_sketch(self.linhas, coluna), coluna
+
+
+_trava_deteccoes = threading.Lock()
+
+
+@st.cache_resource(show_spinner=False)
+def _deteccoes():
+    """Última detecção de anomalias de cada série, preservada entre versões dos dados."""
+    return {}
+
+
+def _backends():
+    backends = {"pandas": ConsultasPandas}
+    try:
+        from utils.consultas_sql import ConsultasDuckDB
+    except ImportError:
+        pass
+    else:
+        backends["duckdb"] = ConsultasDuckDB
+    return backends
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _consultas(versao, backend):
+    return _backends()[backend]()
+
+
+@st.cache_resource(max_entries=16, show_spinner="Aplicando filtros...")
+def _consultas_filtradas(versao, filtros):
+    return ConsultasFiltradas(filtros)
+
+
+def obter_consultas(filtros=None):
+    """Retorna o objeto de consultas do backend configurado, na versão atual.
+
+    Com ``filtros`` ativos, as consultas consideram apenas as linhas selecionadas.
+    """
+    if filtros is not None and filtros.ativos:
+        return _consultas_filtradas(versao_base(), filtros)
+    backend = os.environ.get("DASHBOARD_BACKEND", BACKEND_PADRAO).lower()
+    if backend not in _backends():
+        st.warning(f"Backend '{backend}' indisponível; usando '{BACKEND_PADRAO}'.")
+        backend = BACKEND_PADRAO
+    return _consultas(versao_base(), backend)
@@ -0,0 +1,300 @@
+"""Backend de consultas em SQL sobre o armazenamento Parquet (DuckDB).
+
+Cada cálculo das páginas 2 e 3 é uma consulta SQL executada por um motor
+embarcado e multi-thread diretamente sobre as partes Parquet da base, sem
+carregar as linhas no pandas. Isso permite trabalhar com bases maiores que
+a memória e usar todos os núcleos. Tudo roda no próprio processo do
+Streamlit, sem serviço externo.
+
+Requer o pacote opcional ``duckdb``; ative com ``DASHBOARD_BACKEND=duckdb``.
+"""
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from utils import estatisticas, sobrevivencia
+from utils.consultas import ConsultasBase, memorizar
+from utils.coortes import matriz_coortes
+from utils.ingestao import caminhos_partes
+from utils.streaming import KPIs
+
+
+def _literal(texto):
+    """Literal de texto SQL, com as aspas simples escapadas."""
+    return "'" + texto.replace("'", "''") + "'"
+
+
+class ConsultasDuckDB(ConsultasBase):
+    """Backend que delega os agrupamentos ao DuckDB."""
+
+    def __init__(self):
+        super().__init__()
+        self.conexao = duckdb.connect(database=":memory:")
+
+        # Views não aceitam parâmetros: os caminhos entram como literais escapados
+        partes = ", ".join(_literal(p.as_posix()) for p in caminhos_partes())
+        if len(caminhos_partes()) == 1:
+            origem = f"SELECT * FROM read_parquet([{partes}])"
+        else:
+            # Mais de uma parte: vale a versão mais recente de cada boleto
+            origem = f"""
+                SELECT * EXCLUDE (filename)
+                FROM read_parquet([{partes}], filename = true)
+                QUALIFY id_boleto < 0 OR row_number() OVER (PARTITION BY id_boleto ORDER BY filename DESC) = 1
+            """
+        self.conexao.execute(f"CREATE VIEW boletos AS {origem}")
+        # Meses são gravados como códigos inteiros (ver utils.datas)
+        self.conexao.execute(
+            "CREATE MACRO rotulo_mes(codigo) AS strftime(DATE '1970-01-01' + to_months(codigo), '%Y-%m')"
+        )
+
+    def _sql(self, consulta, parametros=None):
+        # Cada chamada (de qualquer thread/sessão) usa seu próprio cursor, fechado ao final
+        with self.conexao.cursor() as cursor:
+            return cursor.execute(consulta, parametros).df()
+
+    @memorizar
+    def kpis(self):
+        linha = self._sql("""
+            WITH base AS (
+                SELECT *,
+                    CASE WHEN vlr_baixa IS NOT NULL AND dt_pagamento > dt_vencimento
+                         THEN date_diff('day', dt_vencimento, dt_pagamento) END AS dias_atraso
+                FROM boletos
+            )
+            SELECT
+                sum(vlr_nominal)                                   AS valor_total_emitido,
+                sum(vlr_baixa)                                     AS valor_total_baixas,
+                coalesce(sum(vlr_nominal) FILTER (inadimplente = 1), 0) AS valor_inadimplente,
+                count(*)                                           AS total_boletos,
+                count(vlr_baixa) * 100.0 / nullif(count(*), 0)     AS pct_pagos,
+                median(vlr_nominal)                                AS mediana_nominal,
+                max(vlr_nominal)                                   AS valor_maximo_nominal,
+                min(vlr_nominal)                                   AS valor_minimo_nominal,
+                count(dias_atraso)                                 AS boletos_atrasados,
+                avg(dias_atraso)                                   AS media_atraso,
+                median(dias_atraso)::DOUBLE                        AS mediana_atraso,
+                max(dias_atraso)                                   AS max_atraso,
+                coalesce(sum(vlr_baixa - vlr_nominal) FILTER (dias_atraso IS NOT NULL), 0) AS valor_total_multas
+            FROM base
+        """).astype(float).iloc[0]
+        kpis = linha.to_dict()
+        for campo in ("total_boletos", "boletos_atrasados"):
+            kpis[campo] = int(kpis[campo])
+        kpis["pct_pagos"] = kpis["pct_pagos"] if kpis["total_boletos"] > 0 else 0
+        return KPIs(**kpis)
+
+    @memorizar
+    def contagem_emissao(self):
+        return self._sql("""
+            SELECT rotulo_mes(ano_mes_emissao) AS ano_mes_emissao, count(*) AS qtd_boletos
+            FROM boletos
+            WHERE dt_emissao IS NOT NULL
+            GROUP BY boletos.ano_mes_emissao
+            ORDER BY boletos.ano_mes_emissao
+        """)
+
+    @memorizar
+    def valor_emissao(self):
+        return self._sql("""
+            SELECT rotulo_mes(ano_mes_emissao) AS ano_mes_emissao, sum(vlr_nominal) AS vlr_nominal
+            FROM boletos
+            WHERE dt_emissao IS NOT NULL AND vlr_nominal IS NOT NULL
+            GROUP BY boletos.ano_mes_emissao
+            ORDER BY boletos.ano_mes_emissao
+        """)
+
+    @memorizar
+    def contagem_vencimento(self):
+        return self._sql("""
+            SELECT dt_vencimento, count(*) AS qtd_boletos
+            FROM boletos
+            WHERE dt_vencimento IS NOT NULL
+            GROUP BY ALL
+            ORDER BY dt_vencimento
+        """)
+
+    @memorizar
+    def pagamentos_mes(self):
+        return self._sql("""
+            WITH pag_mes AS (
+                SELECT ano_mes_pagamento, count(*) AS qtd_boletos
+                FROM boletos
+                WHERE dt_pagamento IS NOT NULL
+                GROUP BY 1
+            )
+            SELECT
+                rotulo_mes(ano_mes_pagamento) AS ano_mes_pagamento,
+                qtd_boletos,
+                sum(qtd_boletos) OVER (ORDER BY ano_mes_pagamento) * 100.0
+                    / sum(qtd_boletos) OVER () AS pct_acumulado
+            FROM pag_mes
+            ORDER BY pag_mes.ano_mes_pagamento
+        """)
+
+    @memorizar
+    def pagamentos_dia(self):
+        return self._sql("""
+            SELECT dt_pagamento, count(*) AS qtd_boletos
+            FROM boletos
+            WHERE dt_pagamento IS NOT NULL
+            GROUP BY ALL
+            ORDER BY dt_pagamento DESC
+        """)
+
+    @memorizar
+    def coortes(self):
+        celulas = self._sql("""
+            SELECT ano_mes_emissao, ano_mes_pagamento, count(*) AS qtd_boletos, sum(vlr_nominal) AS vlr_nominal
+            FROM boletos
+            GROUP BY ALL
+        """)
+        return matriz_coortes(celulas["ano_mes_emissao"], celulas["ano_mes_pagamento"],
+                              celulas["qtd_boletos"], celulas["vlr_nominal"])
+
+    @memorizar
+    def sobrevivencia(self, segmento):
+        if segmento not in sobrevivencia.SEGMENTOS:
+            raise ValueError(f"Segmentação inválida: {segmento}")
+        # O porte sai da quantidade de boletos do pagador, convertida em faixa depois
+        # (boletos sem pagador, código -1, contam 0 e ficam sem porte)
+        grupo = ("tipo_especie" if segmento == "tipo_especie"
+                 else "CASE WHEN id_pagador >= 0 THEN count(*) OVER (PARTITION BY id_pagador) ELSE 0 END")
+        celulas = self._sql(f"""
+            WITH base AS (
+                SELECT
+                    {grupo} AS grupo,
+                    greatest(date_diff('day', dt_vencimento,
+                        coalesce(dt_pagamento, (SELECT max(dt_pagamento) FROM boletos))), 0) AS dias,
+                    dt_pagamento IS NOT NULL AS pago
+                FROM boletos
+            )
+            SELECT grupo, dias, pago, count(*) AS qtd_boletos
+            FROM base
+            GROUP BY ALL
+        """)
+        grupos = celulas["grupo"]
+        if segmento == "porte_pagador":
+            grupos = sobrevivencia.porte_pagador(grupos.to_numpy())
+        return sobrevivencia.kaplan_meier(grupos, celulas["dias"], celulas["pago"], celulas["qtd_boletos"])
+
+    @memorizar
+    def soma_por(self, coluna):
+        if coluna not in ("tipo_baixa", "tipo_especie"):
+            raise ValueError(f"Coluna de agrupamento inválida: {coluna}")
+        return self._sql(f"""
+            SELECT {coluna}, sum(vlr_nominal) AS vlr_nominal
+            FROM boletos
+            WHERE {coluna} IS NOT NULL
+            GROUP BY ALL
+            ORDER BY vlr_nominal DESC
+        """)
+
+    # ORDER BY ... LIMIT vira um operador Top-N: só N linhas ficam em memória
+    @memorizar
+    def top_pagadores(self, n):
+        return self._sql("""
+            SELECT id_pagador, sum(vlr_nominal) AS vlr_nominal
+            FROM boletos
+            WHERE id_pagador >= 0
+            GROUP BY ALL
+            ORDER BY vlr_nominal DESC NULLS LAST, id_pagador
+            LIMIT $n
+        """, {"n": n})
+
+    @memorizar
+    def top_inadimplentes(self, n):
+        return self._sql("""
+            SELECT id_pagador, count(*) AS qtd_boletos, sum(vlr_nominal) AS valor_devido
+            FROM boletos
+            WHERE inadimplente = 1 AND id_pagador >= 0
+            GROUP BY ALL
+            ORDER BY valor_devido DESC NULLS LAST, id_pagador
+            LIMIT $n
+        """, {"n": n})
+
+    def _totais_pagador(self):
+        return self._sql("""
+            SELECT
+                id_pagador,
+                count(*)                                              AS qtd_boletos,
+                sum(vlr_nominal)                                      AS vlr_nominal,
+                count(*) FILTER (inadimplente = 1)                    AS qtd_inadimplentes,
+                coalesce(sum(vlr_nominal) FILTER (inadimplente = 1), 0) AS valor_devido
+            FROM boletos
+            WHERE id_pagador >= 0
+            GROUP BY ALL
+        """)
+
+    @memorizar
+    def valor_por_pagador(self):
+        return self._sql("""
+            SELECT id_pagador, sum(vlr_nominal) AS vlr_nominal
+            FROM boletos
+            WHERE id_pagador >= 0
+            GROUP BY ALL
+        """)
+
+    @memorizar
+    def inadimplentes(self):
+        return self._sql("""
+            SELECT id_pagador, count(*) AS qtd_boletos, sum(vlr_nominal) AS valor_devido
+            FROM boletos
+            WHERE inadimplente = 1 AND id_pagador >= 0
+            GROUP BY ALL
+        """)
+
+    def _valores_pagador(self, metrica):
+        filtro = "AND inadimplente = 1" if metrica == "valor_devido" else ""
+        return self._sql(f"""
+            SELECT sum(vlr_nominal) AS valor
+            FROM boletos
+            WHERE id_pagador >= 0 {filtro}
+            GROUP BY id_pagador
+        """)["valor"].to_numpy()
+
+    @memorizar
+    def atrasos(self):
+        return self._sql("""
+            SELECT
+                date_diff('day', dt_vencimento, dt_pagamento) AS dias_atraso,
+                count(*) AS qtd_boletos,
+                sum(vlr_baixa - vlr_nominal) AS vlr_diferenca_baixa
+            FROM boletos
+            WHERE dt_pagamento > dt_vencimento AND vlr_baixa IS NOT NULL
+            GROUP BY ALL
+            ORDER BY dias_atraso
+        """)
+
+    def quantis_valor(self, qs, coluna=None, chaves=None):
+        filtro = ""
+        if chaves is not None:
+            self._validar_segmento(coluna)
+            filtro = f"AND list_contains($chaves, {coluna})"
+        linha = self._sql(f"""
+            SELECT quantile_cont(vlr_nominal, $qs) AS quantis
+            FROM boletos
+            WHERE vlr_nominal IS NOT NULL {filtro}
+        """, {"qs": list(qs), **({"chaves": list(chaves)} if chaves is not None else {})})
+        quantis = linha["quantis"].iloc[0]
+        return np.full(len(qs), np.nan) if quantis is None else np.asarray(quantis, dtype=float)
+
+    @memorizar
+    def quantis_por_segmento(self, coluna, qs):
+        self._validar_segmento(coluna)
+        df = self._sql(f"""
+            SELECT {coluna}, count(*) AS qtd_boletos, quantile_cont(vlr_nominal, $qs) AS quantis
+            FROM boletos
+            WHERE vlr_nominal IS NOT NULL
+            GROUP BY ALL
+            ORDER BY {coluna}
+        """, {"qs": list(qs)})
+        valores = pd.DataFrame(df.pop("quantis").tolist(), columns=[f"p{round(q * 100):g}" for q in qs])
+        return pd.concat([df, valores], axis=1)
+
+    @staticmethod
+    def _validar_segmento(coluna):
+        # A coluna entra no SQL por interpolação; aceita só as de segmentação
+        if coluna not in estatisticas.SEGMENTOS.values():
+            raise ValueError(f"Coluna de segmentação inválida: {coluna}")
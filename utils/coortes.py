@@ -0,0 +1,73 @@
+"""Matriz de safras: mês de emissão × meses até o pagamento.
+
+Cada safra (coorte) reúne os boletos emitidos em um mês. Para cada safra e
+defasagem ``d`` (meses entre a emissão e o pagamento) a matriz guarda a
+quantidade e o valor nominal dos boletos pagos ``d`` meses depois de
+emitidos, e o percentual da safra já pago até ``d``.
+
+Os meses são os códigos inteiros de ``utils.datas``: safra e defasagem viram
+uma posição ``safra * n_defasagens + defasagem`` e cada medida sai de um
+único ``np.bincount`` sobre essas posições, sem ``pivot`` nem ``groupby``. A
+entrada pode ser o cubo (uma linha por célula, com pesos) ou linhas soltas.
+
+Boletos pagos antes do mês de emissão entram na defasagem 0. Células
+posteriores ao último mês com pagamento ainda não podem ser observadas e
+ficam com percentual ausente (o triângulo das safras recentes).
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.datas import rotulos_mes
+
+
+def matriz_coortes(mes_emissao, mes_pagamento, qtd_boletos, vlr_nominal):
+    """Quantidade, valor e percentual pago acumulado por safra e defasagem.
+
+    ``mes_emissao`` e ``mes_pagamento`` são códigos de mês (pagamento ausente
+    para boletos em aberto); ``qtd_boletos`` e ``vlr_nominal`` são os pesos
+    de cada linha. Retorna a grade completa, ordenada por safra e defasagem,
+    com ``ano_mes_emissao``, ``meses_ate_pagamento``, ``qtd_boletos``,
+    ``vlr_nominal``, ``pct_pago_acumulado`` e ``total_boletos`` (da safra).
+    """
+    emissao = pd.array(mes_emissao, dtype="Int64")
+    pagamento = pd.array(mes_pagamento, dtype="Int64")
+    qtd_boletos = np.asarray(qtd_boletos, dtype=np.float64)
+    vlr_nominal = np.nan_to_num(np.asarray(vlr_nominal, dtype=np.float64))
+
+    com_safra = ~emissao.isna()
+    if not com_safra.any():
+        return pd.DataFrame(columns=["ano_mes_emissao", "meses_ate_pagamento", "qtd_boletos",
+                                     "vlr_nominal", "pct_pago_acumulado", "total_boletos"])
+    emissao = emissao.to_numpy(dtype=np.int64, na_value=0)
+    primeira = emissao[com_safra].min()
+    safra = emissao - primeira
+    n_safras = int(safra[com_safra].max()) + 1
+
+    pago = com_safra & ~pagamento.isna()
+    pagamento = pagamento.to_numpy(dtype=np.int64, na_value=0)
+    defasagem = np.maximum(pagamento - emissao, 0)
+    n_defasagens = int(defasagem[pago].max()) + 1 if pago.any() else 1
+
+    posicao = safra[pago] * n_defasagens + defasagem[pago]
+    celulas = n_safras * n_defasagens
+    qtd = np.bincount(posicao, weights=qtd_boletos[pago], minlength=celulas).reshape(n_safras, n_defasagens)
+    valor = np.bincount(posicao, weights=vlr_nominal[pago], minlength=celulas).reshape(n_safras, n_defasagens)
+    total = np.bincount(safra[com_safra], weights=qtd_boletos[com_safra], minlength=n_safras)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct = np.cumsum(qtd, axis=1) / total[:, None] * 100
+    # Safra + defasagem além do último pagamento: ainda não observável
+    ultimo = pagamento[pago].max() - primeira if pago.any() else -1
+    pct[np.add.outer(np.arange(n_safras), np.arange(n_defasagens)) > ultimo] = np.nan
+
+    # Meses sem emissão não viram linhas da matriz
+    existentes = np.flatnonzero(total > 0)
+    return pd.DataFrame({
+        "ano_mes_emissao": np.repeat(rotulos_mes(existentes + primeira), n_defasagens),
+        "meses_ate_pagamento": np.tile(np.arange(n_defasagens), len(existentes)),
+        "qtd_boletos": qtd[existentes].ravel().astype(np.int64),
+        "vlr_nominal": valor[existentes].ravel(),
+        "pct_pago_acumulado": pct[existentes].ravel(),
+        "total_boletos": np.repeat(total[existentes].astype(np.int64), n_defasagens),
+    })
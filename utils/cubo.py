@@ -0,0 +1,131 @@
+"""Cubo de agregados pré-calculado na ingestão.
+
+O cubo agrupa os boletos por mês de emissão × data de vencimento × data de
+pagamento × tipo de baixa × tipo de espécie × inadimplência e guarda, para
+cada célula, a quantidade de boletos e as somas de valores. Todos os
+gráficos das páginas 2 e 3 que não dependem do pagador são respondidos a
+partir dele, e não das linhas brutas.
+
+Todas as medidas são aditivas: cubos de partes da base podem ser somados
+célula a célula.
+
+Os meses são códigos inteiros (ver ``utils.datas``): as consultas mensais
+agrupam pelos códigos e só o resultado recebe o rótulo ``"AAAA-MM"``.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.coortes import matriz_coortes
+from utils.datas import meses, rotulos_mes
+
+CHAVES_CUBO = [
+    "ano_mes_emissao",
+    "dt_vencimento",
+    "dt_pagamento",
+    "tipo_baixa",
+    "tipo_especie",
+    "inadimplente",
+]
+
+MEDIDAS_CUBO = ["qtd_boletos", "qtd_baixas", "vlr_nominal", "vlr_baixa", "vlr_diferenca_baixa"]
+
+COLUNAS_ORIGEM = CHAVES_CUBO + ["vlr_nominal", "vlr_baixa"]
+
+
+def construir_cubo(df):
+    """Agrega as linhas da base no nível de detalhe do cubo."""
+    medidas = pd.DataFrame({
+        "qtd_boletos": np.ones(len(df), dtype=np.int64),
+        "qtd_baixas": df["vlr_baixa"].notna().astype(np.int64).to_numpy(),
+        "vlr_nominal": df["vlr_nominal"].to_numpy(),
+        "vlr_baixa": df["vlr_baixa"].to_numpy(),
+        # Diferença paga além do nominal (multa/juros); NaN quando não há baixa
+        "vlr_diferenca_baixa": (df["vlr_baixa"] - df["vlr_nominal"]).to_numpy(),
+    }, index=df.index)
+    chaves = df[CHAVES_CUBO]
+
+    return (
+        pd.concat([chaves, medidas], axis=1)
+          .groupby(CHAVES_CUBO, as_index=False, dropna=False, observed=True)
+          .sum(min_count=0)
+    )
+
+
+# ============================================================
+# Consultas usadas pelas páginas
+# ============================================================
+
+def _por_mes(codigos, valores, coluna_mes):
+    """Soma ``valores`` por código de mês, em ordem, com o mês rotulado."""
+    por_mes = valores.groupby(codigos, sort=True).sum()
+    return pd.DataFrame({coluna_mes: rotulos_mes(por_mes.index), valores.name: por_mes.to_numpy()})
+
+
+def contagem_emissao(cubo):
+    """Quantidade de boletos por ano/mês de emissão."""
+    return _por_mes(cubo["ano_mes_emissao"], cubo["qtd_boletos"], "ano_mes_emissao")
+
+
+def valor_emissao(cubo):
+    """Valor nominal emitido por ano/mês de emissão."""
+    return _por_mes(cubo["ano_mes_emissao"], cubo["vlr_nominal"], "ano_mes_emissao")
+
+
+def contagem_vencimento(cubo):
+    """Quantidade de boletos por dia de vencimento."""
+    return (
+        cubo.groupby("dt_vencimento", as_index=False)["qtd_boletos"]
+            .sum()
+            .sort_values("dt_vencimento")
+    )
+
+
+def pagamentos_mes(cubo):
+    """Boletos pagos por ano/mês de pagamento, com percentual acumulado."""
+    pagos = cubo[cubo["dt_pagamento"].notna()]
+    pag_mes = _por_mes(meses(pagos["dt_pagamento"]), pagos["qtd_boletos"], "ano_mes_pagamento")
+    pag_mes["pct_acumulado"] = (pag_mes["qtd_boletos"].cumsum() / pag_mes["qtd_boletos"].sum()) * 100
+    return pag_mes
+
+
+def coortes(cubo):
+    """Matriz de safras (mês de emissão × meses até o pagamento) a partir das células."""
+    return matriz_coortes(cubo["ano_mes_emissao"], meses(cubo["dt_pagamento"]),
+                          cubo["qtd_boletos"], cubo["vlr_nominal"])
+
+
+def pagamentos_dia(cubo):
+    """Boletos pagos por dia de pagamento, do mais recente ao mais antigo."""
+    return (
+        cubo[cubo["dt_pagamento"].notna()]
+            .groupby("dt_pagamento", as_index=False)["qtd_boletos"]
+            .sum()
+            .sort_values("dt_pagamento", ascending=False)
+    )
+
+
+def soma_por(cubo, coluna):
+    """Valor nominal por ``tipo_baixa`` ou ``tipo_especie``, em ordem decrescente."""
+    return (
+        cubo[cubo[coluna].notna()]
+            .groupby(coluna, as_index=False, observed=True)["vlr_nominal"]
+            .sum()
+            .sort_values("vlr_nominal", ascending=False)
+    )
+
+
+def atrasos(cubo):
+    """Distribuição de dias de atraso dos boletos pagos após o vencimento.
+
+    Retorna um frame com ``dias_atraso``, ``qtd_boletos`` e
+    ``vlr_diferenca_baixa`` (uma linha por célula do cubo com atraso).
+    """
+    pagos = cubo[cubo["qtd_baixas"] > 0]
+    dias = (pagos["dt_pagamento"] - pagos["dt_vencimento"]).dt.days
+    atrasados = pagos[dias > 0]
+    return pd.DataFrame({
+        "dias_atraso": dias[dias > 0].astype(np.int64).to_numpy(),
+        "qtd_boletos": atrasados["qtd_baixas"].to_numpy(),
+        "vlr_diferenca_baixa": atrasados["vlr_diferenca_baixa"].to_numpy(),
+    })
@@ -0,0 +1,124 @@
+"""Acesso centralizado à base de boletos.
+
+A base é lida do armazenamento colunar mantido por ``utils.ingestao`` uma
+única vez por versão dos dados (CSV + lotes aplicados) e mantida em um cache de processo
+compartilhado por todas as sessões do Streamlit. Cada página pede apenas as
+colunas de que precisa. O frame devolvido é somente leitura: as páginas
+devem derivar novas colunas com ``.assign()`` ou filtros, nunca alterando o
+objeto em cache.
+
+As colunas de ID chegam como códigos inteiros; use ``decodificar_ids`` para
+obter os hashes originais apenas das linhas que serão exibidas. As linhas
+de um pagador ou beneficiário saem de ``linhas_por_id``, pelo índice
+gravado na ingestão, sem filtrar a base inteira. A base auxiliar (opcional)
+sai de ``carregar_auxiliar``, já associada aos códigos de ID.
+"""
+
+import numpy as np
+import streamlit as st
+
+from utils import auxiliar, ids, indices
+from utils.ingestao import (
+    caminho_agregado,
+    caminho_dicionario,
+    caminho_indice,
+    garantir_armazenamento,
+    ler_base,
+    ler_parquet,
+)
+
+
+def versao_base():
+    """Retorna a versão atual dos dados, atualizando o armazenamento se necessário."""
+    return garantir_armazenamento()
+
+
+def _somente_leitura(df):
+    """Bloqueia escrita nos arrays NumPy que sustentam as colunas do frame."""
+    for col in df.columns:
+        valores = df[col].values
+        if isinstance(valores, np.ndarray):
+            valores.flags.writeable = False
+    return df
+
+
+@st.cache_resource(max_entries=8, show_spinner="Carregando base de boletos...")
+def _carregar(versao, colunas):
+    return _somente_leitura(ler_base(colunas))
+
+
+def carregar_base(colunas=None):
+    """Retorna a base de boletos tipada, lida no máximo uma vez por versão.
+
+    ``colunas`` restringe a leitura às colunas informadas; ``None`` lê todas.
+    """
+    if colunas is not None:
+        colunas = tuple(colunas)
+    return _carregar(versao_base(), colunas)
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _carregar_agregado(versao, nome):
+    return _somente_leitura(ler_parquet(caminho_agregado(nome)))
+
+
+def carregar_agregado(nome):
+    """Retorna um agregado registrado em ``utils.agregados`` na versão atual."""
+    return _carregar_agregado(versao_base(), nome)
+
+
+def carregar_cubo():
+    """Retorna o cubo de agregados (ver ``utils.cubo``) da versão atual."""
+    return carregar_agregado("cubo")
+
+
+@st.cache_resource(max_entries=8)
+def _carregar_dicionario(versao, coluna):
+    return ids.ler_dicionario(caminho_dicionario(coluna))
+
+
+def decodificar_ids(coluna, codigos):
+    """Converte códigos de ``id_boleto``/``id_pagador``/``id_beneficiario`` nos IDs originais."""
+    return ids.decodificar(_carregar_dicionario(versao_base(), coluna), codigos)
+
+
+def localizar_ids(coluna, valores):
+    """Códigos dos IDs originais informados (-1 para os que não existem na base)."""
+    return ids.localizar(_carregar_dicionario(versao_base(), coluna), valores)
+
+
+def ids_com_prefixo(coluna, prefixo):
+    """Códigos dos IDs que começam por ``prefixo``."""
+    return ids.com_prefixo(_carregar_dicionario(versao_base(), coluna), prefixo)
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _carregar_indice(versao, coluna):
+    return indices.ler_indice(caminho_indice(coluna))
+
+
+def carregar_indice(coluna):
+    """Índice de linhas por código de ``id_pagador``/``id_beneficiario`` (ver ``utils.indices``)."""
+    return _carregar_indice(versao_base(), coluna)
+
+
+def linhas_por_id(coluna, codigo, colunas=None):
+    """Linhas da base cujo ``coluna`` tem o código informado."""
+    return carregar_base(colunas).take(indices.posicoes(carregar_indice(coluna), codigo))
+
+
+@st.cache_resource(max_entries=2, show_spinner="Carregando base auxiliar...")
+def _carregar_auxiliar(versao, assinatura):
+    dicionarios = {col: _carregar_dicionario(versao, col) for col in auxiliar.COLUNAS_JUNCAO}
+    return auxiliar.montar(auxiliar.ler_auxiliar(), dicionarios)
+
+
+def carregar_auxiliar():
+    """Base auxiliar associada aos pagadores e beneficiários, ou ``None`` se ela não existir.
+
+    A associação é montada uma vez por versão dos dados e do arquivo auxiliar.
+    """
+    assinatura = auxiliar.assinatura()
+    if assinatura is None:
+        return None
+    return _carregar_auxiliar(versao_base(), assinatura)
@@ -0,0 +1,35 @@
+"""Datas da base: leitura em formato fixo e meses como inteiros.
+
+As datas do CSV estão todas no formato ISO (``AAAA-MM-DD``). Informar o
+formato evita que o pandas tente adivinhá-lo linha a linha. No Parquet elas
+são gravadas como ``date32`` (número de dias desde 1970-01-01, 4 bytes) e
+voltam como ``datetime64`` na leitura (ver ``ingestao.ler_parquet``).
+
+Meses são guardados como inteiros pequenos — meses desde janeiro de 1970 —
+calculados a partir das datas, sem montar um texto ``"AAAA-MM"`` por linha.
+Os agrupamentos mensais rodam sobre esses códigos; ``rotulos_mes`` converte
+para ``"AAAA-MM"`` só o resultado já agregado.
+"""
+
+import numpy as np
+import pandas as pd
+
+FORMATO_ISO = "%Y-%m-%d"
+
+
+def ler_datas(textos):
+    """Converte textos ``AAAA-MM-DD`` em ``datetime64``; inválidos viram ``NaT``."""
+    return pd.to_datetime(textos, format=FORMATO_ISO, errors="coerce")
+
+
+def meses(datas):
+    """Mês de cada data como ``Int16`` (meses desde jan/1970); ``NaT`` vira ``<NA>``."""
+    valores = np.asarray(datas, dtype="datetime64[M]")
+    ausentes = np.isnat(valores)
+    codigos = np.where(ausentes, 0, valores.view(np.int64)).astype(np.int16)
+    return pd.Series(pd.arrays.IntegerArray(codigos, ausentes), index=getattr(datas, "index", None))
+
+
+def rotulos_mes(codigos):
+    """Converte códigos de mês em textos ``"AAAA-MM"``."""
+    return np.asarray(codigos, dtype=np.int64).astype("datetime64[M]").astype(str)
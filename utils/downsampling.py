@@ -0,0 +1,89 @@
+"""Redução de pontos das séries diárias antes de enviá-las ao gráfico.
+
+O payload do Plotly e o tempo de renderização no navegador crescem com o
+número de pontos. Acima de ``LIMITE_PONTOS``, as séries são reduzidas no
+servidor por um de dois métodos:
+
+- ``lttb`` (Largest-Triangle-Three-Buckets): divide a série em baldes e
+  escolhe, em cada um, o ponto que forma o maior triângulo com o ponto
+  escolhido no balde anterior e a média do próximo. Preserva o formato
+  visual da curva;
+- ``min_max``: mantém o mínimo e o máximo de cada balde. Garante que todo
+  pico (como uma concentração de pagamentos em um único dia) continue no
+  gráfico.
+
+O primeiro e o último ponto são sempre mantidos. Para ver a resolução
+completa, a página restringe o intervalo de datas antes de reduzir: em um
+intervalo curto a série já cabe no limite e nada é descartado.
+"""
+
+import numpy as np
+
+LIMITE_PONTOS = 500
+
+
+def _numerico(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb(x, y, limite=LIMITE_PONTOS):
+    """Posições dos pontos escolhidos pelo LTTB, em ordem crescente de ``x``."""
+    n = len(y)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+    x, y = _numerico(x), np.asarray(y, dtype=np.float64)
+
+    # Baldes internos (o primeiro e o último ponto ficam sozinhos)
+    limites = np.linspace(1, n - 1, limite - 1).astype(np.int64)
+    escolhidos = np.empty(limite, dtype=np.int64)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    anterior = 0
+    for i in range(limite - 2):
+        inicio, fim = limites[i], limites[i + 1]
+        # Média do próximo balde (ou o último ponto, no balde final)
+        prox_inicio, prox_fim = fim, limites[i + 2] if i + 2 < len(limites) else n
+        media_x = x[prox_inicio:prox_fim].mean()
+        media_y = y[prox_inicio:prox_fim].mean()
+
+        area = np.abs(
+            (x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(area))
+        escolhidos[i + 1] = anterior
+    return escolhidos
+
+
+def min_max(y, limite=LIMITE_PONTOS):
+    """Posições do mínimo e do máximo de cada balde, em ordem crescente."""
+    n = len(y)
+    if limite >= n or limite < 4:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+
+    inicios = np.linspace(0, n, (limite - 2) // 2 + 1).astype(np.int64)[:-1]
+    balde = np.repeat(np.arange(len(inicios)), np.diff(np.append(inicios, n)))
+    posicoes = []
+    for reduzir in (np.minimum, np.maximum):
+        extremo = reduzir.reduceat(y, inicios)
+        candidatos = np.flatnonzero(y == extremo[balde])
+        # Primeira ocorrência do extremo em cada balde
+        _, primeiro = np.unique(balde[candidatos], return_index=True)
+        posicoes.append(candidatos[primeiro])
+    return np.unique(np.concatenate([[0, n - 1], *posicoes]))
+
+
+def reduzir(df, coluna_x, coluna_y, limite=LIMITE_PONTOS, metodo="lttb"):
+    """Linhas de ``df`` (ordenado por ``coluna_x``) que vão para o gráfico."""
+    if len(df) <= limite:
+        return df
+    if metodo == "lttb":
+        posicoes = lttb(df[coluna_x].to_numpy(), df[coluna_y].to_numpy(), limite)
+    elif metodo == "min_max":
+        posicoes = min_max(df[coluna_y].to_numpy(), limite)
+    else:
+        raise ValueError(f"Método de redução inválido: {metodo}")
+    return df.iloc[posicoes]
@@ -0,0 +1,99 @@
+"""Estatísticas de dispersão do valor nominal por segmento, via sketches.
+
+Na ingestão, o valor nominal de cada boleto é distribuído nos bins do
+sketch de quantis (ver ``utils.sketch``) separadamente por segmento: tipo de
+espécie, mês de emissão, pagador e indicador de inadimplência. Cada tabela
+guarda, por segmento e bin, a quantidade de boletos e a soma dos valores.
+As duas medidas são aditivas, então as tabelas entram no mesmo mecanismo de
+atualização por lote dos demais agregados (ver ``utils.agregados``).
+
+Qualquer quantil — da carteira toda, de um segmento ou da união de vários
+segmentos (um filtro de meses, por exemplo) — sai de uma soma acumulada
+sobre alguns milhares de bins, sem ordenar a coluna ``vlr_nominal``. O valor
+estimado é a média do bin, que fica a no máximo ``alfa`` do valor exato e
+coincide com ele sempre que o bin tem um único valor distinto.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.sketch import ALFA_PADRAO, indices_bins
+
+# Segmentos com sketch próprio: nome do agregado -> coluna de segmentação
+SEGMENTOS = {
+    "quantis_especie": "tipo_especie",
+    "quantis_mes": "ano_mes_emissao",
+    "quantis_pagador": "id_pagador",
+    "quantis_inadimplente": "inadimplente",
+}
+
+
+def construir_sketch(df, coluna, alfa=ALFA_PADRAO):
+    """Contagem e soma de ``vlr_nominal`` por segmento e bin do sketch."""
+    validos = df[df["vlr_nominal"].notna()]
+    vlr_nominal = validos["vlr_nominal"].to_numpy()
+    return (
+        pd.DataFrame({
+            coluna: validos[coluna].to_numpy(),
+            "bin": indices_bins(vlr_nominal, alfa),
+            "qtd_boletos": np.ones(len(validos), dtype=np.int64),
+            "vlr_nominal": vlr_nominal,
+        })
+        .astype({coluna: validos[coluna].dtype})
+        .groupby([coluna, "bin"], as_index=False, dropna=False, observed=True)
+        .sum()
+    )
+
+
+def _quantis_ordenados(contagens, somas, inicio, total, qs):
+    """Quantis de grupos já ordenados por (grupo, bin), todos de uma vez.
+
+    ``inicio`` e ``total`` dão, por grupo, a contagem acumulada antes dele e
+    sua quantidade de valores. Retorna uma matriz (grupos x quantis).
+    """
+    acumulado = np.cumsum(contagens)
+    media_bin = somas / contagens
+    ultimo = len(media_bin) - 1
+
+    # Mesma interpolação linear entre postos vizinhos usada pelo pandas
+    posto = np.asarray(qs)[None, :] * (total[:, None] - 1)
+    abaixo, fracao = np.floor(posto), posto - np.floor(posto)
+    v_abaixo = media_bin[np.minimum(np.searchsorted(acumulado, inicio[:, None] + abaixo, side="right"), ultimo)]
+    v_acima = media_bin[np.minimum(np.searchsorted(acumulado, inicio[:, None] + abaixo + 1, side="right"), ultimo)]
+    return np.where(fracao > 0, v_abaixo + fracao * (v_acima - v_abaixo), v_abaixo)
+
+
+def quantis(tabela, qs, coluna=None, chaves=None):
+    """Quantis do valor nominal na união dos segmentos ``chaves``.
+
+    Sem ``chaves`` considera todos os segmentos da tabela (a carteira toda).
+    """
+    if chaves is not None:
+        tabela = tabela[tabela[coluna].isin(chaves)]
+    bins = tabela.groupby("bin")[["qtd_boletos", "vlr_nominal"]].sum().sort_index()
+    if bins.empty:
+        return np.full(len(qs), np.nan)
+    contagens = bins["qtd_boletos"].to_numpy()
+    return _quantis_ordenados(
+        contagens, bins["vlr_nominal"].to_numpy(),
+        np.array([0]), np.array([contagens.sum()]), qs,
+    )[0]
+
+
+def quantis_por_segmento(tabela, coluna, qs):
+    """Quantis do valor nominal de cada segmento, sem laço por segmento.
+
+    Retorna um frame com a coluna de segmentação, ``qtd_boletos`` e uma
+    coluna ``p<q>`` por quantil (``p50`` para a mediana, por exemplo).
+    """
+    tabela = tabela.sort_values([coluna, "bin"])
+    contagens = tabela["qtd_boletos"].to_numpy()
+    grupos = tabela.groupby(coluna, sort=False, observed=True)["qtd_boletos"].sum()
+    total = grupos.to_numpy()
+    inicio = np.concatenate([[0], np.cumsum(total)[:-1]])
+
+    valores = _quantis_ordenados(contagens, tabela["vlr_nominal"].to_numpy(), inicio, total, qs)
+    resultado = pd.DataFrame(valores, columns=[f"p{round(q * 100):g}" for q in qs])
+    resultado.insert(0, "qtd_boletos", total)
+    resultado.insert(0, coluna, grupos.index.to_numpy())
+    return resultado
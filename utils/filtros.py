@@ -0,0 +1,217 @@
+"""Filtros globais da barra lateral, resolvidos por índices pré-calculados.
+
+As páginas 2 e 3 podem ser recortadas por período de emissão, tipo de
+espécie, tipo de baixa, inadimplência e beneficiário. Para que cada mudança
+de filtro não percorra a base inteira, ``IndiceFiltros`` é montado uma única
+vez por versão dos dados:
+
+- colunas de baixa cardinalidade (espécie, baixa, inadimplência) ganham um
+  bitmap por valor, com 1 bit por linha (``np.packbits``); vários valores
+  da mesma coluna são combinados com OU e colunas diferentes com E, oito
+  linhas por operação;
+- o período de emissão usa as posições das linhas ordenadas por data: um
+  intervalo vira duas buscas binárias e uma fatia;
+- o beneficiário usa o índice de linhas gravado na ingestão (ver
+  ``utils.indices``): as linhas de um beneficiário são uma fatia.
+
+``IndiceFiltros.resolver`` devolve as posições das linhas selecionadas, que
+alimentam os mesmos agregados das páginas (ver ``ConsultasFiltradas`` em
+``utils.consultas``). A seleção fica em ``st.session_state`` e acompanha a
+navegação entre as páginas.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import indices
+from utils.dados import carregar_base, carregar_indice, localizar_ids, versao_base
+
+COLUNAS_FILTRO = ["dt_emissao", "tipo_especie", "tipo_baixa", "inadimplente"]
+
+# Colunas com um bitmap por valor
+COLUNAS_BITMAP = ["tipo_especie", "tipo_baixa", "inadimplente"]
+
+# Rótulo dos boletos ainda sem baixa no filtro de tipo de baixa
+SEM_BAIXA = "(sem baixa)"
+
+OPCOES_INADIMPLENCIA = {"Todos": None, "Inadimplentes": 1, "Adimplentes": 0}
+
+
+@dataclass(frozen=True)
+class Filtros:
+    """Seleção atual; campos vazios (ou ``None``) não filtram nada."""
+
+    periodo_emissao: Optional[tuple] = None
+    especies: tuple = ()
+    baixas: tuple = ()
+    inadimplente: Optional[int] = None
+    beneficiarios: tuple = ()
+
+    @property
+    def ativos(self):
+        return bool(
+            self.periodo_emissao or self.especies or self.baixas
+            or self.inadimplente is not None or self.beneficiarios
+        )
+
+
+class IndiceFiltros:
+    """Bitmaps e índices de posições da base, montados uma vez por versão."""
+
+    def __init__(self, df, indice_beneficiario):
+        self.linhas = len(df)
+        self.indice_beneficiario = indice_beneficiario
+
+        self.valores = {}
+        self.bitmaps = {}
+        for coluna in COLUNAS_BITMAP:
+            serie = df[coluna]
+            if coluna == "tipo_baixa":
+                serie = serie.astype(object).fillna(SEM_BAIXA)
+            codigos, valores = pd.factorize(serie, sort=True)
+            self.valores[coluna] = list(valores)
+            self.bitmaps[coluna] = {
+                valor: np.packbits(codigos == i) for i, valor in enumerate(valores)
+            }
+
+        datas = df["dt_emissao"].to_numpy(dtype="datetime64[ns]")
+        self.ordem_emissao = np.argsort(datas, kind="stable")
+        self.datas_ordenadas = datas[self.ordem_emissao]
+        validas = self.datas_ordenadas[~np.isnat(self.datas_ordenadas)]
+        self.periodo_total = (
+            (pd.Timestamp(validas[0]).date(), pd.Timestamp(validas[-1]).date()) if len(validas) else None
+        )
+
+    def _bitmap_de_posicoes(self, posicoes):
+        marcadas = np.zeros(self.linhas, dtype=bool)
+        marcadas[posicoes] = True
+        return np.packbits(marcadas)
+
+    def _bitmap_periodo(self, inicio, fim):
+        inicio = np.datetime64(pd.Timestamp(inicio), "ns")
+        fim = np.datetime64(pd.Timestamp(fim) + pd.Timedelta(days=1), "ns")
+        a, b = np.searchsorted(self.datas_ordenadas, [inicio, fim], side="left")
+        return self._bitmap_de_posicoes(self.ordem_emissao[a:b])
+
+    def _bitmap_beneficiarios(self, codigos):
+        fatias = [indices.posicoes(self.indice_beneficiario, c) for c in codigos]
+        return self._bitmap_de_posicoes(np.concatenate(fatias) if fatias else np.array([], dtype=np.int64))
+
+    def _bitmap_valores(self, coluna, valores):
+        vazio = np.zeros((self.linhas + 7) // 8, dtype=np.uint8)
+        return np.bitwise_or.reduce(
+            [self.bitmaps[coluna].get(v, vazio) for v in valores] + [vazio]
+        )
+
+    def resolver(self, filtros):
+        """Posições (ordenadas) das linhas que atendem a todos os filtros."""
+        bitmaps = []
+        if filtros.periodo_emissao:
+            bitmaps.append(self._bitmap_periodo(*filtros.periodo_emissao))
+        if filtros.especies:
+            bitmaps.append(self._bitmap_valores("tipo_especie", filtros.especies))
+        if filtros.baixas:
+            bitmaps.append(self._bitmap_valores("tipo_baixa", filtros.baixas))
+        if filtros.inadimplente is not None:
+            bitmaps.append(self._bitmap_valores("inadimplente", [filtros.inadimplente]))
+        if filtros.beneficiarios:
+            bitmaps.append(self._bitmap_beneficiarios(filtros.beneficiarios))
+
+        if not bitmaps:
+            return np.arange(self.linhas)
+        selecao = np.bitwise_and.reduce(bitmaps)
+        return np.flatnonzero(np.unpackbits(selecao, count=self.linhas))
+
+
+@st.cache_resource(max_entries=2, show_spinner="Indexando filtros...")
+def _indice(versao):
+    return IndiceFiltros(carregar_base(COLUNAS_FILTRO), carregar_indice("id_beneficiario"))
+
+
+def indice_filtros():
+    """Índice de filtros da versão atual dos dados."""
+    return _indice(versao_base())
+
+
+# ============================================================
+# Barra lateral
+# ============================================================
+
+_CHAVES_WIDGETS = ["filtro_periodo", "filtro_especies", "filtro_baixas",
+                   "filtro_inadimplencia", "filtro_beneficiarios"]
+
+
+def _preservar_widgets():
+    # O Streamlit descarta o estado dos widgets ao trocar de página; uma
+    # cópia em chaves próprias restaura a seleção na página seguinte.
+    for chave in _CHAVES_WIDGETS:
+        if chave not in st.session_state and f"_{chave}" in st.session_state:
+            st.session_state[chave] = st.session_state[f"_{chave}"]
+
+
+def _limpar():
+    for chave in _CHAVES_WIDGETS:
+        st.session_state.pop(chave, None)
+        st.session_state.pop(f"_{chave}", None)
+    st.session_state.pop("filtros", None)
+
+
+def barra_filtros():
+    """Desenha os filtros na barra lateral e retorna a seleção (``Filtros``)."""
+    indice = indice_filtros()
+    _preservar_widgets()
+
+    with st.sidebar:
+        st.markdown("### 🔎 Filtros")
+
+        periodo = None
+        if indice.periodo_total is not None:
+            # Com a seleção restaurada via session_state, o widget não recebe valor padrão
+            padrao = {} if "filtro_periodo" in st.session_state else {"value": indice.periodo_total}
+            selecionado = st.date_input(
+                "Período de emissão",
+                **padrao,
+                min_value=indice.periodo_total[0],
+                max_value=indice.periodo_total[1],
+                format="DD/MM/YYYY",
+                key="filtro_periodo",
+            )
+            # Enquanto só a data inicial foi escolhida, o período não filtra
+            if len(selecionado) == 2 and tuple(selecionado) != indice.periodo_total:
+                periodo = tuple(selecionado)
+
+        especies = st.multiselect("Tipo de espécie", indice.valores["tipo_especie"], key="filtro_especies")
+        baixas = st.multiselect("Tipo de baixa", indice.valores["tipo_baixa"], key="filtro_baixas")
+        inadimplencia = st.radio("Inadimplência", list(OPCOES_INADIMPLENCIA), horizontal=True,
+                                 key="filtro_inadimplencia")
+        texto_beneficiarios = st.text_area("Beneficiários (um ID por linha)", key="filtro_beneficiarios")
+
+        ids_informados = [v.strip() for v in texto_beneficiarios.replace(",", "\n").splitlines() if v.strip()]
+        codigos = localizar_ids("id_beneficiario", ids_informados) if ids_informados else np.array([])
+        if (codigos < 0).any():
+            st.warning(f"{int((codigos < 0).sum())} ID(s) de beneficiário não encontrado(s).")
+
+        filtros = Filtros(
+            periodo_emissao=periodo,
+            especies=tuple(especies),
+            baixas=tuple(baixas),
+            inadimplente=OPCOES_INADIMPLENCIA[inadimplencia],
+            beneficiarios=tuple(sorted(int(c) for c in codigos if c >= 0)),
+        )
+        # Beneficiários informados mas nenhum encontrado: seleção vazia, e não "todos"
+        if ids_informados and not filtros.beneficiarios:
+            filtros = replace(filtros, beneficiarios=(-1,))
+
+        if filtros.ativos:
+            selecionadas = len(indice.resolver(filtros))
+            st.caption(f"{selecionadas:,} de {indice.linhas:,} boletos selecionados".replace(",", "."))
+            st.button("Limpar filtros", on_click=_limpar)
+
+    for chave in _CHAVES_WIDGETS:
+        st.session_state[f"_{chave}"] = st.session_state[chave]
+    st.session_state["filtros"] = filtros
+    return filtros
@@ -0,0 +1,55 @@
+"""Formatação de números e datas no padrão brasileiro para os textos e tabelas do dashboard.
+
+Nas tabelas os valores continuam numéricos: ``estilizar`` só define como
+cada coluna aparece (``pandas.Styler``), e a grade ordena pelos números.
+"""
+
+import math
+
+# Formatos de coluna de ``estilizar``; "," e "." são trocados pelo padrão brasileiro
+FORMATOS = {
+    "moeda": "R$ {:,.2f}",
+    "percentual": "{:,.1f}%",
+    "inteiro": "{:,.0f}",
+    "numero": "{:,.2f}",
+}
+
+MESES = ["jan", "fev", "mar", "abr", "mai", "jun", "jul", "ago", "set", "out", "nov", "dez"]
+
+
+def numero(valor, casas=0):
+    """``1234567.891`` -> ``"1.234.567,89"`` (com ``casas=2``)."""
+    if valor is None or (isinstance(valor, float) and math.isnan(valor)):
+        return "—"
+    texto = f"{valor:,.{casas}f}"
+    return texto.replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def moeda(valor, casas=2):
+    """``8971.24`` -> ``"R$ 8.971,24"``."""
+    return f"R$ {numero(valor, casas)}"
+
+
+def percentual(valor, casas=1):
+    """Recebe o percentual já multiplicado por 100: ``29.32`` -> ``"29,3%"``."""
+    return f"{numero(valor, casas)}%"
+
+
+def mes_ano(ano_mes):
+    """``"2024-03"`` -> ``"mar/2024"``."""
+    ano, mes = str(ano_mes)[:7].split("-")
+    return f"{MESES[int(mes) - 1]}/{ano}"
+
+
+def estilizar(df, formatos):
+    """Aplica ``formatos`` (``{coluna: "moeda" | "percentual" | "inteiro" | "numero"}``) na exibição de ``df``.
+
+    Retorna um ``Styler`` para ``st.dataframe``: o texto de cada célula é
+    gerado só para as linhas exibidas, e os dados seguem numéricos.
+    """
+    estilo = df.style
+    for tipo, formato in FORMATOS.items():
+        colunas = [coluna for coluna, t in formatos.items() if t == tipo]
+        if colunas:
+            estilo = estilo.format(formato, subset=colunas, decimal=",", thousands=".", na_rep="—")
+    return estilo
@@ -0,0 +1,53 @@
+"""Histogramas calculados no servidor, com bordas explícitas.
+
+Em vez de enviar cada observação ao navegador para o Plotly agrupar, as
+contagens por faixa são calculadas aqui (uma busca binária vetorizada por
+valor) e o gráfico recebe só uma barra por faixa. O tamanho do payload fica
+constante, qualquer que seja a quantidade de observações.
+
+As bordas são inteiras e as faixas fechadas à esquerda, ``[inicio, fim)``,
+o que combina com contagens de dias. Há dois esquemas:
+
+- ``bordas_lineares``: faixas de largura fixa (por exemplo, 7 em 7 dias);
+- ``bordas_log``: faixas que crescem geometricamente, para caudas longas
+  (poucos boletos com atrasos muito grandes).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def bordas_lineares(minimo, maximo, largura):
+    """Bordas de ``minimo`` até cobrir ``maximo``, de ``largura`` em ``largura``."""
+    faixas = -(-(maximo - minimo + 1) // largura)
+    return minimo + largura * np.arange(faixas + 1, dtype=np.int64)
+
+
+def bordas_log(minimo, maximo, faixas):
+    """Até ``faixas`` faixas com largura crescente em escala logarítmica."""
+    bordas = np.geomspace(minimo, maximo + 1, faixas + 1).round().astype(np.int64)
+    return np.unique(np.append(bordas, maximo + 1))
+
+
+def histograma(valores, bordas, pesos=None):
+    """Soma dos ``pesos`` (ou contagem) por faixa ``[bordas[i], bordas[i + 1])``.
+
+    Retorna um frame com ``inicio``, ``fim`` (inclusivo), ``faixa`` (rótulo)
+    e ``quantidade``. Valores fora das bordas são ignorados.
+    """
+    valores = np.asarray(valores)
+    bordas = np.asarray(bordas, dtype=np.int64)
+    pesos = np.ones(len(valores)) if pesos is None else np.asarray(pesos)
+
+    faixa = np.searchsorted(bordas, valores, side="right") - 1
+    dentro = (faixa >= 0) & (faixa < len(bordas) - 1)
+    quantidade = np.bincount(faixa[dentro], weights=pesos[dentro], minlength=len(bordas) - 1)
+
+    inicio, fim = bordas[:-1], bordas[1:] - 1
+    rotulos = [str(a) if a == b else f"{a}–{b}" for a, b in zip(inicio, fim)]
+    return pd.DataFrame({
+        "inicio": inicio,
+        "fim": fim,
+        "faixa": rotulos,
+        "quantidade": quantidade.astype(np.asarray(pesos).dtype),
+    })
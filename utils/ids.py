@@ -0,0 +1,196 @@
+"""Codificação compacta dos IDs de boleto, pagador e beneficiário.
+
+Os IDs da base são hashes SHA-256 em hexadecimal (64 caracteres). Na
+ingestão cada ID é trocado por um código inteiro denso (``int32``) e os
+valores distintos vão para um dicionário guardado à parte. Quando todos os
+IDs são hexadecimais válidos o dicionário guarda os 32 bytes do hash, e não
+a string, o que reduz o espaço em mais de três vezes. Agrupamentos rodam
+sobre os códigos; a decodificação fica restrita às linhas exibidas.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_ID = ["id_boleto", "id_pagador", "id_beneficiario"]
+
+TAMANHO_HASH = 32  # bytes de um SHA-256
+
+
+def _empacotar(valores):
+    """Converte hashes hexadecimais em uma matriz ``uint8`` (n x 32).
+
+    Retorna ``None`` se algum valor não for um hash hexadecimal válido.
+    """
+    if len(valores) == 0:
+        return np.empty((0, TAMANHO_HASH), dtype=np.uint8)
+    if not pd.Series(valores).str.len().eq(2 * TAMANHO_HASH).all():
+        return None
+    try:
+        brutos = bytes.fromhex("".join(valores))
+    except ValueError:
+        return None
+    return np.frombuffer(brutos, dtype=np.uint8).reshape(-1, TAMANHO_HASH)
+
+
+def _normalizar(valores):
+    """IDs sem espaços nas pontas e em minúsculas; ausentes continuam ausentes."""
+    valores = pd.Series(valores, dtype=object)
+    return valores.where(valores.isna(), valores.astype(str).str.strip().str.lower())
+
+
+def codificar(valores, dicionario=None):
+    """Troca os IDs (normalizados por ``_normalizar``) por códigos inteiros.
+
+    Com ``dicionario`` informado, os IDs já conhecidos mantêm seus códigos e
+    os novos recebem códigos ao final. Nos dicionários de hashes a busca é
+    feita sobre os bytes, sem decodificar o dicionário. Retorna
+    ``(codigos, dicionario)``.
+    """
+    valores = _normalizar(valores)
+    if dicionario is None or len(dicionario) == 0:
+        codigos, uniques = pd.factorize(valores)
+        return codigos.astype(np.int32), _montar_dicionario(np.asarray(uniques, dtype=object))
+
+    # Só os valores distintos do lote são procurados no dicionário
+    codigos_lote, uniques = pd.factorize(valores)
+    uniques = np.asarray(uniques, dtype=object)
+    posicoes = _localizar_todos(dicionario, uniques)
+    novos_mask = posicoes < 0
+    if novos_mask.any():
+        posicoes[novos_mask] = len(dicionario) + np.arange(novos_mask.sum())
+        dicionario = _anexar(dicionario, uniques[novos_mask])
+    codigos = np.where(codigos_lote >= 0, posicoes[np.maximum(codigos_lote, 0)], -1)
+    return codigos.astype(np.int32), dicionario
+
+
+def _buscar(referencia, procurados):
+    """Posição em ``referencia`` de cada hash de ``procurados`` (matrizes n x 32), ou -1.
+
+    Os hashes são comparados como blocos de 32 bytes, por ordenação e busca binária.
+    """
+    if len(referencia) == 0 or len(procurados) == 0:
+        return np.full(len(procurados), -1, dtype=np.int64)
+    chaves = np.ascontiguousarray(referencia).view(f"V{TAMANHO_HASH}").ravel()
+    alvo = np.ascontiguousarray(procurados).view(f"V{TAMANHO_HASH}").ravel()
+    ordem = np.argsort(chaves)
+    posicao = np.minimum(np.searchsorted(chaves[ordem], alvo), len(chaves) - 1)
+    return np.where(chaves[ordem][posicao] == alvo, ordem[posicao], -1)
+
+
+def _localizar_todos(dicionario, valores):
+    """Código de cada ID de ``valores`` (únicos) no dicionário, ou -1."""
+    if dicionario.dtype == np.uint8:
+        empacotado = _empacotar(valores)
+        if empacotado is not None:
+            return _buscar(dicionario, empacotado)
+        dicionario = decodificar(dicionario, np.arange(len(dicionario)))
+    return pd.Index(np.asarray(dicionario, dtype=object)).get_indexer(valores)
+
+
+def _montar_dicionario(uniques):
+    empacotado = _empacotar(uniques)
+    if empacotado is not None:
+        return empacotado
+    return uniques.astype(str)
+
+
+def _anexar(dicionario, novos):
+    if dicionario.dtype == np.uint8:
+        empacotado = _empacotar(novos)
+        if empacotado is not None:
+            return np.concatenate([dicionario, empacotado])
+        dicionario = decodificar(dicionario, np.arange(len(dicionario))).astype(str)
+    return np.concatenate([dicionario, novos.astype(str)])
+
+
+def decodificar(dicionario, codigos):
+    """Devolve os IDs originais (strings) correspondentes aos códigos."""
+    codigos = np.asarray(codigos)
+    if dicionario.dtype != np.uint8:
+        return np.asarray(dicionario[codigos], dtype=object)
+    brutos = np.ascontiguousarray(dicionario[codigos]).tobytes().hex()
+    passo = 2 * TAMANHO_HASH
+    return np.array([brutos[i:i + passo] for i in range(0, len(brutos), passo)], dtype=object)
+
+
+def localizar(dicionario, valores):
+    """Códigos dos IDs informados (strings), ou -1 para os que não existem.
+
+    Percorre o dicionário uma vez por ID: indicado para consultas pontuais,
+    não para recodificar colunas inteiras.
+    """
+    codigos = np.full(len(valores), -1, dtype=np.int64)
+    if dicionario.dtype != np.uint8:
+        for i, valor in enumerate(valores):
+            achados = np.flatnonzero(dicionario == str(valor).strip().lower())
+            if len(achados):
+                codigos[i] = achados[0]
+        return codigos
+
+    # Compara 8 bytes por vez e só confirma o hash inteiro nos candidatos
+    palavras = dicionario.view(np.uint64)
+    for i, valor in enumerate(valores):
+        empacotado = _empacotar([str(valor).strip().lower()])
+        if empacotado is None:
+            continue
+        alvo = empacotado.view(np.uint64)[0]
+        candidatos = np.flatnonzero(palavras[:, 0] == alvo[0])
+        achados = candidatos[(palavras[candidatos] == alvo).all(axis=1)]
+        if len(achados):
+            codigos[i] = achados[0]
+    return codigos
+
+
+def juntar(dicionario, valores):
+    """Posição em ``valores`` (IDs únicos, em texto) de cada código do dicionário, ou -1.
+
+    Junção de uma tabela externa inteira com o dicionário: nos dicionários
+    de hashes os IDs são comparados como blocos de 32 bytes, por ordenação e
+    busca binária, sem decodificar o dicionário para strings.
+    """
+    valores = _normalizar(valores).to_numpy()
+    if dicionario.dtype == np.uint8:
+        empacotado = _empacotar(valores)
+        if empacotado is not None:
+            return _buscar(empacotado, dicionario)
+        dicionario = decodificar(dicionario, np.arange(len(dicionario)))
+    return pd.Index(valores).get_indexer(np.asarray(dicionario, dtype=object))
+
+
+def com_prefixo(dicionario, prefixo):
+    """Códigos de todos os IDs que começam por ``prefixo`` (busca parcial).
+
+    Nos dicionários de hashes a comparação é feita sobre os bytes, sem
+    decodificar o dicionário para strings.
+    """
+    prefixo = str(prefixo).strip().lower()
+    if dicionario.dtype != np.uint8:
+        return np.flatnonzero(pd.Series(dicionario).str.lower().str.startswith(prefixo).to_numpy())
+    if len(prefixo) > 2 * TAMANHO_HASH or any(c not in "0123456789abcdef" for c in prefixo):
+        return np.array([], dtype=np.int64)
+
+    # Bytes completos do prefixo, e o meio byte final (se houver) pelos 4 bits altos
+    inteiros = bytes.fromhex(prefixo[:len(prefixo) // 2 * 2])
+    selecao = np.ones(len(dicionario), dtype=bool)
+    for i, byte in enumerate(inteiros):
+        selecao &= dicionario[:, i] == byte
+    if len(prefixo) % 2:
+        selecao &= (dicionario[:, len(inteiros)] >> 4) == int(prefixo[-1], 16)
+    return np.flatnonzero(selecao)
+
+
+def salvar_dicionario(dicionario, caminho):
+    """Grava o dicionário em ``.npy`` de forma atômica."""
+    tmp = caminho.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, dicionario, allow_pickle=False)
+    os.replace(tmp, caminho)
+
+
+def ler_dicionario(caminho):
+    """Lê o dicionário gravado por ``salvar_dicionario`` (somente leitura)."""
+    dicionario = np.load(caminho, allow_pickle=False)
+    dicionario.flags.writeable = False
+    return dicionario
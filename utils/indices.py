@@ -0,0 +1,64 @@
+"""Índices de linhas por pagador e por beneficiário.
+
+Cada índice guarda as posições das linhas da base agrupadas por código de
+ID (``ordem``) e, para cada código, onde seu grupo começa (``deslocamentos``,
+no formato CSR). As linhas de um pagador ficam em
+``ordem[deslocamentos[c]:deslocamentos[c + 1]]``: a consulta é uma fatia,
+sem varrer a base.
+
+As posições se referem à ordem em que ``ingestao.ler_base`` devolve as
+linhas (partes em ordem, versão mais recente de cada boleto), que é a mesma
+do frame em cache de ``dados.carregar_base``. Os índices são regravados a
+cada mudança do armazenamento.
+"""
+
+import os
+
+import numpy as np
+
+COLUNAS_INDICE = ["id_pagador", "id_beneficiario"]
+
+
+def construir_indice(codigos):
+    """Retorna ``(ordem, deslocamentos)`` das linhas agrupadas por código.
+
+    Linhas sem ID (código -1) ficam fora do índice.
+    """
+    codigos = np.asarray(codigos)
+    validas = np.flatnonzero(codigos >= 0)
+    codigos = codigos[validas]
+    tamanho = int(codigos.max()) + 1 if len(codigos) else 0
+    ordem = validas[np.argsort(codigos, kind="stable")].astype(np.int64)
+    deslocamentos = np.zeros(tamanho + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codigos, minlength=tamanho), out=deslocamentos[1:])
+    return ordem, deslocamentos
+
+
+def posicoes(indice, codigo):
+    """Posições das linhas de ``codigo`` (vazio para códigos sem linhas)."""
+    ordem, deslocamentos = indice
+    if not 0 <= codigo < len(deslocamentos) - 1:
+        return ordem[:0]
+    return ordem[deslocamentos[codigo]:deslocamentos[codigo + 1]]
+
+
+def quantidades(indice):
+    """Quantidade de linhas de cada código."""
+    return np.diff(indice[1])
+
+
+def salvar_indice(indice, caminho):
+    """Grava o índice em ``.npz`` de forma atômica."""
+    tmp = caminho.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        np.savez(f, ordem=indice[0], deslocamentos=indice[1])
+    os.replace(tmp, caminho)
+
+
+def ler_indice(caminho):
+    """Lê o índice gravado por ``salvar_indice`` (somente leitura)."""
+    with np.load(caminho, allow_pickle=False) as arquivo:
+        indice = arquivo["ordem"], arquivo["deslocamentos"]
+    for array in indice:
+        array.flags.writeable = False
+    return indice
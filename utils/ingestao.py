@@ -0,0 +1,386 @@
+"""Ingestão da base de boletos em um armazenamento colunar (Parquet).
+
+O CSV tratado continua sendo a fonte de verdade. Este módulo o converte em
+arquivos Parquet tipados, reconstruídos apenas quando o CSV muda. A mudança
+é detectada primeiro por data de modificação e tamanho e, se estes
+divergirem, confirmada pelo hash SHA-256 do conteúdo.
+
+Os IDs (hashes) são gravados como códigos inteiros, com um dicionário por
+coluna ao lado do Parquet (ver ``utils.ids``). Na mesma etapa são gravados
+os agregados consumidos pelas páginas (ver ``utils.agregados``) e os
+índices de linhas por pagador e beneficiário (ver ``utils.indices``).
+
+Lotes diários de boletos novos ou atualizados (novas baixas, por exemplo)
+são colocados em ``data/lotes/`` com o mesmo layout do CSV. Cada lote é
+aplicado uma única vez, em ordem de nome, como um *upsert* por
+``id_boleto``: vira uma nova parte do armazenamento e atualiza os agregados
+apenas com o delta. A versão mais recente de cada boleto prevalece na
+leitura. Se um lote já aplicado mudar ou sumir, ou se o CSV mudar, o
+armazenamento é reconstruído do zero e todos os lotes são reaplicados.
+
+Uso pela linha de comando (a partir da raiz do projeto)::
+
+    python -m utils.ingestao                   # aplica o que estiver pendente
+    python -m utils.ingestao --lote novo.csv   # copia um lote e o aplica
+    python -m utils.ingestao --compactar       # junta as partes em uma só
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils import ids, indices, paralelo
+from utils.agregados import AGREGADOS, combinar
+from utils.datas import ler_datas, meses
+
+# Pega o diretório raiz do projeto
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Os caminhos podem ser trocados por variáveis de ambiente (bases sintéticas
+# de benchmark, por exemplo, sem tocar no armazenamento da base real)
+CAMINHO_CSV = Path(os.environ.get("DASHBOARD_CSV", BASE_DIR / "data" / "base_tratada_nuclea.csv"))
+DIR_LOTES = Path(os.environ.get("DASHBOARD_LOTES", BASE_DIR / "data" / "lotes"))
+DIR_ARMAZENAMENTO = Path(os.environ.get("DASHBOARD_CACHE", BASE_DIR / "data" / "cache"))
+DIR_PARTES = DIR_ARMAZENAMENTO / "base"
+CAMINHO_MANIFESTO = DIR_ARMAZENAMENTO / "manifesto.json"
+
+# Incrementar sempre que o layout do armazenamento mudar, forçando a
+# reconstrução de caches gerados por versões anteriores do código.
+FORMATO_ARMAZENAMENTO = 8
+
+# Acima deste número de partes a base é compactada automaticamente
+LIMITE_PARTES = 32
+
+COLUNAS_DATA = ["dt_emissao", "dt_vencimento", "dt_pagamento"]
+# Colunas de mês do CSV e a data de que cada uma é derivada
+COLUNAS_MES = {
+    "ano_mes_emissao": "dt_emissao",
+    "ano_mes_vendimento": "dt_vencimento",
+    "ano_mes_pagamento": "dt_pagamento",
+}
+COLUNAS_VALOR = ["vlr_nominal", "vlr_baixa"]
+
+TIPOS_COLUNAS = {
+    "tipo_baixa": "category",
+    "tipo_especie": "category",
+    "inadimplente": "int8",
+}
+
+# As sessões do Streamlit são threads do mesmo processo
+_TRAVA = threading.Lock()
+
+
+def caminho_dicionario(coluna):
+    """Caminho do dicionário de IDs da coluna informada."""
+    return DIR_ARMAZENAMENTO / f"ids_{coluna}.npy"
+
+
+def caminho_agregado(nome):
+    """Caminho do Parquet de um agregado registrado em ``utils.agregados``."""
+    return DIR_ARMAZENAMENTO / f"{nome}.parquet"
+
+
+def caminho_indice(coluna):
+    """Caminho do índice de linhas por código da coluna informada."""
+    return DIR_ARMAZENAMENTO / f"indice_{coluna}.npz"
+
+
+def _hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _ler_manifesto():
+    try:
+        return json.loads(CAMINHO_MANIFESTO.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _gravar_parquet(df, caminho):
+    # Datas vão como date32 (dias desde 1970, metade do espaço de um timestamp)
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    for i, campo in enumerate(tabela.schema):
+        if pa.types.is_timestamp(campo.type):
+            tabela = tabela.set_column(i, campo.name, tabela.column(i).cast(pa.date32()))
+
+    # Grava em arquivo temporário e troca de forma atômica, para que outras
+    # sessões nunca leiam um Parquet pela metade.
+    tmp = caminho.with_suffix(".tmp")
+    pq.write_table(tabela, tmp)
+    os.replace(tmp, caminho)
+
+
+def ler_parquet(caminho, colunas=None, filtros=None):
+    """Lê um Parquet do armazenamento, com as datas ``date32`` como ``datetime64``."""
+    tabela = pq.read_table(caminho, columns=colunas, filters=filtros)
+    return tabela.to_pandas(date_as_object=False)
+
+
+def _gravar_manifesto(manifesto):
+    tmp = CAMINHO_MANIFESTO.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifesto, indent=2))
+    os.replace(tmp, CAMINHO_MANIFESTO)
+
+
+def _nova_parte(manifesto):
+    numero = manifesto.get("proxima_parte", 0)
+    manifesto["proxima_parte"] = numero + 1
+    return f"parte-{numero:05d}.parquet"
+
+
+def _calcular_versao(manifesto):
+    h = hashlib.sha256(manifesto["csv_sha256"].encode())
+    for lote in manifesto["lotes"]:
+        h.update(lote["sha256"].encode())
+    return h.hexdigest()
+
+
+def ler_csv(caminho=CAMINHO_CSV):
+    """Lê o CSV tratado e aplica os tipos usados por todo o dashboard."""
+    df = pd.read_csv(caminho, index_col=0, low_memory=False)
+
+    for col in COLUNAS_DATA:
+        df[col] = ler_datas(df[col])
+    # Os meses do CSV são texto; os códigos inteiros saem das próprias datas
+    for col, origem in COLUNAS_MES.items():
+        df[col] = meses(df[origem])
+    for col in COLUNAS_VALOR:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df.astype(TIPOS_COLUNAS)
+
+
+def caminhos_partes(manifesto=None):
+    """Partes Parquet da base, da mais antiga para a mais recente."""
+    manifesto = manifesto or _ler_manifesto()
+    return [DIR_PARTES / nome for nome in manifesto["partes"]]
+
+
+def ler_base(colunas=None, boletos=None, manifesto=None):
+    """Lê a base do armazenamento, já com a versão mais recente de cada boleto.
+
+    ``colunas`` restringe as colunas lidas; ``boletos`` restringe a leitura
+    aos códigos de ``id_boleto`` informados.
+    """
+    partes = caminhos_partes(manifesto)
+    varias_partes = len(partes) > 1
+
+    ler = list(colunas) if colunas is not None else None
+    if ler is not None and varias_partes and "id_boleto" not in ler:
+        ler.append("id_boleto")
+    filtros = [("id_boleto", "in", list(map(int, boletos)))] if boletos is not None else None
+
+    frames = [ler_parquet(p, ler, filtros) for p in partes]
+    if not varias_partes:
+        return frames[0]
+
+    df = pd.concat(frames, ignore_index=True)
+    # Boletos sem ID (código -1) não têm outra versão e são todos mantidos
+    df = df[~df["id_boleto"].duplicated(keep="last") | (df["id_boleto"] < 0)]
+    df = df.astype({c: t for c, t in TIPOS_COLUNAS.items() if c in df.columns})
+    if colunas is not None:
+        df = df[list(colunas)]
+    return df.reset_index(drop=True)
+
+
+def _gravar_indices(df):
+    for col in indices.COLUNAS_INDICE:
+        indices.salvar_indice(indices.construir_indice(df[col].to_numpy()), caminho_indice(col))
+
+
+def _codificar_ids(df, dicionarios):
+    for col in ids.COLUNAS_ID:
+        codigos, dicionarios[col] = ids.codificar(df[col], dicionarios.get(col))
+        df[col] = codigos
+    return df
+
+
+def construir_armazenamento(caminho_csv=CAMINHO_CSV):
+    """Converte o CSV em Parquet, calcula os agregados e registra o manifesto.
+
+    Os lotes de ``data/lotes/`` não são aplicados aqui; isso fica a cargo de
+    ``garantir_armazenamento``.
+    """
+    DIR_ARMAZENAMENTO.mkdir(parents=True, exist_ok=True)
+    shutil.rmtree(DIR_PARTES, ignore_errors=True)
+    DIR_PARTES.mkdir()
+    info = Path(caminho_csv).stat()
+    hash_csv = _hash_arquivo(caminho_csv)
+
+    dicionarios = {}
+    df = _codificar_ids(ler_csv(caminho_csv), dicionarios)
+    for col, dicionario in dicionarios.items():
+        ids.salvar_dicionario(dicionario, caminho_dicionario(col))
+
+    manifesto = {"formato": FORMATO_ARMAZENAMENTO}
+    parte = _nova_parte(manifesto)
+    _gravar_parquet(df, DIR_PARTES / parte)
+    for nome, tabela in paralelo.agregar(df).items():
+        _gravar_parquet(tabela, caminho_agregado(nome))
+    _gravar_indices(df)
+
+    manifesto.update({
+        "csv_mtime_ns": info.st_mtime_ns,
+        "csv_tamanho": info.st_size,
+        "csv_sha256": hash_csv,
+        "partes": [parte],
+        "lotes": [],
+        "linhas": len(df),
+    })
+    manifesto["versao"] = _calcular_versao(manifesto)
+    _gravar_manifesto(manifesto)
+    return manifesto
+
+
+def aplicar_lote(caminho_lote, manifesto):
+    """Aplica um lote como upsert por ``id_boleto`` e atualiza os agregados."""
+    caminho_lote = Path(caminho_lote)
+    info = caminho_lote.stat()
+
+    # Marca o lote em andamento: se o processo cair no meio, a próxima
+    # execução reconstrói tudo em vez de partir de um estado parcial.
+    manifesto["aplicando"] = caminho_lote.name
+    _gravar_manifesto(manifesto)
+
+    lote = ler_csv(caminho_lote)
+    lote = lote[~lote["id_boleto"].duplicated(keep="last") | lote["id_boleto"].isna()].reset_index(drop=True)
+
+    dicionarios = {col: np.array(ids.ler_dicionario(caminho_dicionario(col)))
+                   for col in ids.COLUNAS_ID}
+    qtd_boletos_conhecidos = len(dicionarios["id_boleto"])
+    lote = _codificar_ids(lote, dicionarios)
+
+    codigos_boleto = lote["id_boleto"].to_numpy()
+    existentes = codigos_boleto[(codigos_boleto >= 0) & (codigos_boleto < qtd_boletos_conhecidos)]
+    removidas = ler_base(boletos=existentes, manifesto=manifesto) if len(existentes) else None
+
+    parte = _nova_parte(manifesto)
+    _gravar_parquet(lote, DIR_PARTES / parte)
+    for col, dicionario in dicionarios.items():
+        ids.salvar_dicionario(dicionario, caminho_dicionario(col))
+    for agregado in AGREGADOS.values():
+        caminho = caminho_agregado(agregado.nome)
+        atual = ler_parquet(caminho)
+        _gravar_parquet(combinar(agregado, atual, removidas, lote), caminho)
+
+    manifesto["partes"].append(parte)
+    # As posições mudam com o upsert: os índices são refeitos sobre a base lida
+    _gravar_indices(ler_base(indices.COLUNAS_INDICE, manifesto=manifesto))
+
+    manifesto.pop("aplicando")
+    manifesto["lotes"].append({
+        "arquivo": caminho_lote.name,
+        "mtime_ns": info.st_mtime_ns,
+        "tamanho": info.st_size,
+        "sha256": _hash_arquivo(caminho_lote),
+    })
+    manifesto["linhas"] += len(lote) - (0 if removidas is None else len(removidas))
+    manifesto["versao"] = _calcular_versao(manifesto)
+    _gravar_manifesto(manifesto)
+    return manifesto
+
+
+def compactar_armazenamento(manifesto=None):
+    """Reescreve todas as partes em uma só, mantendo a versão dos dados."""
+    manifesto = manifesto or _ler_manifesto()
+    if len(manifesto["partes"]) <= 1:
+        return manifesto
+
+    df = ler_base(manifesto=manifesto)
+    parte = _nova_parte(manifesto)
+    _gravar_parquet(df, DIR_PARTES / parte)
+
+    antigas = manifesto["partes"]
+    manifesto["partes"] = [parte]
+    _gravar_manifesto(manifesto)
+    for nome in antigas:
+        (DIR_PARTES / nome).unlink(missing_ok=True)
+    return manifesto
+
+
+def _csv_atual(manifesto, caminho_csv):
+    """Indica se o armazenamento descrito no manifesto corresponde ao CSV."""
+    if (manifesto.get("formato") != FORMATO_ARMAZENAMENTO
+            or "aplicando" in manifesto or not DIR_PARTES.exists()):
+        return False
+
+    info = Path(caminho_csv).stat()
+    if (manifesto["csv_mtime_ns"] == info.st_mtime_ns
+            and manifesto["csv_tamanho"] == info.st_size):
+        return True
+
+    # Data ou tamanho mudaram: confirma pelo conteúdo antes de reconstruir
+    if manifesto["csv_sha256"] == _hash_arquivo(caminho_csv):
+        manifesto.update(csv_mtime_ns=info.st_mtime_ns, csv_tamanho=info.st_size)
+        _gravar_manifesto(manifesto)
+        return True
+    return False
+
+
+def _lote_inalterado(registro, caminho):
+    if not caminho.exists():
+        return False
+    info = caminho.stat()
+    if registro["mtime_ns"] == info.st_mtime_ns and registro["tamanho"] == info.st_size:
+        return True
+    return registro["sha256"] == _hash_arquivo(caminho)
+
+
+def _listar_lotes():
+    if not DIR_LOTES.exists():
+        return []
+    return sorted(p for p in DIR_LOTES.iterdir() if p.suffix.lower() == ".csv")
+
+
+def garantir_armazenamento(caminho_csv=CAMINHO_CSV):
+    """Garante que o armazenamento reflete o CSV e os lotes atuais.
+
+    Devolve a versão dos dados (hash do CSV e dos lotes aplicados),
+    adequada para compor as chaves de cache das páginas.
+    """
+    with _TRAVA:
+        manifesto = _ler_manifesto()
+        if not _csv_atual(manifesto, caminho_csv):
+            manifesto = construir_armazenamento(caminho_csv)
+
+        lotes = _listar_lotes()
+        aplicados = {r["arquivo"]: r for r in manifesto["lotes"]}
+        if not all(_lote_inalterado(r, DIR_LOTES / nome) for nome, r in aplicados.items()):
+            manifesto = construir_armazenamento(caminho_csv)
+            aplicados = {}
+
+        for caminho in lotes:
+            if caminho.name not in aplicados:
+                manifesto = aplicar_lote(caminho, manifesto)
+
+        if len(manifesto["partes"]) > LIMITE_PARTES:
+            manifesto = compactar_armazenamento(manifesto)
+        return manifesto["versao"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Atualiza o armazenamento colunar da base de boletos.")
+    parser.add_argument("--lote", type=Path, help="CSV de boletos novos/atualizados a incluir em data/lotes/")
+    parser.add_argument("--compactar", action="store_true", help="junta todas as partes em uma só")
+    args = parser.parse_args()
+
+    if args.lote:
+        DIR_LOTES.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(args.lote, DIR_LOTES / args.lote.name)
+
+    versao = garantir_armazenamento()
+    if args.compactar:
+        compactar_armazenamento()
+    print(f"Armazenamento atualizado: {DIR_ARMAZENAMENTO} (versão {versao[:12]})")
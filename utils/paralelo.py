@@ -0,0 +1,108 @@
+"""Cálculo dos agregados em paralelo, em vários processos.
+
+O pandas usa um único núcleo. Como todos os agregados de
+``utils.agregados`` (e os acumuladores de ``streaming.ParciaisKPI``) podem
+ser somados entre partes disjuntas da base, ``agregar`` divide as linhas em
+faixas contíguas, calcula os parciais de cada faixa em um processo e soma
+os resultados com ``agregados.mesclar``.
+
+As faixas têm o mesmo número de linhas: particionar por mês de emissão
+deixaria quase tudo em um processo, já que poucos meses concentram a maior
+parte dos boletos.
+
+As colunas não são serializadas para os processos: cada uma é gravada uma
+vez como ``.npy`` em um diretório temporário (em ``/dev/shm``, memória
+compartilhada, quando existe) e aberta pelos processos com ``mmap``; cada
+processo lê só a sua faixa. Colunas de texto e categóricas vão como códigos
+inteiros mais a lista de valores.
+
+O número de processos vem de ``DASHBOARD_PROCESSOS`` (padrão: núcleos da
+máquina). Bases com menos de ``LINHAS_MINIMAS`` linhas são agregadas no
+próprio processo, onde subir os processos custaria mais que o cálculo.
+"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.agregados import AGREGADOS, COLUNAS_ORIGEM, mesclar
+
+LINHAS_MINIMAS = 2_000_000
+
+PROCESSOS = int(os.environ.get("DASHBOARD_PROCESSOS", 0)) or os.cpu_count() or 1
+
+_DIR_COMPARTILHADO = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def _agregar_linhas(df, nomes, kpis):
+    """Agregados ``nomes`` e, se pedido, ``ParciaisKPI`` de ``df``, no processo atual."""
+    resultado = {nome: AGREGADOS[nome].construir(df) for nome in nomes}
+    if kpis:
+        # Importado aqui: utils.streaming depende de utils.ingestao, que usa este módulo
+        from utils.streaming import COLUNAS_KPI, ParciaisKPI
+        resultado["kpis"] = ParciaisKPI().adicionar(*(df[c] for c in COLUNAS_KPI))
+    return resultado
+
+
+def _exportar_coluna(serie, diretorio):
+    """Grava a coluna em ``.npy`` e retorna como reconstruí-la nos processos."""
+    caminho = Path(diretorio) / f"{serie.name}.npy"
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        np.save(caminho, serie.cat.codes.to_numpy())
+        return {"caminho": caminho, "dtype": serie.dtype}
+    if isinstance(serie.dtype, np.dtype) and serie.dtype.kind in "biufmM":
+        np.save(caminho, serie.to_numpy())
+        return {"caminho": caminho}
+    codigos, valores = pd.factorize(serie)
+    np.save(caminho, codigos)
+    return {"caminho": caminho, "dtype": serie.dtype, "valores": np.asarray(valores)}
+
+
+def _importar_coluna(info, inicio, fim):
+    dados = np.load(info["caminho"], mmap_mode="r")[inicio:fim]
+    if "dtype" not in info:
+        return np.asarray(dados)
+    if "valores" not in info:
+        return pd.Categorical.from_codes(dados, dtype=info["dtype"])
+    return pd.Series(pd.Categorical.from_codes(dados, categories=info["valores"])).astype(info["dtype"])
+
+
+def _agregar_faixa(colunas, inicio, fim, nomes, kpis):
+    """Executado em cada processo: monta a faixa de linhas e calcula os parciais."""
+    df = pd.DataFrame({nome: _importar_coluna(info, inicio, fim) for nome, info in colunas.items()})
+    return _agregar_linhas(df, nomes, kpis)
+
+
+def agregar(df, nomes=None, kpis=False, processos=None):
+    """Calcula os agregados ``nomes`` (padrão: todos) de ``df``, em paralelo.
+
+    Retorna ``{nome: frame}`` no mesmo formato de ``Agregado.construir``;
+    com ``kpis=True`` inclui também ``"kpis"`` (``ParciaisKPI``).
+    """
+    nomes = list(nomes or AGREGADOS)
+    processos = min(processos or PROCESSOS, max(1, len(df) // (LINHAS_MINIMAS // 2)))
+    if processos <= 1 or len(df) < LINHAS_MINIMAS:
+        return _agregar_linhas(df, nomes, kpis)
+
+    bordas = np.linspace(0, len(df), processos + 1).astype(np.int64)
+    with tempfile.TemporaryDirectory(prefix="agregados_", dir=_DIR_COMPARTILHADO) as diretorio:
+        colunas = {c: _exportar_coluna(df[c], diretorio) for c in COLUNAS_ORIGEM if c in df.columns}
+        # "spawn": o Streamlit roda sessões em threads, e fork com threads ativas não é seguro
+        with ProcessPoolExecutor(processos, mp_context=get_context("spawn")) as executor:
+            parciais = list(executor.map(
+                _agregar_faixa,
+                [colunas] * processos, bordas[:-1], bordas[1:],
+                [nomes] * processos, [kpis] * processos,
+            ))
+
+    resultado = {nome: mesclar(AGREGADOS[nome], [p[nome] for p in parciais]) for nome in nomes}
+    if kpis:
+        resultado["kpis"] = parciais[0]["kpis"]
+        for parcial in parciais[1:]:
+            resultado["kpis"].mesclar(parcial["kpis"])
+    return resultado
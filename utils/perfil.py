@@ -0,0 +1,150 @@
+"""Perfil de tempo e memória por seção das páginas (opcional).
+
+Ligado pela variável de ambiente ``DASHBOARD_PERFIL=1``; desligado, as
+chamadas não fazem nada. A página marca o início de cada seção::
+
+    perfil.iniciar("Análises Financeiras")
+    perfil.secao("carga")
+    ...
+    perfil.secao("gráfico por tipo de baixa")
+    ...
+    perfil.painel()
+
+Cada seção vai até a próxima marcação e inclui a montagem das figuras e a
+serialização feita por ``st.plotly_chart``. A memória vem do
+``tracemalloc``: ``memoria_mb`` é a variação do que ficou alocado ao fim da
+seção e ``pico_mb`` o pico acima do início dela; alocações internas do
+PyArrow e do DuckDB não são rastreadas.
+
+``painel`` mostra a divisão da execução na barra lateral e acrescenta um
+registro JSON por seção em ``data/perfil.jsonl`` (ou ``DASHBOARD_PERFIL_LOG``)
+para análise posterior das sessões. Seções dentro de ``fragmento`` também são
+registradas quando só o fragmento é reexecutado (``"fragmento": true``).
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+ATIVO = os.environ.get("DASHBOARD_PERFIL", "").lower() in ("1", "true", "sim")
+CAMINHO_LOG = Path(os.environ.get("DASHBOARD_PERFIL_LOG", BASE_DIR / "data" / "perfil.jsonl"))
+
+# Sessões diferentes rodam em threads do mesmo processo
+_trava_log = threading.Lock()
+
+if ATIVO and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+def _memoria_mb():
+    return tracemalloc.get_traced_memory()[0] / 2**20
+
+
+def _fechar_secao(estado):
+    aberta = estado.pop("aberta", None)
+    if aberta is None:
+        return
+    nome, inicio, memoria_inicio = aberta
+    pico = tracemalloc.get_traced_memory()[1] / 2**20
+    estado["registros"].append({
+        "secao": nome,
+        "segundos": time.perf_counter() - inicio,
+        "memoria_mb": _memoria_mb() - memoria_inicio,
+        "pico_mb": max(pico - memoria_inicio, 0.0),
+    })
+
+
+def iniciar(pagina):
+    """Começa o perfil de uma execução da página."""
+    if not ATIVO:
+        return
+    st.session_state["_perfil"] = {"pagina": pagina, "registros": [], "fragmento": False}
+
+
+def secao(nome):
+    """Encerra a seção anterior (se houver) e começa a seção ``nome``."""
+    estado = st.session_state.get("_perfil") if ATIVO else None
+    if estado is None:
+        return
+    _fechar_secao(estado)
+    tracemalloc.reset_peak()
+    estado["aberta"] = (nome, time.perf_counter(), _memoria_mb())
+
+
+def _gravar(estado):
+    contexto = get_script_run_ctx()
+    base = {
+        "momento": datetime.now().isoformat(timespec="milliseconds"),
+        "sessao": contexto.session_id if contexto else None,
+        "pagina": estado["pagina"],
+        "fragmento": estado["fragmento"],
+    }
+    linhas = "".join(json.dumps({**base, **r}, ensure_ascii=False) + "\n" for r in estado["registros"])
+    CAMINHO_LOG.parent.mkdir(parents=True, exist_ok=True)
+    with _trava_log, open(CAMINHO_LOG, "a", encoding="utf-8") as f:
+        f.write(linhas)
+
+
+def painel():
+    """Fecha a última seção, grava o log e mostra a divisão na barra lateral."""
+    estado = st.session_state.get("_perfil") if ATIVO else None
+    if estado is None:
+        return
+    _fechar_secao(estado)
+    estado["concluido"] = True
+    if not estado["registros"]:
+        return
+    _gravar(estado)
+
+    tabela = pd.DataFrame(estado["registros"])
+    total = tabela["segundos"].sum()
+    with st.sidebar.expander(f"⏱️ Perfil da execução ({total:.2f}s)"):
+        st.dataframe(
+            tabela.rename(columns={
+                "secao": "Seção", "segundos": "Tempo (s)",
+                "memoria_mb": "Δ Memória (MB)", "pico_mb": "Pico (MB)",
+            }),
+            column_config={
+                "Tempo (s)": st.column_config.NumberColumn(format="%.3f"),
+                "Δ Memória (MB)": st.column_config.NumberColumn(format="%.1f"),
+                "Pico (MB)": st.column_config.NumberColumn(format="%.1f"),
+            },
+            hide_index=True,
+            use_container_width=True,
+        )
+        st.caption(f"Registros acrescentados em `{CAMINHO_LOG.name}`.")
+
+
+def fragmento(funcao):
+    """``st.fragment`` cujas reexecuções isoladas também entram no perfil.
+
+    Quando só o fragmento roda, a página não chega a ``painel``: as seções
+    dele são fechadas e gravadas no log ao fim do próprio fragmento.
+    """
+    @functools.wraps(funcao)
+    def executar(*args, **kwargs):
+        estado = st.session_state.get("_perfil") if ATIVO else None
+        if estado is None or not estado.get("concluido"):
+            return funcao(*args, **kwargs)
+        atual = {"pagina": estado["pagina"], "registros": [], "fragmento": True}
+        st.session_state["_perfil"] = atual
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            _fechar_secao(atual)
+            atual["concluido"] = True
+            if atual["registros"]:
+                _gravar(atual)
+
+    return st.fragment(executar)
@@ -0,0 +1,84 @@
+"""Rankings Top-N e índices de concentração da carteira.
+
+As tabelas Top-N exibem poucas linhas de uma distribuição com até milhões
+de pagadores. Em vez de ordenar tudo, ``top_n`` seleciona os N maiores com
+``np.argpartition`` (seleção em tempo linear) e ordena só esses N.
+
+A concentração é medida sobre a distribuição inteira:
+
+- HHI (Herfindahl-Hirschman): soma dos quadrados das participações, de
+  ``1/n`` (tudo igual) a 1 (um único pagador), reportado na escala usual
+  de 0 a 10.000;
+- Gini: de 0 (igualdade) a 1 (concentração total);
+- curva de Lorenz: fração acumulada do valor pela fração acumulada dos
+  pagadores, do menor para o maior, reduzida a ``PONTOS_LORENZ`` pontos
+  para o gráfico.
+
+Gini e Lorenz exigem os valores ordenados; o cálculo é feito uma vez por
+versão dos dados (ver ``memorizar`` em ``utils.consultas``).
+"""
+
+import numpy as np
+import pandas as pd
+
+PONTOS_LORENZ = 201
+
+
+def top_n(valores, n):
+    """Posições dos ``n`` maiores valores, do maior para o menor.
+
+    Empates são desfeitos pela posição original, como em uma ordenação
+    estável. Valores ausentes nunca entram no ranking.
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    validos = np.flatnonzero(~np.isnan(valores))
+    n = min(n, len(validos))
+    if n == 0:
+        return np.array([], dtype=np.intp)
+    candidatos = validos
+    if n < len(validos):
+        # Tudo que empata com o N-ésimo maior continua candidato, para que o
+        # desempate por posição seja o mesmo de uma ordenação completa
+        corte = np.partition(valores[validos], len(validos) - n)[len(validos) - n]
+        candidatos = validos[valores[validos] >= corte]
+    ordem = np.lexsort((candidatos, -valores[candidatos]))
+    return candidatos[ordem[:n]]
+
+
+def selecionar(df, coluna, n):
+    """As ``n`` linhas de ``df`` com maior ``coluna``, em ordem decrescente."""
+    return df.iloc[top_n(df[coluna].to_numpy(), n)]
+
+
+def concentracao(valores, pontos=PONTOS_LORENZ):
+    """HHI, Gini e curva de Lorenz de uma distribuição de valores não negativos.
+
+    Retorna um dicionário com ``total``, ``quantidade``, ``hhi``, ``gini`` e
+    ``lorenz`` (frame com ``pct_pagadores`` e ``pct_valor``, de 0 a 100).
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    valores = np.sort(valores[~np.isnan(valores)])
+    n, total = len(valores), valores.sum()
+    if n == 0 or total <= 0:
+        return {"total": float(total), "quantidade": n, "hhi": float("nan"),
+                "gini": float("nan"),
+                "lorenz": pd.DataFrame({"pct_pagadores": [0.0, 100.0], "pct_valor": [0.0, 100.0]})}
+
+    participacao = valores / total
+    acumulado = np.concatenate([[0.0], np.cumsum(participacao)])
+
+    # Gini pela fórmula com postos: G = 2·Σ i·x(i) / (n·Σx) − (n + 1) / n
+    postos = np.arange(1, n + 1)
+    gini = 2 * (postos * participacao).sum() / n - (n + 1) / n
+
+    amostra = np.unique(np.linspace(0, n, min(pontos, n + 1)).round().astype(np.int64))
+    return {
+        "total": float(total),
+        "quantidade": n,
+        "hhi": float((participacao ** 2).sum() * 10_000),
+        "gini": float(gini),
+        "lorenz": pd.DataFrame({
+            "pct_pagadores": amostra / n * 100,
+            "pct_valor": acumulado[amostra] * 100,
+        }),
+    }
@@ -0,0 +1,122 @@
+"""Sketch de quantis mesclável para valores não negativos.
+
+Segue a ideia do DDSketch: cada valor ``x > 0`` cai no bin
+``ceil(log(x) / log(gama))``, com ``gama = (1 + alfa) / (1 - alfa)``, e o
+sketch guarda apenas a contagem de cada bin. Qualquer quantil estimado fica
+a no máximo ``alfa`` (erro relativo) do valor exato, e dois sketches se
+mesclam somando as contagens bin a bin — inclusive sketches de partes
+diferentes da base, calculados em paralelo ou em dias diferentes.
+
+Enquanto o total de valores não passa de ``limite_exato`` o sketch guarda os
+próprios valores e os quantis são exatos (mesma interpolação do pandas). Ao
+ultrapassar esse limite os valores são convertidos em bins, e a memória
+passa a depender apenas da amplitude dos dados, não da quantidade.
+"""
+
+import numpy as np
+
+ALFA_PADRAO = 0.001
+LIMITE_EXATO_PADRAO = 1_000_000
+
+# Índice reservado para o valor zero (abaixo de qualquer bin positivo)
+BIN_ZERO = np.iinfo(np.int32).min
+
+
+def gama(alfa=ALFA_PADRAO):
+    return (1 + alfa) / (1 - alfa)
+
+
+def indices_bins(valores, alfa=ALFA_PADRAO):
+    """Bin de cada valor (vetorizado). Valores zero vão para ``BIN_ZERO``."""
+    valores = np.asarray(valores, dtype=np.float64)
+    if (valores < 0).any():
+        raise ValueError("O sketch aceita apenas valores não negativos.")
+    indices = np.full(valores.shape, BIN_ZERO, dtype=np.int32)
+    positivos = valores > 0
+    indices[positivos] = np.ceil(np.log(valores[positivos]) / np.log(gama(alfa)))
+    return indices
+
+
+def valores_bins(indices, alfa=ALFA_PADRAO):
+    """Valor representativo de cada bin (erro relativo máximo ``alfa``)."""
+    indices = np.asarray(indices)
+    g = gama(alfa)
+    valores = 2 * np.power(g, indices.astype(np.float64)) / (g + 1)
+    return np.where(indices == BIN_ZERO, 0.0, valores)
+
+
+def quantis_bins(indices, contagens, qs, alfa=ALFA_PADRAO):
+    """Quantis a partir de bins e contagens (bins em qualquer ordem)."""
+    indices = np.asarray(indices)
+    contagens = np.asarray(contagens, dtype=np.int64)
+    ordem = np.argsort(indices, kind="stable")
+    acumulado = np.cumsum(contagens[ordem])
+    if len(acumulado) == 0 or acumulado[-1] == 0:
+        return np.full(np.shape(qs), np.nan)
+    posicoes = np.asarray(qs, dtype=np.float64) * (acumulado[-1] - 1)
+    alvo = np.searchsorted(acumulado, np.floor(posicoes), side="right")
+    return valores_bins(indices[ordem][alvo], alfa)
+
+
+class SketchQuantis:
+    """Sketch de quantis mesclável; ver a documentação do módulo."""
+
+    def __init__(self, alfa=ALFA_PADRAO, limite_exato=LIMITE_EXATO_PADRAO):
+        self.alfa = alfa
+        self.limite_exato = limite_exato
+        self.contagem = 0
+        self._valores = []      # modo exato
+        self._bins = None       # modo aproximado: {indice: contagem} em arrays
+
+    @property
+    def exato(self):
+        return self._bins is None
+
+    def adicionar(self, valores):
+        valores = np.asarray(valores, dtype=np.float64)
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return self
+        self.contagem += len(valores)
+        if self.exato:
+            self._valores.append(valores)
+            if self.contagem > self.limite_exato:
+                self._converter_em_bins()
+        else:
+            self._somar_bins(*np.unique(indices_bins(valores, self.alfa), return_counts=True))
+        return self
+
+    def mesclar(self, outro):
+        if outro.alfa != self.alfa:
+            raise ValueError("Só é possível mesclar sketches com o mesmo alfa.")
+        if outro.exato:
+            for valores in outro._valores:
+                self.adicionar(valores)
+            return self
+        if self.exato:
+            self._converter_em_bins()
+        self.contagem += outro.contagem
+        self._somar_bins(*outro._bins)
+        return self
+
+    def quantis(self, qs):
+        if self.contagem == 0:
+            return np.full(np.shape(qs), np.nan)
+        if self.exato:
+            return np.quantile(np.concatenate(self._valores), qs)
+        return quantis_bins(*self._bins, qs, alfa=self.alfa)
+
+    def quantil(self, q):
+        return float(self.quantis([q])[0])
+
+    def _converter_em_bins(self):
+        valores = np.concatenate(self._valores) if self._valores else np.empty(0)
+        self._valores = []
+        self._bins = (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64))
+        self._somar_bins(*np.unique(indices_bins(valores, self.alfa), return_counts=True))
+
+    def _somar_bins(self, indices, contagens):
+        todos = np.concatenate([self._bins[0], indices])
+        pesos = np.concatenate([self._bins[1], contagens])
+        unicos, posicao = np.unique(todos, return_inverse=True)
+        self._bins = (unicos, np.bincount(posicao, weights=pesos).astype(np.int64))
@@ -0,0 +1,113 @@
+"""Curvas de sobrevivência do pagamento (Kaplan–Meier) por segmento.
+
+O tempo de cada boleto é contado em dias a partir do vencimento (pagamentos
+antecipados contam como dia 0). Boletos pagos são eventos; boletos em
+aberto são censurados na data de corte da base (o último dia com
+pagamento), pois ainda podem ser pagos depois dela. A curva ``S(t)`` é a
+fração estimada de boletos ainda não pagos ``t`` dias após o vencimento.
+
+Todas as curvas saem de uma vez, sem laço por segmento: segmento e dia
+viram uma posição em uma grade ``segmentos × dias``; eventos e saídas (pagos
+mais censurados) são contados com ``np.bincount``; os boletos em risco são
+a soma acumulada reversa das saídas em cada linha e ``S(t)`` é o produto
+acumulado de ``1 - eventos / em_risco`` ao longo dos dias.
+
+A entrada pode ter pesos: as curvas por espécie saem das células do cubo,
+as por porte do pagador, das linhas da base.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Segmentações disponíveis para as curvas
+SEGMENTOS = ("tipo_especie", "porte_pagador")
+
+# Porte do pagador pela quantidade de boletos na carteira: limite inferior -> rótulo
+FAIXAS_PORTE = {
+    1: "1 boleto",
+    2: "2 a 10 boletos",
+    11: "11 a 100 boletos",
+    101: "Mais de 100 boletos",
+}
+
+
+def porte_pagador(qtd_boletos):
+    """Faixa de ``FAIXAS_PORTE`` de cada pagador, pela quantidade de boletos."""
+    limites = np.array(list(FAIXAS_PORTE))
+    faixa = np.searchsorted(limites, np.asarray(qtd_boletos), side="right") - 1
+    return pd.Categorical.from_codes(faixa, categories=list(FAIXAS_PORTE.values()), ordered=True)
+
+
+def tempos_pagamento(dt_vencimento, dt_pagamento, data_corte):
+    """Dias do vencimento até o pagamento (ou até ``data_corte``, se em aberto).
+
+    Retorna ``(dias, pago)``; ``dias`` nunca é negativo.
+    """
+    vencimento = np.asarray(dt_vencimento, dtype="datetime64[D]")
+    pagamento = np.asarray(dt_pagamento, dtype="datetime64[D]")
+    pago = ~np.isnat(pagamento)
+    fim = np.where(pago, pagamento, np.datetime64(data_corte, "D"))
+    dias = (fim - vencimento).astype(np.int64)
+    return np.maximum(dias, 0), pago
+
+
+def kaplan_meier(grupos, dias, pago, pesos=None):
+    """Curvas de Kaplan–Meier de todos os grupos de uma vez.
+
+    ``grupos`` rotula cada linha (ausentes são ignorados); ``pesos`` é a
+    quantidade de boletos de cada linha (padrão: 1). Retorna uma linha por
+    grupo e dia com alguma saída, ordenada por grupo e dia, com ``grupo``,
+    ``dias``, ``em_risco``, ``pagos`` e ``sobrevivencia``.
+    """
+    codigos, nomes = pd.factorize(grupos, sort=True)
+    validos = codigos >= 0
+    if not validos.any():
+        return pd.DataFrame(columns=["grupo", "dias", "em_risco", "pagos", "sobrevivencia"])
+    dias = np.asarray(dias, dtype=np.int64)[validos]
+    pago = np.asarray(pago, dtype=bool)[validos]
+    pesos = np.ones(len(dias)) if pesos is None else np.asarray(pesos, dtype=np.float64)[validos]
+
+    n_dias = int(dias.max()) + 1
+    forma = (len(nomes), n_dias)
+    posicao = codigos[validos] * n_dias + dias
+    saidas = np.bincount(posicao, weights=pesos, minlength=forma[0] * n_dias).reshape(forma)
+    eventos = np.bincount(posicao[pago], weights=pesos[pago], minlength=forma[0] * n_dias).reshape(forma)
+
+    # Em risco no dia t: quem sai em t ou depois
+    em_risco = np.cumsum(saidas[:, ::-1], axis=1)[:, ::-1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fator = np.where(em_risco > 0, 1 - eventos / em_risco, 1.0)
+    sobrevivencia = np.cumprod(fator, axis=1)
+
+    grupo, dia = np.nonzero(saidas)
+    return pd.DataFrame({
+        "grupo": np.asarray(nomes)[grupo],
+        "dias": dia,
+        "em_risco": em_risco[grupo, dia].round().astype(np.int64),
+        "pagos": eventos[grupo, dia].round().astype(np.int64),
+        "sobrevivencia": sobrevivencia[grupo, dia],
+    })
+
+
+def sobrevivencia_em(curvas, marcos):
+    """``S(t)`` de cada grupo nos dias ``marcos``, com o total de boletos do grupo.
+
+    ``curvas`` é o resultado de ``kaplan_meier``; antes da primeira saída do
+    grupo a sobrevivência é 1.
+    """
+    codigos, nomes = pd.factorize(curvas["grupo"])
+    dias = curvas["dias"].to_numpy()
+    largura = int(max(dias.max(), max(marcos))) + 1
+    chave = codigos * largura + dias
+
+    # Última saída de cada grupo em ou antes de cada marco
+    alvo = np.arange(len(nomes))[:, None] * largura + np.asarray(marcos)[None, :]
+    posicao = np.searchsorted(chave, alvo, side="right") - 1
+    valida = (posicao >= 0) & (codigos[np.maximum(posicao, 0)] == np.arange(len(nomes))[:, None])
+    valores = np.where(valida, curvas["sobrevivencia"].to_numpy()[np.maximum(posicao, 0)], 1.0)
+
+    inicio = np.searchsorted(chave, np.arange(len(nomes)) * largura)
+    resumo = pd.DataFrame(valores, columns=[f"d{m}" for m in marcos])
+    resumo.insert(0, "boletos", curvas["em_risco"].to_numpy()[inicio])
+    resumo.insert(0, "grupo", np.asarray(nomes))
+    return resumo
@@ -0,0 +1,191 @@
+"""Cálculo das métricas principais em uma única passada, com memória limitada.
+
+As métricas dos cards das páginas 3 e 4 — somas de emissão, baixas e
+inadimplência, mediana, máximo, mínimo, percentual pago e os indicadores de
+atraso e multas — são acumuladas lote a lote de linhas, sem nunca manter a
+base inteira em memória. Cada lote é percorrido uma vez por ``adicionar``:
+as máscaras de valor presente, pagamento e atraso são calculadas uma única
+vez e reaproveitadas por todas as métricas. A mediana do valor nominal vem
+de um ``SketchQuantis`` mesclável (exato para bases pequenas, com erro
+relativo limitado para bases grandes); a de atraso, de uma contagem de
+boletos por dia de atraso.
+
+Há duas fontes possíveis:
+
+- as partes Parquet do armazenamento (``kpis_armazenamento``), percorridas
+  da mais recente para a mais antiga para que apenas a versão mais recente
+  de cada boleto seja contada;
+- um CSV no layout da base (``kpis_csv``), para extratos consolidados que
+  nem chegam a ser ingeridos.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from utils.datas import ler_datas
+from utils.ingestao import caminho_dicionario, caminhos_partes
+from utils.ids import ler_dicionario
+from utils.sketch import SketchQuantis
+
+COLUNAS_KPI = ["vlr_nominal", "vlr_baixa", "inadimplente", "dt_vencimento", "dt_pagamento"]
+
+TAMANHO_LOTE = 1_000_000
+
+
+@dataclass(frozen=True)
+class KPIs:
+    """Métricas principais da carteira, exibidas nos cards e nas conclusões."""
+
+    valor_total_emitido: float
+    valor_total_baixas: float
+    valor_inadimplente: float
+    total_boletos: int
+    pct_pagos: float
+    mediana_nominal: float
+    valor_maximo_nominal: float
+    valor_minimo_nominal: float
+    # Boletos pagos depois do vencimento
+    boletos_atrasados: int
+    media_atraso: float
+    mediana_atraso: float
+    max_atraso: float
+    valor_total_multas: float
+
+
+def _somar_contagens(a, b):
+    """Soma duas contagens por posição de tamanhos possivelmente diferentes."""
+    if len(a) < len(b):
+        a, b = b, a
+    soma = a.copy()
+    soma[:len(b)] += b
+    return soma
+
+
+@dataclass
+class ParciaisKPI:
+    """Acumuladores mescláveis das métricas principais."""
+
+    soma_nominal: float = 0.0
+    soma_baixas: float = 0.0
+    soma_inadimplente: float = 0.0
+    total_boletos: int = 0
+    boletos_pagos: int = 0
+    maximo: float = -np.inf
+    minimo: float = np.inf
+    sketch: SketchQuantis = field(default_factory=SketchQuantis)
+    # Boletos pagos com atraso por dias de atraso (posição = dias)
+    atrasos: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    soma_multas: float = 0.0
+
+    def adicionar(self, vlr_nominal, vlr_baixa, inadimplente, dt_vencimento, dt_pagamento):
+        vlr_nominal = np.asarray(vlr_nominal, dtype=np.float64)
+        vlr_baixa = np.asarray(vlr_baixa, dtype=np.float64)
+        presente = ~np.isnan(vlr_nominal)
+        pago = ~np.isnan(vlr_baixa)
+        validos = vlr_nominal[presente]
+
+        self.soma_nominal += validos.sum()
+        self.soma_baixas += vlr_baixa.sum(where=pago)
+        self.soma_inadimplente += vlr_nominal.sum(where=presente & (np.asarray(inadimplente) == 1))
+        self.total_boletos += len(vlr_nominal)
+        self.boletos_pagos += int(np.count_nonzero(pago))
+        if len(validos):
+            self.maximo = max(self.maximo, validos.max())
+            self.minimo = min(self.minimo, validos.min())
+        self.sketch.adicionar(validos)
+
+        # NaT vira o menor int64 na conversão, então nunca conta como atraso
+        dias = (np.asarray(dt_pagamento, dtype="datetime64[D]")
+                - np.asarray(dt_vencimento, dtype="datetime64[D]")).astype(np.int64)
+        atrasado = pago & (dias > 0)
+        self.atrasos = _somar_contagens(self.atrasos, np.bincount(dias[atrasado]))
+        self.soma_multas += np.nansum(vlr_baixa - vlr_nominal, where=atrasado)
+        return self
+
+    def mesclar(self, outro):
+        self.soma_nominal += outro.soma_nominal
+        self.soma_baixas += outro.soma_baixas
+        self.soma_inadimplente += outro.soma_inadimplente
+        self.total_boletos += outro.total_boletos
+        self.boletos_pagos += outro.boletos_pagos
+        self.maximo = max(self.maximo, outro.maximo)
+        self.minimo = min(self.minimo, outro.minimo)
+        self.sketch.mesclar(outro.sketch)
+        self.atrasos = _somar_contagens(self.atrasos, outro.atrasos)
+        self.soma_multas += outro.soma_multas
+        return self
+
+    def _indicadores_atraso(self):
+        """Quantidade, média, mediana e máximo de dias de atraso."""
+        atrasados = int(self.atrasos.sum())
+        if atrasados == 0:
+            return 0, np.nan, np.nan, np.nan
+        dias = np.arange(len(self.atrasos))
+        acumulado = np.cumsum(self.atrasos)
+        meio = np.searchsorted(acumulado, [(atrasados - 1) // 2, atrasados // 2], side="right")
+        return (
+            atrasados,
+            float((dias * self.atrasos).sum() / atrasados),
+            float(meio.mean()),
+            len(self.atrasos) - 1,
+        )
+
+    def resultado(self):
+        """Métricas no mesmo formato de ``consultas.kpis()``."""
+        vazio = self.sketch.contagem == 0
+        atrasados, media, mediana, maximo = self._indicadores_atraso()
+        return KPIs(
+            valor_total_emitido=self.soma_nominal,
+            valor_total_baixas=self.soma_baixas,
+            valor_inadimplente=self.soma_inadimplente,
+            total_boletos=self.total_boletos,
+            pct_pagos=(self.boletos_pagos / self.total_boletos) * 100 if self.total_boletos > 0 else 0,
+            mediana_nominal=self.sketch.quantil(0.5),
+            valor_maximo_nominal=np.nan if vazio else self.maximo,
+            valor_minimo_nominal=np.nan if vazio else self.minimo,
+            boletos_atrasados=atrasados,
+            media_atraso=media,
+            mediana_atraso=mediana,
+            max_atraso=maximo,
+            valor_total_multas=self.soma_multas,
+        )
+
+
+def kpis_armazenamento(tamanho_lote=TAMANHO_LOTE):
+    """Métricas principais sobre as partes Parquet, lote a lote.
+
+    A memória usada é a de um lote de linhas mais um marcador de um byte por
+    boleto, usado para ignorar versões substituídas por lotes posteriores.
+    """
+    parciais = ParciaisKPI()
+    vistos = np.zeros(len(ler_dicionario(caminho_dicionario("id_boleto"))), dtype=bool)
+
+    for caminho in reversed(caminhos_partes()):
+        arquivo = pq.ParquetFile(caminho)
+        for lote in arquivo.iter_batches(batch_size=tamanho_lote,
+                                         columns=COLUNAS_KPI + ["id_boleto"]):
+            codigos = lote.column("id_boleto").to_numpy()
+            # Boletos sem ID (código -1) não têm outra versão: entram sempre
+            validos = codigos >= 0
+            novos = ~validos
+            novos[validos] = ~vistos[codigos[validos]]
+            vistos[codigos[validos]] = True
+            parciais.adicionar(*(lote.column(c).to_numpy(zero_copy_only=False)[novos] for c in COLUNAS_KPI))
+    return parciais.resultado()
+
+
+def kpis_csv(caminho, tamanho_lote=TAMANHO_LOTE):
+    """Métricas principais lidas diretamente de um CSV no layout da base."""
+    parciais = ParciaisKPI()
+    for lote in pd.read_csv(caminho, usecols=COLUNAS_KPI, chunksize=tamanho_lote):
+        parciais.adicionar(
+            pd.to_numeric(lote["vlr_nominal"], errors="coerce"),
+            pd.to_numeric(lote["vlr_baixa"], errors="coerce"),
+            lote["inadimplente"],
+            ler_datas(lote["dt_vencimento"]),
+            ler_datas(lote["dt_pagamento"]),
+        )
+    return parciais.resultado()
@@ -0,0 +1,124 @@
+"""Tabela paginada no servidor, para resultados com muitas linhas.
+
+``st.dataframe`` envia a tabela inteira ao navegador. ``tabela_paginada``
+mantém o resultado no servidor e envia só a página visível:
+
+- a ordenação é feita no servidor; para mostrar a página ``p`` basta
+  selecionar as ``p * tamanho`` primeiras linhas (``np.partition``) e
+  ordenar só essas, sem ordenar a tabela toda;
+- colunas de ID chegam como códigos inteiros; a busca por ID (inteiro ou
+  só o começo do hash) é resolvida sobre o dicionário de IDs e só as linhas
+  da página são decodificadas para o hash original.
+
+Chame dentro de um fragmento (ver ``perfil.fragmento``) para que trocar de
+página, de ordenação ou de busca reexecute só a tabela.
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.dados import decodificar_ids, ids_com_prefixo
+from utils.formatacao import estilizar, numero
+
+TAMANHO_PAGINA = 50
+
+ORDENS = {"Decrescente": True, "Crescente": False}
+
+
+def _chave_ordenacao(serie):
+    """Valores de ``serie`` como ``float64`` comparáveis (ausentes viram NaN)."""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        datas = serie.to_numpy(dtype="datetime64[ns]")
+        chave = datas.view(np.int64).astype(np.float64)
+        chave[np.isnat(datas)] = np.nan
+        return chave
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        return serie.to_numpy(dtype=np.float64, na_value=np.nan)
+    codigos, _ = pd.factorize(serie, sort=True)
+    return np.where(codigos < 0, np.nan, codigos).astype(np.float64)
+
+
+def primeiras_posicoes(valores, quantidade, decrescente=True):
+    """Posições das ``quantidade`` primeiras linhas na ordem pedida.
+
+    Ausentes ficam por último e empates seguem a posição original, como em
+    uma ordenação estável completa.
+    """
+    chave = -valores if decrescente else valores.copy()
+    chave[np.isnan(chave)] = np.inf
+    quantidade = min(quantidade, len(chave))
+    if quantidade == 0:
+        return np.array([], dtype=np.intp)
+    candidatos = np.arange(len(chave))
+    if quantidade < len(chave):
+        corte = np.partition(chave, quantidade - 1)[quantidade - 1]
+        candidatos = np.flatnonzero(chave <= corte)
+    ordem = np.lexsort((candidatos, chave[candidatos]))
+    return candidatos[ordem[:quantidade]]
+
+
+def tabela_paginada(df, chave, rotulos=None, colunas_id=(), ordenacao=None, decrescente=True,
+                    formatos=None, column_config=None, tamanho_pagina=TAMANHO_PAGINA):
+    """Desenha ``df`` paginada, com ordenação e busca por ID no servidor.
+
+    ``rotulos`` traduz os nomes das colunas para a exibição; ``colunas_id``
+    são as colunas com códigos de ID (pesquisáveis e decodificadas só na
+    página exibida); ``ordenacao`` e ``decrescente`` definem a ordem inicial.
+    ``formatos`` segue ``formatacao.estilizar``, aplicado só à página.
+    ``chave`` identifica os widgets da tabela na página.
+    """
+    rotulos = {coluna: (rotulos or {}).get(coluna, coluna) for coluna in df.columns}
+    ordenaveis = [c for c in df.columns if c not in colunas_id]
+
+    col_busca, col_ordem, col_direcao = st.columns([2, 2, 1])
+    busca = ""
+    if colunas_id:
+        with col_busca:
+            busca = st.text_input("Buscar ID", placeholder="Início ou hash completo",
+                                  key=f"{chave}_busca").strip()
+    with col_ordem:
+        coluna_ordem = st.selectbox(
+            "Ordenar por", ordenaveis, format_func=rotulos.get,
+            index=ordenaveis.index(ordenacao) if ordenacao in ordenaveis else 0,
+            key=f"{chave}_ordem",
+        )
+    with col_direcao:
+        decrescente = ORDENS[st.selectbox("Ordem", list(ORDENS), index=0 if decrescente else 1,
+                                          key=f"{chave}_direcao")]
+
+    # Busca: códigos cujo hash começa pelo texto, em qualquer coluna de ID
+    if busca:
+        selecao = np.zeros(len(df), dtype=bool)
+        for coluna in colunas_id:
+            selecao |= np.isin(df[coluna].to_numpy(), ids_com_prefixo(coluna, busca))
+        df = df[selecao]
+
+    total = len(df)
+    paginas = max(1, -(-total // tamanho_pagina))
+    chave_pagina = f"{chave}_pagina"
+    # Nova busca ou filtro pode deixar a página atual fora do intervalo
+    if st.session_state.get(chave_pagina, 1) > paginas:
+        st.session_state[chave_pagina] = paginas
+
+    col_pagina, col_info = st.columns([1, 4])
+    with col_pagina:
+        pagina = st.number_input("Página", min_value=1, max_value=paginas, step=1, key=chave_pagina)
+    inicio = (pagina - 1) * tamanho_pagina
+
+    posicoes = primeiras_posicoes(_chave_ordenacao(df[coluna_ordem]), inicio + tamanho_pagina, decrescente)
+    visiveis = df.iloc[posicoes[inicio:]].copy()
+    for coluna in colunas_id:
+        visiveis[coluna] = decodificar_ids(coluna, visiveis[coluna])
+
+    formatos = {rotulos[coluna]: tipo for coluna, tipo in (formatos or {}).items()}
+    st.dataframe(
+        estilizar(visiveis.rename(columns=rotulos), formatos),
+        column_config=column_config,
+        use_container_width=True,
+        hide_index=True,
+    )
+    with col_info:
+        fim = inicio + len(visiveis)
+        texto = f"Linhas {numero(inicio + 1 if total else 0)}–{numero(fim)} de {numero(total)}"
+        st.markdown(f"<div style='padding-top: 2.2rem'>{texto}</div>", unsafe_allow_html=True)